@@ -1,51 +1,110 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
+from flask.json.provider import DefaultJSONProvider
+from markupsafe import Markup
+import click
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from dotenv import load_dotenv
 import math
-import re
+import hmac
+from array import array
+import csv
 import pandas as pd
-import json
+import numpy as np
 import sqlite3
 from sqlalchemy import text
-import pickle
+from sqlalchemy.exc import IntegrityError
+from concurrent.futures import ThreadPoolExecutor
+from risk_models import predict_one, predict_batch, prediction_cache, BatchValidationError, MODEL_FEATURES, RISK_STAGE_METRIC, score_blood_test
+from metrics import histograms, timed, request_metrics
+import blood_rules
+from reference_data import store as reference_store
+from types import MappingProxyType
+from doctor_matcher import get_matcher as get_doctor_matcher
+from mood_scoring import get_scorer as get_mood_scorer
+from measurements import parse_measurement, update_running_stats, anomaly_score, is_anomaly, TARGET_RANGES
+from timeseries import downsample, DOWNSAMPLE_METHODS
+import goal_progress
+import health_search
+from dashboard_summary import summary_cache
+from user_cache import user_cache
+from passwords import password_hasher, ip_throttle, account_throttle, HashingBusy
+from response_cache import response_cache, CachePolicy
+import migrations
+import database
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///health_app.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///health_app.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-
-# Besin veritabanını yükle
+app.config['RISK_BATCH_MAX_ROWS'] = int(os.getenv('RISK_BATCH_MAX_ROWS', 1000))  # Toplu tahminde istek başına satır sınırı
+app.config['RISK_SCORING_ASYNC'] = os.getenv('RISK_SCORING_ASYNC', '1') == '1'  # Tahlil risk skorlarını arka planda hesapla
+app.config['HEALTH_LIBRARY_PAGE_SIZE'] = int(os.getenv('HEALTH_LIBRARY_PAGE_SIZE', health_search.DEFAULT_PAGE_SIZE))
+app.config['HEALTH_TRENDS_WINDOWS'] = (7, 30, 90)  # Sağlık trendlerinde seçilebilen pencereler (gün)
+app.config['HEALTH_TRENDS_DEFAULT_WINDOW'] = 30
+app.config['CHRONIC_DATA_PAGE_SIZE'] = int(os.getenv('CHRONIC_DATA_PAGE_SIZE', 500))  # Ölçüm API'sinde sayfa başına en fazla satır
+app.config['CHRONIC_DATA_MAX_POINTS'] = int(os.getenv('CHRONIC_DATA_MAX_POINTS', 2000))  # Seyreltilmiş seride en fazla nokta
+app.config['CHRONIC_DATA_MAX_SOURCE_ROWS'] = int(os.getenv('CHRONIC_DATA_MAX_SOURCE_ROWS', 200000))  # Seyreltme için okunacak en fazla ölçüm
+app.config['MOOD_BATCH_MAX_ROWS'] = int(os.getenv('MOOD_BATCH_MAX_ROWS', 5000))  # Toplu ruh hali skorlamasında istek başına satır sınırı
+app.config['METRICS_SAMPLE_RATE'] = float(os.getenv('METRICS_SAMPLE_RATE', 1.0))  # /metrics için isteklerin kaydedilme oranı
+# Her zaman kaydedilen ve SQL sorguları tek tek ölçülen ağır uç noktalar
+app.config['METRICS_DETAILED_ENDPOINTS'] = tuple(filter(None, os.getenv('METRICS_DETAILED_ENDPOINTS', 'blood_test,kriz_analizleri').split(',')))
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # /metrics için Bearer belirteci; ayarlı değilse uç nokta kapalıdır (404)
+app.config['AUTO_MIGRATE'] = os.getenv('AUTO_MIGRATE', '0') == '1'  # Şema geride ise açılışta geçişleri uygula (yalnızca tek süreçli geliştirme için)
+# Önümüzdeki güvenilir ters vekil sayısı; 0: doğrudan bağlantı, X-Forwarded-For yok sayılır
+app.config['PROXY_FIX_X_FOR'] = int(os.getenv('PROXY_FIX_X_FOR', 0))
+
+def trust_proxy_headers(app):
+    """Take request.remote_addr from X-Forwarded-For, trusting PROXY_FIX_X_FOR proxy hops
+
+    The login throttle identifies clients by request.remote_addr, which behind a
+    reverse proxy is the proxy itself; headers beyond the configured hops could
+    be forged by the client and are ignored.
+    """
+    if app.config['PROXY_FIX_X_FOR']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+trust_proxy_headers(app)
+
+class ReferenceJSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes frozen reference-data snapshots"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, MappingProxyType):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+app.json = ReferenceJSONProvider(app)
+
+# Besin veritabanını yükle (salt okunur anlık görüntü, dosya değişince yenilenir)
 def load_food_db():
     try:
-        with open('food_db.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return reference_store.get('food_db')
     except FileNotFoundError:
-        return []
-
-FOOD_DB = load_food_db()
+        return ()
 
 # Besin veritabanını güncelle
-def save_food_db():
-    with open('food_db.json', 'w', encoding='utf-8') as f:
-        json.dump(FOOD_DB, f, ensure_ascii=False, indent=4)
+def save_food_db(foods):
+    reference_store.save('food_db', foods)
 
 # Besin ekleme endpoint'i
 @app.route('/add-food', methods=['POST'])
 @login_required
 def add_food():
     try:
+        foods = load_food_db()
         new_food = {
-            'id': len(FOOD_DB) + 1,
+            'id': len(foods) + 1,
             'name': request.form.get('name'),
             'calories': float(request.form.get('calories')),
             'protein': float(request.form.get('protein')),
@@ -53,8 +112,7 @@ def add_food():
             'fat': float(request.form.get('fat')),
             'portion': float(request.form.get('portion', 100))
         }
-        FOOD_DB.append(new_food)
-        save_food_db()
+        save_food_db(list(foods) + [new_food])
         return jsonify({'success': True, 'message': 'Besin başarıyla eklendi.'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -64,12 +122,14 @@ def add_food():
 @login_required
 def update_food(food_id):
     try:
-        food = next((f for f in FOOD_DB if f['id'] == food_id), None)
+        foods = load_food_db()
+        food = next((f for f in foods if f['id'] == food_id), None)
         if not food:
             return jsonify({'success': False, 'message': 'Besin bulunamadı.'}), 404
         
         data = request.get_json()
-        food.update({
+        updated = dict(food)
+        updated.update({
             'name': data.get('name', food['name']),
             'calories': float(data.get('calories', food['calories'])),
             'protein': float(data.get('protein', food['protein'])),
@@ -77,7 +137,7 @@ def update_food(food_id):
             'fat': float(data.get('fat', food['fat'])),
             'portion': float(data.get('portion', food['portion']))
         })
-        save_food_db()
+        save_food_db([updated if f['id'] == food_id else f for f in foods])
         return jsonify({'success': True, 'message': 'Besin başarıyla güncellendi.'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -87,9 +147,7 @@ def update_food(food_id):
 @login_required
 def delete_food(food_id):
     try:
-        global FOOD_DB
-        FOOD_DB = [f for f in FOOD_DB if f['id'] != food_id]
-        save_food_db()
+        save_food_db([f for f in load_food_db() if f['id'] != food_id])
         return jsonify({'success': True, 'message': 'Besin başarıyla silindi.'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -98,13 +156,26 @@ def delete_food(food_id):
 @app.route('/list-foods', methods=['GET'])
 @login_required
 def list_foods():
-    return jsonify(FOOD_DB)
+    return jsonify(load_food_db())
+
+# Referans dosyalarının yüklenme sayıları ve süreleri
+@app.route('/api/reference-data/stats')
+@login_required
+def reference_data_stats():
+    return jsonify(reference_store.stats())
 
 # Initialize extensions
+# Motor ayarları içe aktarmada ortamdan okunur (DATABASE_URL, SQLITE_*, DB_POOL_*):
+# SQLite için bekleme süresi, sunucu veritabanları için havuz boyutları
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 db = SQLAlchemy(app)
-login_manager = LoginManager()
-login_manager.init_app(app)
+login_manager = LoginManager(app)
 login_manager.login_view = 'login'
+with app.app_context():
+    # PRAGMA ayarları ilk bağlantıdan önce kaydedilmeli
+    database.configure_engine(db.engine)
+    request_metrics.init_app(app, db.engine, sample_rate=app.config['METRICS_SAMPLE_RATE'],
+                             detailed=app.config['METRICS_DETAILED_ENDPOINTS'])
 
 # User model
 class User(UserMixin, db.Model):
@@ -120,14 +191,15 @@ class User(UserMixin, db.Model):
     goal = db.Column(db.String(20))  # Lose Weight, Maintain, Gain Weight
     last_login = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    summary_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # panel verisi her değiştiğinde artar
     test_results = db.relationship('TestResult', backref='user', lazy=True)
     meals = db.relationship('Meal', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
     def calculate_bmr(self):
         """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
@@ -171,6 +243,20 @@ class TestResult(db.Model):
     pdf_path = db.Column(db.String(200))
     results_data = db.Column(db.JSON)
     recommendations = db.Column(db.Text)
+    reference_version = db.Column(db.String(20), index=True)  # Önerilerin üretildiği referans dosyası sürümü
+
+class LabValue(db.Model):
+    # Tahlil sonuçlarının analit başına bir satırlık dar kopyası (uzun dönem sorguları için)
+    __table_args__ = (db.Index('ix_lab_value_user_analyte_date', 'user_id', 'analyte', 'date'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    test_result_id = db.Column(db.Integer, db.ForeignKey('test_result.id'), nullable=False, index=True)
+    date = db.Column(db.DateTime, nullable=False)
+    panel = db.Column(db.String(30), nullable=False)
+    analyte = db.Column(db.String(50), nullable=False)
+    value = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20))
+    flag = db.Column(db.String(10))  # low, high, normal; referansı olmayan analitlerde boş
 
 # Meal model
 class Meal(db.Model):
@@ -199,34 +285,123 @@ class HealthJournal(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class ChronicMeasurement(db.Model):
+    __table_args__ = (
+        db.Index('ix_chronic_measurement_user_type_date', 'user_id', 'measurement_type', 'date'),
+        db.Index('ix_chronic_measurement_user_anomaly', 'user_id', 'is_anomaly'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.Date, nullable=False, default=date.today)
     disease_type = db.Column(db.String(50), nullable=False)  # e.g. 'diabetes', 'hypertension', 'asthma'
     measurement_type = db.Column(db.String(50), nullable=False)  # e.g. 'blood_glucose', 'blood_pressure', 'peak_flow'
     value = db.Column(db.String(50), nullable=False)  # e.g. '120', '120/80', '400'
+    value_primary = db.Column(db.Float)  # Ayrıştırılmış değer (tansiyonda sistolik)
+    value_secondary = db.Column(db.Float)  # Tansiyonda diastolik
+    unit = db.Column(db.String(20))
+    anomaly_score = db.Column(db.Float)  # Kişisel EWMA taban çizgisine göre z-skoru
+    is_anomaly = db.Column(db.Boolean, nullable=False, default=False)
     note = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class MeasurementStats(db.Model):
+    # Kullanıcı ve ölçüm türü başına her kayıtta artımlı güncellenen özet istatistikler
+    __table_args__ = (db.UniqueConstraint('user_id', 'measurement_type', name='uq_measurement_stats_user_type'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    measurement_type = db.Column(db.String(50), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float)
+    m2 = db.Column(db.Float)  # Welford: ortalamadan sapmaların kareleri toplamı
+    ewma = db.Column(db.Float)
+    ewm_var = db.Column(db.Float)  # EWMA etrafındaki üstel ağırlıklı varyans (anomali taban çizgisi)
+    min_value = db.Column(db.Float)
+    max_value = db.Column(db.Float)
+    last_value = db.Column(db.Float)
+    last_date = db.Column(db.Date)
+    in_range_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count and self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def time_in_range(self):
+        """Share of readings inside the target range (None when the type has no target)"""
+        if not self.count or self.measurement_type not in TARGET_RANGES:
+            return None
+        return (self.in_range_count or 0) / self.count
+
+    def to_dict(self):
+        return {
+            'measurement_type': self.measurement_type,
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'ewma': self.ewma,
+            'min': self.min_value,
+            'max': self.max_value,
+            'last_value': self.last_value,
+            'last_date': self.last_date.strftime('%Y-%m-%d') if self.last_date else None,
+            'time_in_range': self.time_in_range,
+            'target_range': TARGET_RANGES.get(self.measurement_type),
+        }
+
+class RiskScore(db.Model):
+    # Kaydedilen tahlillerden önceden hesaplanan risk skorları
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    test_result_id = db.Column(db.Integer, db.ForeignKey('test_result.id'), nullable=False, index=True)
+    model_name = db.Column(db.String(20), nullable=False)  # 'diabetes', 'heart'
+    model_version = db.Column(db.String(20), nullable=False)
+    prediction = db.Column(db.Integer, nullable=False)
+    probability = db.Column(db.Float)
+    features = db.Column(db.JSON)
+    imputed_features = db.Column(db.JSON)  # Tahlilde olmadığı için varsayılanla doldurulan özellikler
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class MoodStressTest(db.Model):
+    __table_args__ = (db.Index('ix_mood_stress_test_user_date', 'user_id', 'date'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, default=datetime.utcnow)
     mood_score = db.Column(db.Integer)
     stress_score = db.Column(db.Integer)
     result_json = db.Column(db.JSON)
+    mood_avg = db.Column(db.Float)  # result_json'daki ortalamaların sorgulanabilir kopyası
+    stress_avg = db.Column(db.Float)
+    answers = db.Column(db.JSON)  # Ham cevaplar (soru id -> puan), toplu yeniden skorlama için
 
 class HealthGoal(db.Model):
+    __table_args__ = (db.Index('uq_health_goal_user', 'user_id', unique=True),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    steps = db.Column(db.Integer, default=8000)
-    water = db.Column(db.Float, default=2.0)  # litre
-    sleep = db.Column(db.Float, default=7.0)  # saat
+    steps = db.Column(db.Integer, default=goal_progress.DEFAULT_TARGETS['steps'])
+    water = db.Column(db.Float, default=goal_progress.DEFAULT_TARGETS['water'])  # litre
+    sleep = db.Column(db.Float, default=goal_progress.DEFAULT_TARGETS['sleep'])  # saat
     weight = db.Column(db.Float, nullable=True)
     calories = db.Column(db.Integer, nullable=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Her girişte artımlı güncellenen seri ve uyum durumu
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    streak_end = db.Column(db.Date)  # hedeflere ulaşılan en son gün
+    met_mask = db.Column(db.BigInteger, nullable=False, default=0)  # son günlerin hedef bitleri
+    mask_date = db.Column(db.Date)  # maskenin 0. bitinin günü
+    first_entry_date = db.Column(db.Date)
+
+    def streak(self, today=None):
+        return goal_progress.current_streak(self, today or date.today())
+
+    def compliance(self, days, today=None):
+        return goal_progress.compliance(self, today or date.today(), days)
 
 class HealthGoalEntry(db.Model):
+    __table_args__ = (db.Index('uq_health_goal_entry_user_date', 'user_id', 'date', unique=True),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.Date, default=date.today)
@@ -235,38 +410,429 @@ class HealthGoalEntry(db.Model):
     sleep = db.Column(db.Float)
     weight = db.Column(db.Float)
     calories = db.Column(db.Integer)
+    goals_met = db.Column(db.Boolean, nullable=False, default=False)  # kayıt anındaki hedeflere göre
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-def init_db():
-    # Create all tables
+# Profil, aktivite seviyesi ve şifre güncellemeleri önbellekteki kullanıcıyı geçersiz kılar
+user_cache.watch(db.session, User)
+
+def bump_summary_versions(connection, user_ids=None):
+    """Move the users' dashboard summary version forward (all users when user_ids is None)"""
+    users = User.__table__
+    statement = db.update(users).values(summary_version=users.c.summary_version + 1)
+    if user_ids is not None:
+        statement = statement.where(users.c.id.in_(sorted(user_ids)))
+    connection.execute(statement)
+
+def summary_version(user_id):
+    # Önbellekteki kullanıcı nesnesi değil, veritabanındaki güncel değer okunur
+    return db.session.execute(db.select(User.__table__.c.summary_version).where(User.__table__.c.id == user_id)).scalar()
+
+def invalidate_all_summaries():
+    """Bulk UPDATEs bypass the session hooks: invalidate every summary in every worker"""
+    bump_summary_versions(db.session.connection())
+    db.session.commit()
+    summary_cache.clear()
+
+# Bu tablolara yapılan yazmalar kullanıcının panel özetini geçersiz kılar (tüm işçilerde: sürüm artar)
+summary_cache.watch(db.session, (Meal, TestResult, LabValue, HealthGoal, HealthGoalEntry, MoodStressTest,
+                                 ChronicMeasurement, MeasurementStats), bump_versions=bump_summary_versions)
+
+def backfill_mood_averages(batch_size=1000):
+    """Copy mood/stress averages out of result_json into the numeric columns"""
+    last_id = 0
+    while True:
+        rows = (db.session.query(MoodStressTest.id, MoodStressTest.result_json)
+                .filter(MoodStressTest.id > last_id)
+                .order_by(MoodStressTest.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        changes = [
+            {
+                'id': row.id,
+                'mood_avg': (row.result_json or {}).get('mood', {}).get('avg'),
+                'stress_avg': (row.result_json or {}).get('stress', {}).get('avg'),
+            }
+            for row in rows
+        ]
+        db.session.execute(db.update(MoodStressTest), changes)
+        db.session.commit()
+        last_id = rows[-1].id
+    invalidate_all_summaries()
+
+def backfill_measurement_values(batch_size=1000, only_missing=True):
+    """Parse stored measurement strings into the typed columns, one id batch at a time"""
+    query = db.session.query(ChronicMeasurement.id, ChronicMeasurement.measurement_type, ChronicMeasurement.value)
+    if only_missing:
+        query = query.filter(ChronicMeasurement.value_primary.is_(None))
+    last_id = 0
+    updated = 0
+    while True:
+        rows = query.filter(ChronicMeasurement.id > last_id).order_by(ChronicMeasurement.id).limit(batch_size).all()
+        if not rows:
+            break
+        changes = []
+        for row in rows:
+            primary, secondary, unit = parse_measurement(row.measurement_type, row.value)
+            changes.append({'id': row.id, 'value_primary': primary, 'value_secondary': secondary, 'unit': unit})
+        db.session.execute(db.update(ChronicMeasurement), changes)
+        db.session.commit()
+        updated += len(changes)
+        last_id = rows[-1].id
+    invalidate_all_summaries()
+    return updated
+
+def record_measurement_stats(measurement):
+    """Score a new measurement against its user's baseline, then fold it into the running statistics
+
+    Both the anomaly flag and the statistics are committed with the measurement.
+    The statistics row is created with database.insert_if_absent and read
+    FOR UPDATE, so concurrent first measurements of a user do not fail.
+    """
+    if measurement.value_primary is None:
+        return None
+    key = {'user_id': measurement.user_id, 'measurement_type': measurement.measurement_type}
+    query = db.select(MeasurementStats).filter_by(**key).with_for_update()
+    stats = db.session.execute(query).scalar_one_or_none()
+    if stats is None:
+        # Aynı kullanıcı/tür için eşzamanlı ilk kayıtlar: satırı yalnızca biri ekler, diğerleri onu okur
+        database.insert_if_absent(db.session, MeasurementStats.__table__, key, ['user_id', 'measurement_type'])
+        stats = db.session.execute(query.execution_options(populate_existing=True)).scalar_one()
+    measurement.anomaly_score = anomaly_score(stats, measurement.value_primary)
+    measurement.is_anomaly = is_anomaly(measurement.anomaly_score)
+    return update_running_stats(stats, measurement.value_primary, measurement.date)
+
+def rebuild_measurement_stats(batch_size=1000):
+    """Replay the stored history in date order: recompute every MeasurementStats row and anomaly flag"""
+    rows = db.session.execute(
+        db.select(ChronicMeasurement.id, ChronicMeasurement.user_id, ChronicMeasurement.measurement_type,
+                  ChronicMeasurement.date, ChronicMeasurement.value_primary)
+        .filter(ChronicMeasurement.value_primary.isnot(None))
+        .order_by(ChronicMeasurement.user_id, ChronicMeasurement.measurement_type,
+                  ChronicMeasurement.date, ChronicMeasurement.id)
+        .execution_options(yield_per=batch_size)
+    )
+    rebuilt = {}
+    flags = []
+    for row in rows:
+        key = (row.user_id, row.measurement_type)
+        stats = rebuilt.get(key)
+        if stats is None:
+            stats = rebuilt[key] = MeasurementStats(user_id=row.user_id, measurement_type=row.measurement_type)
+        score = anomaly_score(stats, row.value_primary)
+        flags.append({'id': row.id, 'anomaly_score': score, 'is_anomaly': is_anomaly(score)})
+        update_running_stats(stats, row.value_primary, row.date)
+    try:
+        MeasurementStats.query.delete()
+        db.session.add_all(rebuilt.values())
+        for start in range(0, len(flags), batch_size):
+            db.session.execute(db.update(ChronicMeasurement), flags[start:start + batch_size])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    # Toplu güncellemeler oturum kancalarını atlar
+    invalidate_all_summaries()
+    return len(rebuilt)
+
+def rebuild_goal_progress(goal):
+    """Recompute one user's streaks and compliance window from their stored entries"""
+    days = (db.session.query(HealthGoalEntry.date, HealthGoalEntry.goals_met)
+            .filter(HealthGoalEntry.user_id == goal.user_id)
+            .order_by(HealthGoalEntry.date)
+            .all())
+    return goal_progress.rebuild(goal, days)
+
+def backfill_goal_progress(batch_size=1000):
+    """Judge every stored entry against its user's goals, then rebuild all streak state"""
+    goals = {goal.user_id: goal for goal in HealthGoal.query}
+    rows = db.session.execute(
+        db.select(HealthGoalEntry.id, HealthGoalEntry.user_id, HealthGoalEntry.date,
+                  HealthGoalEntry.steps, HealthGoalEntry.water, HealthGoalEntry.sleep)
+        .order_by(HealthGoalEntry.user_id, HealthGoalEntry.date)
+        .execution_options(yield_per=batch_size)
+    )
+    changes = []
+    days = {}
+    for row in rows:
+        goal = goals.get(row.user_id)
+        met = goal is not None and goal_progress.goals_met(goal, row)
+        changes.append({'id': row.id, 'goals_met': met})
+        days.setdefault(row.user_id, []).append((row.date, met))
+    for user_id, goal in goals.items():
+        goal_progress.rebuild(goal, days.get(user_id, ()))
+    try:
+        for start in range(0, len(changes), batch_size):
+            db.session.execute(db.update(HealthGoalEntry), changes[start:start + batch_size])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate_all_summaries()
+    return len(goals)
+
+def lab_value_rows(test_result_id, user_id, test_date, results, ruleset):
+    return [
+        {
+            'test_result_id': test_result_id, 'user_id': user_id, 'date': test_date,
+            'panel': panel, 'analyte': analyte, 'value': value, 'unit': unit, 'flag': flag,
+        }
+        for panel, analyte, value, unit, flag in ruleset.lab_values(results)
+    ]
+
+def backfill_lab_values(batch_size=500):
+    """Rebuild LabValue rows from every stored results_data blob, one id batch at a time"""
+    ruleset = blood_rules.engine.ruleset()
+    last_id = 0
+    processed = 0
+    while True:
+        rows = (db.session.query(TestResult.id, TestResult.user_id, TestResult.date, TestResult.results_data)
+                .filter(TestResult.id > last_id)
+                .order_by(TestResult.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            values.extend(lab_value_rows(row.id, row.user_id, row.date, row.results_data, ruleset))
+        try:
+            LabValue.query.filter(LabValue.test_result_id.in_([row.id for row in rows])).delete(synchronize_session=False)
+            if values:
+                db.session.execute(db.insert(LabValue), values)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        processed += len(rows)
+        last_id = rows[-1].id
+    invalidate_all_summaries()
+    return processed
+
+def _migrate_baseline():
+    """Tables of the current models, plus the meal and test_result columns added to the original schema"""
     db.create_all()
-    
-    # Add new columns if they don't exist
     with db.engine.connect() as conn:
-        # Check if portion column exists
-        inspector = db.inspect(db.engine)
+        inspector = db.inspect(conn)
         columns = [col['name'] for col in inspector.get_columns('meal')]
-        
         if 'portion' not in columns:
-            conn.execute(text('ALTER TABLE meal ADD COLUMN portion FLOAT NOT NULL DEFAULT 100'))
-        
+            migrations.add_column(conn, 'meal', db.Column('portion', db.Float, nullable=False, server_default='100'))
         if 'food_id' not in columns:
-            conn.execute(text('ALTER TABLE meal ADD COLUMN food_id INTEGER'))
-        
+            migrations.add_column(conn, 'meal', db.Column('food_id', db.Integer))
+
+        test_result_columns = [col['name'] for col in inspector.get_columns('test_result')]
+        if 'reference_version' not in test_result_columns:
+            migrations.add_column(conn, 'test_result', db.Column('reference_version', db.String(20)))
+            migrations.create_index(conn, 'ix_test_result_reference_version', 'test_result', ['reference_version'])
         conn.commit()
-    
-    print("Database tables and columns created successfully!")
+    # Sonraki adımlardaki toplu güncellemeler özet sürümünü artırır
+    _migrate_summary_version()
 
-# Create database tables
-with app.app_context():
-    init_db()
+def _migrate_mood_averages():
+    with db.engine.connect() as conn:
+        mood_test_columns = [col['name'] for col in db.inspect(conn).get_columns('mood_stress_test')]
+        if 'answers' not in mood_test_columns:
+            migrations.add_column(conn, 'mood_stress_test', db.Column('answers', db.JSON))
+        backfill_mood = 'stress_avg' not in mood_test_columns
+        if backfill_mood:
+            migrations.add_column(conn, 'mood_stress_test', db.Column('mood_avg', db.Float))
+            migrations.add_column(conn, 'mood_stress_test', db.Column('stress_avg', db.Float))
+        migrations.create_index(conn, 'ix_mood_stress_test_user_date', 'mood_stress_test', ['user_id', 'date'])
+        conn.commit()
+    if backfill_mood:
+        backfill_mood_averages()
+
+def _migrate_measurements():
+    with db.engine.connect() as conn:
+        inspector = db.inspect(conn)
+        measurement_columns = [col['name'] for col in inspector.get_columns('chronic_measurement')]
+        backfill_measurements = 'value_primary' not in measurement_columns
+        if backfill_measurements:
+            migrations.add_column(conn, 'chronic_measurement', db.Column('value_primary', db.Float))
+            migrations.add_column(conn, 'chronic_measurement', db.Column('value_secondary', db.Float))
+            migrations.add_column(conn, 'chronic_measurement', db.Column('unit', db.String(20)))
+        migrations.create_index(conn, 'ix_chronic_measurement_user_type_date', 'chronic_measurement',
+                                ['user_id', 'measurement_type', 'date'])
+        replay_measurements = 'is_anomaly' not in measurement_columns
+        if replay_measurements:
+            migrations.add_column(conn, 'chronic_measurement', db.Column('anomaly_score', db.Float))
+            migrations.add_column(conn, 'chronic_measurement',
+                                  db.Column('is_anomaly', db.Boolean, nullable=False, server_default=db.false()))
+        migrations.create_index(conn, 'ix_chronic_measurement_user_anomaly', 'chronic_measurement', ['user_id', 'is_anomaly'])
+
+        stats_columns = [col['name'] for col in inspector.get_columns('measurement_stats')]
+        if 'ewm_var' not in stats_columns:
+            migrations.add_column(conn, 'measurement_stats', db.Column('ewm_var', db.Float))
+            replay_measurements = True
+        conn.commit()
+    if backfill_measurements:
+        backfill_measurement_values()
+    if backfill_measurements or replay_measurements:
+        # Taban çizgileri ve anomali işaretleri geçmişten tohumlanır
+        rebuild_measurement_stats()
+
+def _migrate_lab_values():
+    # Tablo temel adımda oluşturulduğundan boş olup olmadığına bakılır
+    if LabValue.query.first() is None and TestResult.query.first() is not None:
+        try:
+            backfill_lab_values()
+        except FileNotFoundError:
+            print("Kan tahlili referans dosyası bulunamadı, analit tablosu doldurulamadı!")
+
+def _migrate_goal_progress():
+    with db.engine.connect() as conn:
+        inspector = db.inspect(conn)
+        goal_columns = [col['name'] for col in inspector.get_columns('health_goal')]
+        rebuild_goals = 'met_mask' not in goal_columns
+        if rebuild_goals:
+            for column in (db.Column('current_streak', db.Integer, nullable=False, server_default='0'),
+                           db.Column('longest_streak', db.Integer, nullable=False, server_default='0'),
+                           db.Column('streak_end', db.Date),
+                           db.Column('met_mask', db.BigInteger, nullable=False, server_default='0'),
+                           db.Column('mask_date', db.Date),
+                           db.Column('first_entry_date', db.Date)):
+                migrations.add_column(conn, 'health_goal', column)
+            # Eski sürüm GET isteklerinde hedef oluşturabildiği için kullanıcı başına ilk kayıt tutulur.
+            # Alt sorgu türetilmiş tabloya sarılır: MySQL silinen tablodan doğrudan okumaya izin vermez (1093)
+            conn.execute(text('DELETE FROM health_goal WHERE id NOT IN '
+                              '(SELECT id FROM (SELECT MIN(id) AS id FROM health_goal GROUP BY user_id) AS keep)'))
+        migrations.create_index(conn, 'uq_health_goal_user', 'health_goal', ['user_id'], unique=True)
+        goal_entry_columns = [col['name'] for col in inspector.get_columns('health_goal_entry')]
+        if 'goals_met' not in goal_entry_columns:
+            migrations.add_column(conn, 'health_goal_entry',
+                                  db.Column('goals_met', db.Boolean, nullable=False, server_default=db.false()))
+            # Aynı güne ait tekrar eden girişlerden en son kaydedilen kalır
+            conn.execute(text('DELETE FROM health_goal_entry WHERE id NOT IN '
+                              '(SELECT id FROM (SELECT MAX(id) AS id FROM health_goal_entry GROUP BY user_id, date) AS keep)'))
+            rebuild_goals = True
+        migrations.create_index(conn, 'uq_health_goal_entry_user_date', 'health_goal_entry', ['user_id', 'date'], unique=True)
+        conn.commit()
+    if rebuild_goals:
+        backfill_goal_progress()
+
+def _migrate_summary_version():
+    with db.engine.connect() as conn:
+        if 'summary_version' not in [col['name'] for col in db.inspect(conn).get_columns('user')]:
+            migrations.add_column(conn, 'user', db.Column('summary_version', db.Integer, nullable=False, server_default='0'))
+        conn.commit()
+
+# Yeni şema değişiklikleri listenin sonuna yeni bir sürümle eklenir
+MIGRATIONS = (
+    migrations.Migration(1, 'Temel tablolar, öğün ve tahlil kolonları', _migrate_baseline),
+    migrations.Migration(2, 'Ruh hali testi ortalama kolonları', _migrate_mood_averages),
+    migrations.Migration(3, 'Kronik ölçüm sayısal kolonları, istatistikler ve anomali işaretleri', _migrate_measurements),
+    migrations.Migration(4, 'Analit tablosu', _migrate_lab_values),
+    migrations.Migration(5, 'Hedef serileri ve gün başına tek giriş', _migrate_goal_progress),
+    migrations.Migration(6, 'Panel özeti sürümü (işçiler arası önbellek geçersizleştirme)', _migrate_summary_version),
+)
+
+def migrate_db(force=False):
+    """Bring the schema up to the latest migration; run once per deploy, not per worker"""
+    applied = migrations.upgrade(db.engine, MIGRATIONS, force=force)
+    for migration in applied:
+        print(f"Şema sürümü {migration.version} uygulandı: {migration.description}")
+    if not applied:
+        print("Veritabanı şeması güncel.")
+    return applied
+
+# Motor içe aktarmada kurulduğu için create_app ile değiştirilemeyen ayarlar
+ENGINE_CONFIG_KEYS = ('SQLALCHEMY_DATABASE_URI', 'SQLALCHEMY_ENGINE_OPTIONS', 'SQLALCHEMY_BINDS')
+
+def create_app(config=None):
+    """Apply `config` to the application and check the schema version
+
+    Extensions are bound when this module is imported, so `flask --app app`
+    commands and WSGI servers pointed at `app:app` work without calling this;
+    the database engine is configured from the environment (DATABASE_URL,
+    SQLITE_*, DB_POOL_*) and cannot be changed here. Schema changes are not
+    applied either: the worker compares the recorded schema version with the
+    latest migration (one query) and warns when the deploy step
+    `flask --app app migrate-db` has not been run, unless AUTO_MIGRATE is set.
+    """
+    config = dict(config or {})
+    for key in ENGINE_CONFIG_KEYS:
+        if key in config and config[key] != app.config.get(key):
+            raise ValueError(f'{key} create_app ile değiştirilemez; uygulama içe aktarılmadan önce ortamdan ayarlayın.')
+    app.config.update(config)
+    with app.app_context():
+        version = migrations.current_version(db.engine)
+        latest = migrations.latest_version(MIGRATIONS)
+        if version < latest:
+            if app.config['AUTO_MIGRATE']:
+                migrate_db()
+            else:
+                print(f"Veritabanı şeması güncel değil (sürüm {version}, beklenen {latest}); "
+                      "'flask --app app migrate-db' komutunu çalıştırın.")
+    # Kan tahlili kurallarını ilk istekten önce derle
+    try:
+        blood_rules.engine.ruleset()
+    except FileNotFoundError:
+        print("Kan tahlili referans dosyası bulunamadı!")
+    return app
+
+@app.cli.command('migrate-db')
+@click.option('--force', is_flag=True, help='Tüm adımları yeniden çalıştırır (yarım kalmış şemaları onarır)')
+def migrate_db_command(force):
+    """Bekleyen şema geçişlerini uygular (dağıtım sırasında bir kez)."""
+    migrate_db(force=force)
+
+# Risk skorlama arka plan işçisi (istek akışını bekletmez)
+risk_scoring_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='risk-scoring')
+
+def score_test_result(test_result_id):
+    """Compute and store risk scores for one saved TestResult"""
+    with app.app_context():
+        test_result = db.session.get(TestResult, test_result_id)
+        if test_result is None:
+            return
+        user = test_result.user
+        profile = {'age': user.age, 'gender': user.gender, 'weight': user.weight, 'height': user.height}
+        try:
+            scores = score_blood_test(test_result.results_data, profile)
+            RiskScore.query.filter_by(test_result_id=test_result.id).delete()
+            for score in scores:
+                db.session.add(RiskScore(user_id=test_result.user_id, test_result_id=test_result.id, **score))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Risk skoru hesaplanamadı (TestResult {test_result_id}): {str(e)}")
+
+def schedule_risk_scoring(test_result_id):
+    if app.config['RISK_SCORING_ASYNC']:
+        risk_scoring_executor.submit(score_test_result, test_result_id)
+    else:
+        score_test_result(test_result_id)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Profil süreç içi önbellekten sorgusuz olarak bu isteğin oturumuna bağlanır
+    return user_cache.load(db.session, User, int(user_id))
+
+@app.route('/metrics')
+def prometheus_metrics():
+    token = app.config['METRICS_TOKEN']
+    if not token:
+        # Belirteç yapılandırılmadıysa uç nokta hiç yokmuş gibi davranır
+        return jsonify({'success': False, 'message': 'Bulunamadı.'}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return jsonify({'success': False, 'message': 'Yetkisiz erişim.'}), 401
+    return Response(histograms.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/database/info')
+@login_required
+def database_info():
+    return jsonify(database.describe(db.engine))
+
+@app.route('/api/user-cache/stats')
+@login_required
+def user_cache_stats():
+    return jsonify(user_cache.stats())
 
 # Routes
 @app.route('/')
+@response_cache.cached(CachePolicy(ttl=600))
 def index():
     return render_template('index.html')
 
@@ -295,7 +861,11 @@ def register():
             activity_level="sedentary",  # Varsayılan değer
             goal="maintain"              # Varsayılan değer
         )
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except HashingBusy:
+            flash('Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.')
+            return render_template('auth/register.html'), 503
         db.session.add(user)
         db.session.commit()
         
@@ -308,20 +878,142 @@ def login():
     if request.method == 'POST':
         email = request.form.get('email')
         password = request.form.get('password')
+        account_key = (email or '').strip().lower()
+        # Sınır aşıldıysa şifre özeti hiç hesaplanmaz
+        retry_after = max(ip_throttle.retry_after(request.remote_addr), account_throttle.retry_after(account_key))
+        if retry_after:
+            flash(f'Çok fazla başarısız giriş denemesi. Lütfen {math.ceil(retry_after / 60)} dakika sonra tekrar deneyin.')
+            return render_template('auth/login.html'), 429
         user = User.query.filter_by(email=email).first()
         
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except HashingBusy:
+            flash('Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.')
+            return render_template('auth/login.html'), 503
+        if valid:
+            account_throttle.reset(account_key)
+            # İş faktörü değiştiyse şifre yeni parametrelerle yeniden özetlenir
+            if password_hasher.needs_rehash(user.password_hash):
+                try:
+                    user.set_password(password)
+                except HashingBusy:
+                    pass  # Bir sonraki girişte yeniden denenir
             user.last_login = datetime.utcnow()
             db.session.commit()
             login_user(user)
             return redirect(url_for('dashboard'))
+        ip_throttle.failure(request.remote_addr)
+        account_throttle.failure(account_key)
         flash('Geçersiz e-posta veya şifre')
     return render_template('auth/login.html')
 
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    return render_template('main/dashboard.html')
+    summary = summary_cache.get_or_build(current_user.id, lambda: build_dashboard_summary(current_user.id),
+                                         version=summary_version(current_user.id))
+    return render_template('main/dashboard.html', summary=summary)
+
+@app.route('/api/dashboard-summary')
+@login_required
+def dashboard_summary():
+    return jsonify(summary_cache.get_or_build(current_user.id, lambda: build_dashboard_summary(current_user.id),
+                                              version=summary_version(current_user.id)))
+
+@app.route('/api/dashboard-summary/cache-stats')
+@login_required
+def dashboard_summary_cache_stats():
+    return jsonify(summary_cache.stats())
+
+def build_dashboard_summary(user_id):
+    """Everything the dashboard shows, in a fixed number of queries regardless of history length"""
+    today = date.today()
+    # 1) Bugünkü beslenme toplamları
+    nutrition = db.session.query(
+        db.func.count(Meal.id), db.func.sum(Meal.calories), db.func.sum(Meal.protein),
+        db.func.sum(Meal.carbs), db.func.sum(Meal.fat),
+    ).filter(Meal.user_id == user_id, Meal.date == today).one()
+    # 2) Son tahliller ve 3) en son tahlilin referans dışı analitleri
+    tests = (db.session.query(TestResult.id, TestResult.date, TestResult.recommendations)
+             .filter(TestResult.user_id == user_id)
+             .order_by(TestResult.date.desc(), TestResult.id.desc())
+             .limit(3)
+             .all())
+    lab_flags = []
+    if tests:
+        lab_flags = (db.session.query(LabValue.analyte, LabValue.value, LabValue.unit, LabValue.flag)
+                     .filter(LabValue.test_result_id == tests[0].id, LabValue.flag.in_(('low', 'high')))
+                     .all())
+    # 4) Hedefler ve bugünkü giriş
+    goal_row = (db.session.query(HealthGoal, HealthGoalEntry)
+                .outerjoin(HealthGoalEntry, db.and_(HealthGoalEntry.user_id == HealthGoal.user_id, HealthGoalEntry.date == today))
+                .filter(HealthGoal.user_id == user_id)
+                .first())
+    # 5) Son ruh hali testi
+    mood = (db.session.query(MoodStressTest.date, MoodStressTest.mood_avg, MoodStressTest.stress_avg)
+            .filter(MoodStressTest.user_id == user_id)
+            .order_by(MoodStressTest.date.desc())
+            .first())
+    # 6) Ölçüm türü başına son değerler (artımlı istatistiklerden) ve 7) son anomaliler
+    readings = MeasurementStats.query.filter_by(user_id=user_id).order_by(MeasurementStats.measurement_type).all()
+    anomalies = (db.session.query(ChronicMeasurement.date, ChronicMeasurement.measurement_type, ChronicMeasurement.value)
+                 .filter(ChronicMeasurement.user_id == user_id, ChronicMeasurement.is_anomaly.is_(True))
+                 .order_by(ChronicMeasurement.date.desc(), ChronicMeasurement.id.desc())
+                 .limit(5)
+                 .all())
+
+    goal_summary = None
+    goal_streak = None
+    if goal_row is not None:
+        goal, entry = goal_row
+        goal_summary = {
+            field: {
+                'target': getattr(goal, field),
+                'today': getattr(entry, field) if entry else None,
+                'percent': round(100 * getattr(entry, field) / getattr(goal, field))
+                if entry and getattr(entry, field) and getattr(goal, field) else 0,
+            }
+            for field in goal_progress.GOAL_FIELDS
+        }
+        goal_streak = {
+            'streak': goal.streak(today),
+            'longest_streak': goal.longest_streak,
+            'weekly_compliance': goal.compliance(goal_progress.WEEK_DAYS, today),
+            'met_today': bool(entry and entry.goals_met),
+        }
+    return {
+        'date': today.strftime('%d.%m.%Y'),
+        'nutrition': {
+            'meals': nutrition[0],
+            'calories': round(nutrition[1] or 0, 1),
+            'protein': round(nutrition[2] or 0, 1),
+            'carbs': round(nutrition[3] or 0, 1),
+            'fat': round(nutrition[4] or 0, 1),
+        },
+        'recent_tests': [
+            {'id': t.id, 'date': t.date.strftime('%d.%m.%Y'), 'recommendations': t.recommendations}
+            for t in tests
+        ],
+        'lab_flags': [
+            {'analyte': l.analyte, 'value': l.value, 'unit': l.unit, 'flag': l.flag}
+            for l in lab_flags
+        ],
+        'goals': goal_summary,
+        'goal_streak': goal_streak,
+        'mood': {
+            'date': mood.date.strftime('%d.%m.%Y'), 'mood': mood.mood_avg, 'stress': mood.stress_avg,
+        } if mood else None,
+        'readings': [
+            {'measurement_type': r.measurement_type, 'value': r.last_value,
+             'date': r.last_date.strftime('%d.%m.%Y') if r.last_date else None, 'ewma': r.ewma}
+            for r in readings
+        ],
+        'anomalies': [
+            {'date': a.date.strftime('%d.%m.%Y'), 'measurement_type': a.measurement_type, 'value': a.value}
+            for a in anomalies
+        ],
+    }
 
 @app.route('/profile', methods=['GET', 'POST'])
 @login_required
@@ -348,8 +1040,18 @@ def change_password():
     current_password = request.form.get('current_password')
     new_password = request.form.get('new_password')
     confirm_password = request.form.get('confirm_password')
+    account_key = current_user.email.strip().lower()
     
-    if not check_password_hash(current_user.password, current_password):
+    if account_throttle.retry_after(account_key):
+        flash('Çok fazla başarısız deneme. Lütfen daha sonra tekrar deneyin.', 'error')
+        return redirect(url_for('profile'))
+    try:
+        valid = current_user.check_password(current_password)
+    except HashingBusy:
+        flash('Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.', 'error')
+        return redirect(url_for('profile'))
+    if not valid:
+        account_throttle.failure(account_key)
         flash('Mevcut şifreniz yanlış.', 'error')
         return redirect(url_for('profile'))
         
@@ -362,7 +1064,7 @@ def change_password():
         return redirect(url_for('profile'))
         
     try:
-        current_user.password = generate_password_hash(new_password)
+        current_user.set_password(new_password)
         db.session.commit()
         flash('Şifreniz başarıyla değiştirildi.', 'success')
     except Exception as e:
@@ -441,7 +1143,7 @@ def meals():
         meals=meals,
         daily_totals=daily_totals,
         daily_goal=daily_goal,
-        food_db=FOOD_DB,
+        food_db=load_food_db(),
         selected_date=date_obj
     )
 
@@ -469,7 +1171,7 @@ def add_meal():
         return redirect(url_for('meals', date=date_str or ''))
     try:
         # Besin veritabanında ara
-        food = next((f for f in FOOD_DB if f['name'] == food_name), None)
+        food = next((f for f in load_food_db() if f['name'] == food_name), None)
         meal = Meal(
             user_id=current_user.id,
             meal_type=meal_type,
@@ -509,49 +1211,48 @@ def delete_meal(meal_id):
     
     return redirect(url_for('meals'))
 
+# Klinik yönlendirme için şikayet haritası (detaylı ve çoklu bölüm)
+REFERRAL_COMPLAINT_MAP = {
+    'karın ağrısı': 'Dahiliye, Gastroenteroloji, Genel Cerrahi',
+    'mide bulantısı': 'Dahiliye, Gastroenteroloji',
+    'ishal': 'Dahiliye, Gastroenteroloji, Enfeksiyon',
+    'kabızlık': 'Dahiliye, Gastroenteroloji',
+    'baş ağrısı': 'Nöroloji, Beyin Cerrahisi, Göz Hastalıkları',
+    'baş dönmesi': 'Nöroloji, KBB, Kardiyoloji',
+    'nefes darlığı': 'Göğüs Hastalıkları, Kardiyoloji, Acil',
+    'göğüs ağrısı': 'Kardiyoloji, Göğüs Hastalıkları, Acil',
+    'çarpıntı': 'Kardiyoloji, Dahiliye',
+    'ateş': 'Enfeksiyon Hastalıkları, Dahiliye, Çocuk Hastalıkları',
+    'cilt döküntüsü': 'Dermatoloji, Alerji, Enfeksiyon',
+    'kaşıntı': 'Dermatoloji, Alerji',
+    'eklem ağrısı': 'Fizik Tedavi, Romatoloji, Ortopedi',
+    'halsizlik': 'Dahiliye, Endokrinoloji',
+    'kilo kaybı': 'Endokrinoloji, Dahiliye',
+    'kilo alma': 'Endokrinoloji, Dahiliye',
+    'öksürük': 'Göğüs Hastalıkları, KBB, Çocuk Hastalıkları',
+    'boğaz ağrısı': 'KBB, Dahiliye, Çocuk Hastalıkları',
+    'kulak ağrısı': 'KBB',
+    'diş ağrısı': 'Diş Hekimliği',
+    'idrar yolu şikayetleri': 'Üroloji, Kadın Doğum, Dahiliye',
+    'kadın hastalıkları': 'Kadın Doğum',
+    'çocuk hastalıkları': 'Çocuk Sağlığı ve Hastalıkları',
+    'diğer': 'Aile Hekimliği'
+}
+
 @app.route('/referral', methods=['GET', 'POST'])
+@response_cache.cached(CachePolicy(ttl=600, datasets=('doctor_data',)))
 def referral():
-    # Klinik yönlendirme için şikayet haritası (detaylı ve çoklu bölüm)
-    complaint_map = {
-        'karın ağrısı': 'Dahiliye, Gastroenteroloji, Genel Cerrahi',
-        'mide bulantısı': 'Dahiliye, Gastroenteroloji',
-        'ishal': 'Dahiliye, Gastroenteroloji, Enfeksiyon',
-        'kabızlık': 'Dahiliye, Gastroenteroloji',
-        'baş ağrısı': 'Nöroloji, Beyin Cerrahisi, Göz Hastalıkları',
-        'baş dönmesi': 'Nöroloji, KBB, Kardiyoloji',
-        'nefes darlığı': 'Göğüs Hastalıkları, Kardiyoloji, Acil',
-        'göğüs ağrısı': 'Kardiyoloji, Göğüs Hastalıkları, Acil',
-        'çarpıntı': 'Kardiyoloji, Dahiliye',
-        'ateş': 'Enfeksiyon Hastalıkları, Dahiliye, Çocuk Hastalıkları',
-        'cilt döküntüsü': 'Dermatoloji, Alerji, Enfeksiyon',
-        'kaşıntı': 'Dermatoloji, Alerji',
-        'eklem ağrısı': 'Fizik Tedavi, Romatoloji, Ortopedi',
-        'halsizlik': 'Dahiliye, Endokrinoloji',
-        'kilo kaybı': 'Endokrinoloji, Dahiliye',
-        'kilo alma': 'Endokrinoloji, Dahiliye',
-        'öksürük': 'Göğüs Hastalıkları, KBB, Çocuk Hastalıkları',
-        'boğaz ağrısı': 'KBB, Dahiliye, Çocuk Hastalıkları',
-        'kulak ağrısı': 'KBB',
-        'diş ağrısı': 'Diş Hekimliği',
-        'idrar yolu şikayetleri': 'Üroloji, Kadın Doğum, Dahiliye',
-        'kadın hastalıkları': 'Kadın Doğum',
-        'çocuk hastalıkları': 'Çocuk Sağlığı ve Hastalıkları',
-        'diğer': 'Aile Hekimliği'
-    }
-    # Doktor verisi yükle
+    # Doktor verisi (desenler tek bir otomata derlenmiş halde)
     try:
-        with open('health_app/doctor_data.json', 'r', encoding='utf-8') as f:
-            doctor_data = json.load(f)
-            keyword_doctor_map = [(item['pattern'], item['doctor']) for item in doctor_data['keyword_doctor_map']]
-            all_doctors = doctor_data['all_doctors']
+        matcher = get_doctor_matcher()
     except FileNotFoundError:
         flash('Doktor verileri yüklenemedi.', 'error')
-        keyword_doctor_map = []
-        all_doctors = []
+        matcher = None
     # Klinik ve doktor önerileri için değişkenler
     complaint = None
     recommended_clinic = None
     matched_doctors = []
+    other_matches = []
     home_remedies = []
     doctor_recommendation = None
     # POST ise formdan gelen verileri işle
@@ -561,24 +1262,26 @@ def referral():
         complaint = select_complaint if select_complaint else text_complaint
         if not complaint:
             flash('Lütfen bir şikayet seçin veya yazın.', 'warning')
-            return render_template('referral.html', complaint=complaint, recommended_clinic=None, matched_doctors=[], home_remedies=[], doctor_recommendation=None)
+            return render_template('referral.html', complaint=complaint, recommended_clinic=None, matched_doctors=[], other_matches=[], home_remedies=[], doctor_recommendation=None)
         # Klinik yönlendirme
-        recommended_clinic = complaint_map.get(complaint, None)
-        # Doktor önerisi
-        for pattern, doc in keyword_doctor_map:
-            if re.search(pattern, complaint, re.IGNORECASE):
-                matched_doctors = [doc]
-                home_remedies = doc.get('home_remedies', [])
-                doctor_recommendation = doc.get('recommendation', '')
-                break
-        if not matched_doctors:
-            matched_doctors = all_doctors
+        recommended_clinic = REFERRAL_COMPLAINT_MAP.get(complaint, None)
+        # Doktor önerisi: tüm eşleşen uzmanlıklar tek taramada, sıralı
+        matches = matcher.match(complaint) if matcher else []
+        if matches:
+            doc = matches[0]['doctor']
+            matched_doctors = [doc]
+            other_matches = matches[1:]
+            home_remedies = doc.get('home_remedies', [])
+            doctor_recommendation = doc.get('recommendation', '')
+        else:
+            matched_doctors = matcher.all_doctors if matcher else []
             home_remedies = []
             doctor_recommendation = None
             flash('Şikayetinizle tam eşleşen bir uzman bulunamadı. Tüm doktorlar listeleniyor.', 'warning')
-    return render_template('referral.html', complaint=complaint, recommended_clinic=recommended_clinic, matched_doctors=matched_doctors, home_remedies=home_remedies, doctor_recommendation=doctor_recommendation)
+    return render_template('referral.html', complaint=complaint, recommended_clinic=recommended_clinic, matched_doctors=matched_doctors, other_matches=other_matches, home_remedies=home_remedies, doctor_recommendation=doctor_recommendation)
 
 @app.route('/blood-analysis', methods=['GET', 'POST'])
+@response_cache.cached(CachePolicy(ttl=60, datasets=('blood_test_references',)))
 def blood_analysis():
     analysis_result = None
     blood_tests = []
@@ -618,32 +1321,32 @@ def blood_analysis():
     return render_template('blood_analysis.html', analysis_result=analysis_result, blood_tests=blood_tests)
 
 @app.route('/doctor-recommendation', methods=['GET', 'POST'])
+@response_cache.cached(CachePolicy(ttl=600, datasets=('doctor_data',)))
 def doctor_recommendation():
-    # Load doctor data from JSON file
+    # Doktor verisi (desenler tek bir otomata derlenmiş halde)
     try:
-        with open('health_app/doctor_data.json', 'r', encoding='utf-8') as f:
-            doctor_data = json.load(f)
-            keyword_doctor_map = [(item['pattern'], item['doctor']) for item in doctor_data['keyword_doctor_map']]
-            all_doctors = doctor_data['all_doctors']
+        matcher = get_doctor_matcher()
     except FileNotFoundError:
         flash('Doktor verileri yüklenemedi.', 'error')
         return redirect(url_for('dashboard'))
 
     matched_doctors = []
+    other_matches = []
     complaint = None
     home_remedies = []
     doctor_recommendation = None
     
     if request.method == 'POST':
         complaint = request.form.get('complaint', '').strip()
-        for pattern, doc in keyword_doctor_map:
-            if re.search(pattern, complaint, re.IGNORECASE):
-                matched_doctors = [doc]
-                home_remedies = doc.get('home_remedies', [])
-                doctor_recommendation = doc.get('recommendation', '')
-                break
+        matches = matcher.match(complaint)
+        if matches:
+            doc = matches[0]['doctor']
+            matched_doctors = [doc]
+            other_matches = matches[1:]
+            home_remedies = doc.get('home_remedies', [])
+            doctor_recommendation = doc.get('recommendation', '')
     if not matched_doctors and request.method == 'POST':
-        matched_doctors = all_doctors
+        matched_doctors = matcher.all_doctors
         home_remedies = []
         doctor_recommendation = None
         flash('Şikayetinizle tam eşleşen bir uzman bulunamadı. Tüm doktorlar listeleniyor.', 'warning')
@@ -651,124 +1354,17 @@ def doctor_recommendation():
     return render_template('doctor_recommendation.html', 
                          complaint=complaint, 
                          matched_doctors=matched_doctors,
+                         other_matches=other_matches,
                          home_remedies=home_remedies,
                          doctor_recommendation=doctor_recommendation)
 
 def analyze_blood_test(results):
-    comments = []
-    general_recommendations = []
-    lifestyle_recommendations = []
-    
-    # Load blood test references
+    # Referans dosyası bir kez derlenir, dosya değişince yeniden yüklenir
     try:
-        with open('blood_test_references.json', 'r', encoding='utf-8') as f:
-            references = json.load(f)
+        return blood_rules.engine.analyze(results)
     except FileNotFoundError:
         return "Referans değerleri yüklenemedi."
 
-    # Hemogram analizleri
-    for test_key, test_data in results['hemogram'].items():
-        if test_key in references['hemogram'] and test_data not in [None, '']:
-            try:
-                value = float(test_data)
-                ref = references['hemogram'][test_key]
-                ref_range = ref['reference_range']
-                
-                if 'min' in ref_range and value < ref_range['min']:
-                    comments.append(ref['low']['comment'])
-                    general_recommendations.extend(ref['low']['recommendations'])
-                elif 'max' in ref_range and value > ref_range['max']:
-                    comments.append(ref['high']['comment'])
-                    general_recommendations.extend(ref['high']['recommendations'])
-                else:
-                    comments.append(ref['normal']['comment'])
-            except Exception as e:
-                comments.append(f"{ref['name']} değeri analiz edilemedi: {e}")
-
-    # Biyokimya analizleri
-    for test_key, test_data in results['biyokimya'].items():
-        if test_key in references['biyokimya'] and test_data not in [None, '']:
-            try:
-                value = float(test_data)
-                ref = references['biyokimya'][test_key]
-                ref_range = ref['reference_range']
-                
-                if 'min' in ref_range and value < ref_range['min']:
-                    comments.append(ref['low']['comment'])
-                    general_recommendations.extend(ref['low']['recommendations'])
-                elif 'max' in ref_range and value > ref_range['max']:
-                    comments.append(ref['high']['comment'])
-                    general_recommendations.extend(ref['high']['recommendations'])
-                else:
-                    comments.append(ref['normal']['comment'])
-            except Exception as e:
-                comments.append(f"{ref['name']} değeri analiz edilemedi: {e}")
-
-    # Lipid profili analizi
-    lipid_status = []
-    for test_key, test_data in results['biyokimya'].items():
-        if test_key in references['lipid'] and test_data not in [None, '']:
-            try:
-                value = float(test_data)
-                ref = references['lipid'][test_key]
-                ref_range = ref['reference_range']
-                
-                if 'min' in ref_range and value < ref_range['min']:
-                    lipid_status.append(f"düşük {ref['name']}")
-                    general_recommendations.extend(ref['low']['recommendations'])
-                elif 'max' in ref_range and value > ref_range['max']:
-                    lipid_status.append(f"yüksek {ref['name']}")
-                    general_recommendations.extend(ref['high']['recommendations'])
-            except Exception as e:
-                comments.append(f"{ref['name']} değeri analiz edilemedi: {e}")
-
-    if lipid_status:
-        comments.append(f'Lipid profilinizde {", ".join(lipid_status)} tespit edildi. Kardiyovasküler risk faktörlerini azaltmak için öneriler:')
-        lifestyle_recommendations.extend(references['lifestyle_recommendations']['lipid_abnormal'])
-
-    # Vitamin ve mineral analizleri
-    vitamin_status = []
-    for test_key, test_data in results['vitamin_mineral'].items():
-        if test_key in references['vitamin_mineral'] and test_data not in [None, '']:
-            try:
-                value = float(test_data)
-                ref = references['vitamin_mineral'][test_key]
-                ref_range = ref['reference_range']
-                
-                if 'min' in ref_range and value < ref_range['min']:
-                    vitamin_status.append(f"düşük {ref['name']}")
-                    general_recommendations.extend(ref['low']['recommendations'])
-            except Exception as e:
-                comments.append(f"{ref['name']} değeri analiz edilemedi: {e}")
-
-    if vitamin_status:
-        comments.append(f'Vitamin profilinizde {", ".join(vitamin_status)} tespit edildi. Öneriler:')
-        lifestyle_recommendations.extend(references['lifestyle_recommendations']['vitamin_deficiency'])
-
-    # Genel değerlendirme ve öneriler
-    if not comments:
-        comments.append('Tüm değerler referans aralığında görünüyor.')
-        lifestyle_recommendations.extend(references['lifestyle_recommendations']['all_normal'])
-
-    # Sonuç raporu oluşturma
-    report = []
-    report.append("KAN TAHLİLİ ANALİZ RAPORU")
-    report.append("=" * 30)
-    report.append("\nDEĞERLENDİRME:")
-    report.extend(comments)
-    
-    if general_recommendations:
-        report.append("\nÖNERİLER:")
-        report.extend([f"• {rec}" for rec in set(general_recommendations)])
-    
-    if lifestyle_recommendations:
-        report.append("\nYAŞAM TARZI ÖNERİLERİ:")
-        report.extend([f"• {rec}" for rec in set(lifestyle_recommendations)])
-    
-    report.append("\nNOT: Bu değerlendirme genel bilgi amaçlıdır. Kesin tanı ve tedavi için mutlaka bir hekime başvurunuz.")
-    
-    return "\n".join(report)
-
 @app.route('/blood-test', methods=['GET', 'POST'])
 @login_required
 def blood_test():
@@ -807,6 +1403,7 @@ def blood_test():
         notes = request.form.get('notes')
         # Otomatik analiz ve öneri
         auto_comment = analyze_blood_test(results)
+        reference_version = blood_rules.engine.ruleset().version
         # Kullanıcı notu varsa ekle
         if notes:
             recommendations = auto_comment + '\n\nKullanıcı Notu: ' + notes
@@ -817,14 +1414,130 @@ def blood_test():
             user_id=current_user.id,
             date=datetime.strptime(test_date, '%Y-%m-%d'),
             results_data=results,
-            recommendations=recommendations
+            recommendations=recommendations,
+            reference_version=reference_version
         )
         db.session.add(test_result)
+        db.session.flush()
+        # Analit değerleri dar tabloya da yazılır
+        lab_values = lab_value_rows(test_result.id, current_user.id, test_result.date, results, blood_rules.engine.ruleset())
+        if lab_values:
+            db.session.execute(db.insert(LabValue), lab_values)
         db.session.commit()
+        # Tahlil listesi gösteren sayfa bu kullanıcı için yeniden çizilmeli
+        response_cache.invalidate(endpoint='blood_analysis', user_id=current_user.id)
+        schedule_risk_scoring(test_result.id)
         flash('Tahlil sonuçları başarıyla kaydedildi.')
         return redirect(url_for('dashboard'))
     return render_template('main/blood_test.html')
 
+USER_NOTE_MARKER = '\n\nKullanıcı Notu: '
+
+def reanalyze_test_results(batch_size=500, only_stale=True):
+    """Recompute stored recommendations with the current reference rules
+
+    Rows are streamed in id order, analyzed batch-wise and written back with one
+    bulk UPDATE per batch. With only_stale, rows already analyzed with the current
+    reference version are skipped. PDF uploads use a different analyzer and are left alone.
+    """
+    ruleset = blood_rules.engine.ruleset()
+    query = (db.session.query(TestResult.id, TestResult.user_id, TestResult.date, TestResult.results_data, TestResult.recommendations)
+             .filter(TestResult.pdf_path.is_(None)))
+    if only_stale:
+        query = query.filter(db.or_(TestResult.reference_version.is_(None), TestResult.reference_version != ruleset.version))
+    last_id = 0
+    updated = 0
+    while True:
+        rows = query.filter(TestResult.id > last_id).order_by(TestResult.id).limit(batch_size).all()
+        if not rows:
+            break
+        reports = ruleset.analyze_batch([row.results_data for row in rows])
+        changes = []
+        for row, report in zip(rows, reports):
+            # Kullanıcı notu önerilerin sonunda saklanıyor, korunmalı
+            _, marker, note = (row.recommendations or '').partition(USER_NOTE_MARKER)
+            changes.append({'id': row.id, 'recommendations': report + marker + note, 'reference_version': ruleset.version})
+        # Referans aralıkları değiştiyse analit işaretleri de güncellenir
+        lab_values = []
+        for row in rows:
+            lab_values.extend(lab_value_rows(row.id, row.user_id, row.date, row.results_data, ruleset))
+        try:
+            db.session.execute(db.update(TestResult), changes)
+            LabValue.query.filter(LabValue.test_result_id.in_([row.id for row in rows])).delete(synchronize_session=False)
+            if lab_values:
+                db.session.execute(db.insert(LabValue), lab_values)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        updated += len(changes)
+        last_id = rows[-1].id
+    if updated:
+        response_cache.invalidate(endpoint='blood_analysis')
+        invalidate_all_summaries()
+    return updated
+
+@app.cli.command('reanalyze-tests')
+@click.option('--batch-size', default=500, show_default=True, help='Bir işlemde güncellenecek satır sayısı')
+@click.option('--all', 'reanalyze_all', is_flag=True, help='Güncel sürümle analiz edilmiş satırları da yeniden işle')
+def reanalyze_tests_command(batch_size, reanalyze_all):
+    """Referans aralıkları değiştiğinde kayıtlı tahlil önerilerini yeniden üretir."""
+    updated = reanalyze_test_results(batch_size=batch_size, only_stale=not reanalyze_all)
+    print(f"{updated} tahlil sonucu yeniden analiz edildi (referans sürümü {blood_rules.engine.ruleset().version}).")
+
+@app.cli.command('backfill-measurements')
+@click.option('--batch-size', default=1000, show_default=True, help='Bir işlemde güncellenecek satır sayısı')
+@click.option('--all', 'reparse_all', is_flag=True, help='Sayısal değeri olan satırları da yeniden ayrıştır')
+def backfill_measurements_command(batch_size, reparse_all):
+    """Kronik ölçüm metinlerini sayısal sütunlara ayrıştırır."""
+    updated = backfill_measurement_values(batch_size=batch_size, only_missing=not reparse_all)
+    print(f"{updated} ölçüm işlendi.")
+
+@app.cli.command('rebuild-measurement-stats')
+@click.option('--batch-size', default=1000, show_default=True, help='Veritabanından bir seferde okunacak satır sayısı')
+def rebuild_measurement_stats_command(batch_size):
+    """Ölçüm istatistiklerini ve anomali işaretlerini tüm geçmişten yeniden hesaplar."""
+    rebuilt = rebuild_measurement_stats(batch_size=batch_size)
+    print(f"{rebuilt} kullanıcı/ölçüm türü istatistiği yeniden hesaplandı.")
+
+@app.cli.command('rebuild-goal-progress')
+@click.option('--batch-size', default=1000, show_default=True, help='Bir işlemde güncellenecek giriş sayısı')
+def rebuild_goal_progress_command(batch_size):
+    """Hedef girişlerini yeniden değerlendirir, serileri ve uyum oranlarını yeniden hesaplar."""
+    rebuilt = backfill_goal_progress(batch_size=batch_size)
+    print(f"{rebuilt} kullanıcının hedef serisi yeniden hesaplandı.")
+
+@app.cli.command('backfill-lab-values')
+@click.option('--batch-size', default=500, show_default=True, help='Bir işlemde işlenecek tahlil sayısı')
+def backfill_lab_values_command(batch_size):
+    """Kayıtlı tahlil sonuçlarından analit tablosunu yeniden oluşturur."""
+    processed = backfill_lab_values(batch_size=batch_size)
+    print(f"{processed} tahlil sonucu analit tablosuna aktarıldı.")
+
+@app.route('/api/lab-trends/<analyte>')
+@login_required
+def lab_trend(analyte):
+    """One analyte over time (optional panel, start, end), read from the narrow lab_value table"""
+    query = (db.session.query(LabValue.date, LabValue.panel, LabValue.value, LabValue.unit, LabValue.flag)
+             .filter(LabValue.user_id == current_user.id, LabValue.analyte == analyte))
+    if request.args.get('panel'):
+        query = query.filter(LabValue.panel == request.args['panel'])
+    try:
+        if request.args.get('start'):
+            query = query.filter(LabValue.date >= datetime.strptime(request.args['start'], '%Y-%m-%d'))
+        if request.args.get('end'):
+            query = query.filter(LabValue.date < datetime.strptime(request.args['end'], '%Y-%m-%d') + timedelta(days=1))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Tarihler YYYY-MM-DD biçiminde olmalıdır.'}), 400
+    rows = query.order_by(LabValue.date).all()
+    return jsonify({
+        'analyte': analyte,
+        'values': [
+            {'date': row.date.strftime('%Y-%m-%d'), 'panel': row.panel, 'value': row.value, 'unit': row.unit, 'flag': row.flag}
+            for row in rows
+        ]
+    })
+
 @app.route('/blood-test-detail/<int:test_id>')
 @login_required
 def blood_test_detail(test_id):
@@ -841,65 +1554,94 @@ def kriz_analizleri():
     prediction_type = None
     
     # Get user's blood test results and ensure proper serialization
-    blood_tests = TestResult.query.filter_by(user_id=current_user.id).order_by(TestResult.date.desc()).all()
-    
-    # Debug için kan tahlili sonuçlarını kontrol et
-    for test in blood_tests:
-        if test.results_data:
-            print(f"Test ID: {test.id}, Date: {test.date}")
-            print(f"Results data: {test.results_data}")
-    
+    with timed(RISK_STAGE_METRIC, stage='db_load', model='all'):
+        blood_tests = TestResult.query.filter_by(user_id=current_user.id).order_by(TestResult.date.desc()).all()
+
+        # Tahlil kaydedilirken önceden hesaplanmış risk skorları
+        risk_scores = {}
+        for score in RiskScore.query.filter_by(user_id=current_user.id).all():
+            risk_scores.setdefault(score.test_result_id, {})[score.model_name] = score
+
     if request.method == 'POST':
         try:
             prediction_type = request.form.get('prediction_type')
             
             if prediction_type == 'diabetes':
                 # Get diabetes form data
-                pregnancies = float(request.form.get('pregnancies'))
-                glucose = float(request.form.get('glucose'))
-                blood_pressure = float(request.form.get('blood_pressure'))
-                skin_thickness = float(request.form.get('skin_thickness'))
-                insulin = float(request.form.get('insulin'))
-                bmi = float(request.form.get('bmi'))
-                diabetes_pedigree = float(request.form.get('diabetes_pedigree'))
-                age = float(request.form.get('age'))
-
-                # Load the diabetes model
-                diabetes_model = pickle.load(open('saved_models/diabetes_model.sav', 'rb'))
-
-                # Make prediction
-                prediction = diabetes_model.predict([[pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, diabetes_pedigree, age]])[0]
+                with timed(RISK_STAGE_METRIC, stage='parse', model='diabetes'):
+                    pregnancies = float(request.form.get('pregnancies'))
+                    glucose = float(request.form.get('glucose'))
+                    blood_pressure = float(request.form.get('blood_pressure'))
+                    skin_thickness = float(request.form.get('skin_thickness'))
+                    insulin = float(request.form.get('insulin'))
+                    bmi = float(request.form.get('bmi'))
+                    diabetes_pedigree = float(request.form.get('diabetes_pedigree'))
+                    age = float(request.form.get('age'))
+
+                # Make prediction (aynı değerler tekrar gönderilirse önbellekten döner)
+                prediction, _ = predict_one('diabetes', [pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, diabetes_pedigree, age])
                 
             elif prediction_type == 'heart':
                 # Get heart disease form data
-                age = float(request.form.get('heart_age'))
-                sex = float(request.form.get('sex'))
-                cp = float(request.form.get('cp'))
-                trestbps = float(request.form.get('trestbps'))
-                chol = float(request.form.get('chol'))
-                fbs = float(request.form.get('fbs'))
-                restecg = float(request.form.get('restecg'))
-                thalach = float(request.form.get('thalach'))
-                exang = float(request.form.get('exang'))
-                oldpeak = float(request.form.get('oldpeak'))
-                slope = float(request.form.get('slope'))
-                ca = float(request.form.get('ca'))
-                thal = float(request.form.get('thal'))
-
-                # Load the heart disease model
-                heart_disease_model = pickle.load(open('saved_models/heart_disease_model.sav', 'rb'))
-
-                # Make prediction
-                prediction = heart_disease_model.predict([[age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]])[0]
+                with timed(RISK_STAGE_METRIC, stage='parse', model='heart'):
+                    age = float(request.form.get('heart_age'))
+                    sex = float(request.form.get('sex'))
+                    cp = float(request.form.get('cp'))
+                    trestbps = float(request.form.get('trestbps'))
+                    chol = float(request.form.get('chol'))
+                    fbs = float(request.form.get('fbs'))
+                    restecg = float(request.form.get('restecg'))
+                    thalach = float(request.form.get('thalach'))
+                    exang = float(request.form.get('exang'))
+                    oldpeak = float(request.form.get('oldpeak'))
+                    slope = float(request.form.get('slope'))
+                    ca = float(request.form.get('ca'))
+                    thal = float(request.form.get('thal'))
+
+                # Make prediction (aynı değerler tekrar gönderilirse önbellekten döner)
+                prediction, _ = predict_one('heart', [age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal])
 
         except Exception as e:
             flash(f'Bir hata oluştu: {str(e)}', 'error')
             return redirect(url_for('kriz_analizleri'))
 
-    return render_template('kriz_analizleri.html', 
-                         prediction=prediction, 
-                         prediction_type=prediction_type,
-                         blood_tests=blood_tests)
+    # Etiket yalnızca bilinen modellerden seçilir; formdan gelen serbest değer yeni seri açamaz
+    model_label = prediction_type if prediction_type in MODEL_FEATURES else ('unknown' if prediction_type else 'none')
+    with timed(RISK_STAGE_METRIC, stage='render', model=model_label):
+        return render_template('kriz_analizleri.html', 
+                             prediction=prediction, 
+                             prediction_type=prediction_type,
+                             blood_tests=blood_tests,
+                             risk_scores=risk_scores)
+
+@app.route('/api/risk/<model_name>/predict-batch', methods=['POST'])
+@login_required
+def risk_predict_batch(model_name):
+    if model_name not in MODEL_FEATURES:
+        return jsonify({'success': False, 'message': 'Model bulunamadı.'}), 404
+    data = request.get_json(silent=True) or {}
+    rows = data.get('rows')
+    max_rows = app.config['RISK_BATCH_MAX_ROWS']
+    if isinstance(rows, list) and len(rows) > max_rows:
+        return jsonify({'success': False, 'message': f'Bir istekte en fazla {max_rows} satır gönderilebilir.'}), 413
+    try:
+        result = predict_batch(model_name, rows, max_rows=max_rows)
+    except BatchValidationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    result['success'] = True
+    result['features'] = MODEL_FEATURES[model_name]
+    return jsonify(result)
+
+@app.route('/api/risk/cache-stats')
+@login_required
+def risk_cache_stats():
+    return jsonify(prediction_cache.stats())
+
+@app.route('/api/risk/timings')
+@login_required
+def risk_timings():
+    # Aşama bazında (db_load, parse, model_load, validation, inference, render) süre histogramları
+    return jsonify(histograms.snapshot(RISK_STAGE_METRIC))
 
 @app.route('/search-food', methods=['GET'])
 @login_required
@@ -910,7 +1652,7 @@ def search_food():
     
     # Besin veritabanında arama yap
     results = []
-    for food in FOOD_DB:
+    for food in load_food_db():
         if query in food.get('name', '').lower():
             results.append({
                 'id': food.get('id'),
@@ -932,7 +1674,7 @@ def calculate_nutrition():
     portion = float(data.get('portion', 100))
     
     # Besin bilgilerini bul
-    food = next((f for f in FOOD_DB if f.get('id') == food_id), None)
+    food = next((f for f in load_food_db() if f.get('id') == food_id), None)
     if not food:
         return jsonify({'error': 'Besin bulunamadı'}), 404
     
@@ -980,15 +1722,20 @@ def chronic_tracking():
             entry_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else date.today()
         except Exception:
             entry_date = date.today()
+        value_primary, value_secondary, unit = parse_measurement(measurement_type, value)
         entry = ChronicMeasurement(
             user_id=current_user.id,
             date=entry_date,
             disease_type=disease_type,
             measurement_type=measurement_type,
             value=value,
+            value_primary=value_primary,
+            value_secondary=value_secondary,
+            unit=unit,
             note=note
         )
         db.session.add(entry)
+        record_measurement_stats(entry)
         db.session.commit()
         flash('Ölçüm kaydedildi.', 'success')
         return redirect(url_for('chronic_tracking'))
@@ -999,104 +1746,150 @@ def chronic_tracking():
 @app.route('/chronic-tracking/data')
 @login_required
 def chronic_tracking_data():
-    # Tüm ölçümleri JSON olarak döndür (grafik için)
-    measurements = ChronicMeasurement.query.filter_by(user_id=current_user.id).order_by(ChronicMeasurement.date.asc()).all()
-    data = [
-        {
+    """Measurements for charts
+
+    Query parameters: start/end (YYYY-MM-DD), measurement_type, limit and after
+    (keyset cursor returned as next_cursor). With points=N each measurement type
+    is downsampled to at most N points (method=lttb or minmax) instead of paginated;
+    ranges holding more than CHRONIC_DATA_MAX_SOURCE_ROWS measurements are rejected.
+    """
+    try:
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else None
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Tarihler YYYY-MM-DD biçiminde olmalıdır.'}), 400
+    measurement_type = request.args.get('measurement_type')
+    points = request.args.get('points', type=int)
+    method = request.args.get('method', 'lttb')
+    if method not in DOWNSAMPLE_METHODS:
+        return jsonify({'success': False, 'message': f'Geçersiz yöntem: {method}'}), 400
+    if points is not None and not 3 <= points <= app.config['CHRONIC_DATA_MAX_POINTS']:
+        return jsonify({'success': False, 'message': f"points 3 ile {app.config['CHRONIC_DATA_MAX_POINTS']} arasında olmalıdır."}), 400
+
+    query = (db.session.query(ChronicMeasurement.id, ChronicMeasurement.date, ChronicMeasurement.disease_type,
+                              ChronicMeasurement.measurement_type, ChronicMeasurement.value,
+                              ChronicMeasurement.value_primary, ChronicMeasurement.value_secondary, ChronicMeasurement.unit)
+             .filter(ChronicMeasurement.user_id == current_user.id))
+    if measurement_type:
+        query = query.filter(ChronicMeasurement.measurement_type == measurement_type)
+    if start:
+        query = query.filter(ChronicMeasurement.date >= start)
+    if end:
+        query = query.filter(ChronicMeasurement.date <= end)
+
+    def serialize(m):
+        return {
             'date': m.date.strftime('%Y-%m-%d'),
             'disease_type': m.disease_type,
             'measurement_type': m.measurement_type,
-            'value': m.value
+            'value': m.value,
+            'value_primary': m.value_primary,
+            'value_secondary': m.value_secondary,
+            'unit': m.unit
         }
-        for m in measurements
-    ]
-    return jsonify(data)
+
+    if points is not None:
+        # Her ölçüm türü ayrı ayrı seyreltilir; yanıt boyutu geçmişin uzunluğundan bağımsızdır.
+        # Seri yalnızca (id, gün, değer) olarak parça parça okunur, tam satırlar seçilen noktalar için çekilir
+        max_rows = app.config['CHRONIC_DATA_MAX_SOURCE_ROWS']
+        series_rows = (query.with_entities(ChronicMeasurement.id, ChronicMeasurement.measurement_type,
+                                           ChronicMeasurement.date, ChronicMeasurement.value_primary)
+                       .filter(ChronicMeasurement.value_primary.isnot(None))
+                       .order_by(ChronicMeasurement.measurement_type, ChronicMeasurement.date, ChronicMeasurement.id)
+                       .limit(max_rows + 1)
+                       .execution_options(yield_per=app.config['CHRONIC_DATA_PAGE_SIZE']))
+        series = {}  # ölçüm türü -> (id, gün, değer) dizileri
+        total = 0
+        for row in series_rows:
+            total += 1
+            if total > max_rows:
+                break
+            ids, days, values = series.setdefault(row.measurement_type, (array('q'), array('d'), array('d')))
+            ids.append(row.id)
+            days.append(row.date.toordinal())
+            values.append(row.value_primary)
+        if total > max_rows:
+            return jsonify({'success': False, 'message': f'Seçilen aralıkta {max_rows} ölçümden fazlası var; lütfen tarih aralığını daraltın.'}), 400
+        selected = []
+        for ids, days, values in series.values():
+            keep = downsample(np.frombuffer(days), np.frombuffer(values), points, method)
+            selected.extend(np.frombuffer(ids, dtype=np.int64)[keep].tolist())
+        rows = (query.filter(ChronicMeasurement.id.in_(selected))
+                .order_by(ChronicMeasurement.measurement_type, ChronicMeasurement.date, ChronicMeasurement.id)
+                .all()) if selected else []
+        data = [serialize(m) for m in rows]
+        return jsonify({'measurements': data, 'total': total, 'downsampled': len(data) < total, 'next_cursor': None})
+
+    limit = min(request.args.get('limit', app.config['CHRONIC_DATA_PAGE_SIZE'], type=int), app.config['CHRONIC_DATA_PAGE_SIZE'])
+    after = request.args.get('after')
+    if after:
+        try:
+            after_date, after_id = after.split(':')
+            after_date = datetime.strptime(after_date, '%Y-%m-%d').date()
+            after_id = int(after_id)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Geçersiz imleç.'}), 400
+        query = query.filter(db.or_(ChronicMeasurement.date > after_date,
+                                    db.and_(ChronicMeasurement.date == after_date, ChronicMeasurement.id > after_id)))
+    rows = query.order_by(ChronicMeasurement.date, ChronicMeasurement.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1].date.strftime('%Y-%m-%d')}:{rows[-1].id}"
+    return jsonify({'measurements': [serialize(m) for m in rows], 'downsampled': False, 'next_cursor': next_cursor})
+
+@app.route('/api/measurement-stats')
+@login_required
+def measurement_stats():
+    stats = MeasurementStats.query.filter_by(user_id=current_user.id).order_by(MeasurementStats.measurement_type).all()
+    return jsonify([s.to_dict() for s in stats])
+
+@app.route('/api/measurement-anomalies')
+@login_required
+def measurement_anomalies():
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    anomalies = (ChronicMeasurement.query
+                 .filter_by(user_id=current_user.id, is_anomaly=True)
+                 .order_by(ChronicMeasurement.date.desc(), ChronicMeasurement.id.desc())
+                 .limit(limit)
+                 .all())
+    return jsonify([
+        {
+            'date': m.date.strftime('%Y-%m-%d'),
+            'measurement_type': m.measurement_type,
+            'value': m.value,
+            'anomaly_score': m.anomaly_score
+        }
+        for m in anomalies
+    ])
 
 @app.route('/mood-stress-test', methods=['GET', 'POST'])
 @login_required
+@response_cache.cached(CachePolicy(ttl=600, datasets=('mood_test_data',)))
 def mood_stress_test():
-    # Load test data from JSON file
+    # Derlenmiş anket (soru id -> kategori dizini, kategori eşik tabloları)
     try:
-        with open('health_app/mood_test_data.json', 'r', encoding='utf-8') as f:
-            test_data = json.load(f)
-            questions = test_data['questions']
-            feedback_data = test_data['feedback']
-            general_analysis_data = test_data['general_analysis']
+        scorer = get_mood_scorer()
+        questions = scorer.questions
     except FileNotFoundError:
         flash('Test verileri yüklenemedi.', 'error')
         return redirect(url_for('dashboard'))
 
     if request.method == 'POST':
-        scores = {}
-        counts = {}
-        answers = {}
-        for q in questions:
-            val = request.form.get(q['id'])
-            if val is not None:
-                answers[q['id']] = int(val)
-                cat = q['category']
-                scores[cat] = scores.get(cat, 0) + int(val)
-                counts[cat] = counts.get(cat, 0) + 1
-
-        # Ortalama skorlar
-        avgs = {cat: round(scores[cat]/counts[cat], 2) if counts[cat] else 0 for cat in scores}
-        
-        # Yorumlar ve emojiler
-        feedback = {}
-        for cat in avgs:
-            avg = avgs[cat]
-            cat_feedback = feedback_data[cat]
-            
-            # Find appropriate feedback level based on thresholds
-            feedback_level = None
-            for level, data in cat_feedback.items():
-                if 'threshold' in data and avg >= data['threshold']:
-                    feedback_level = level
-                    break
-            
-            # If no threshold matched, use the lowest level
-            if feedback_level is None:
-                feedback_level = list(cat_feedback.keys())[-1]
-            
-            feedback[cat] = {
-                'avg': avg,
-                'text': cat_feedback[feedback_level]['text'],
-                'emoji': cat_feedback[feedback_level]['emoji']
-            }
-
-        # Genel analiz
-        low_cats = [cat for cat, v in feedback.items() if v['avg'] < 1.2]
-        high_cats = [cat for cat, v in feedback.items() if v['avg'] > 2.2]
-        
-        general_analysis = ""
-        if len(low_cats) >= general_analysis_data['multiple_low']['threshold']:
-            general_analysis = general_analysis_data['multiple_low']['text']
-        elif ('stress' in feedback and 
-              feedback['stress']['avg'] > general_analysis_data['stress_motivation']['stress_threshold'] and 
-              'motivation' in feedback and 
-              feedback['motivation']['avg'] < general_analysis_data['stress_motivation']['motivation_threshold']):
-            general_analysis = general_analysis_data['stress_motivation']['text']
-        elif len(high_cats) >= general_analysis_data['multiple_high']['threshold']:
-            general_analysis = general_analysis_data['multiple_high']['text']
-        else:
-            # Kategoriye özel öneriler
-            suggestions = []
-            for cat in feedback:
-                if feedback[cat]['avg'] < 1.5:
-                    if cat in feedback_data and 'low' in feedback_data[cat]:
-                        suggestions.append(feedback_data[cat]['low']['text'])
-            
-            if suggestions:
-                general_analysis = "\n".join(suggestions)
-            else:
-                general_analysis = general_analysis_data['default']
+        answers = scorer.collect_answers(request.form)
+        result = scorer.score(answers)
+        scores = result['scores']
+        feedback = result['feedback']
 
         # Kaydet
         test = MoodStressTest(
             user_id=current_user.id,
             mood_score=scores.get('mood', 0),
             stress_score=scores.get('stress', 0),
-            result_json=feedback
+            result_json=feedback,
+            mood_avg=feedback.get('mood', {}).get('avg'),
+            stress_avg=feedback.get('stress', {}).get('avg'),
+            answers=answers
         )
         db.session.add(test)
         db.session.commit()
@@ -1105,96 +1898,209 @@ def mood_stress_test():
                              questions=questions, 
                              result=feedback, 
                              answers=answers, 
-                             general_analysis=general_analysis)
+                             general_analysis=result['general_analysis'])
     
     return render_template('mood_stress_test.html', questions=questions)
 
+@app.route('/api/mood/score-batch', methods=['POST'])
+@login_required
+def mood_score_batch():
+    """Score many imported answer sets at once (research exports)"""
+    data = request.get_json(silent=True) or {}
+    answer_sets = data.get('answer_sets')
+    if not isinstance(answer_sets, list) or not all(isinstance(a, dict) for a in answer_sets):
+        return jsonify({'success': False, 'message': 'answer_sets bir cevap sözlükleri listesi olmalıdır.'}), 400
+    max_rows = app.config['MOOD_BATCH_MAX_ROWS']
+    if len(answer_sets) > max_rows:
+        return jsonify({'success': False, 'message': f'Bir istekte en fazla {max_rows} cevap seti gönderilebilir.'}), 413
+    scorer = get_mood_scorer()
+    try:
+        results = scorer.score_batch(answer_sets)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Cevap değerleri tam sayı olmalıdır.'}), 400
+    return jsonify({'success': True, 'version': scorer.version, 'results': results})
+
+@app.cli.command('export-mood-scores')
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option('--batch-size', default=1000, show_default=True, help='Bir seferde skorlanacak test sayısı')
+def export_mood_scores_command(output, batch_size):
+    """Kayıtlı ruh hali testlerini güncel anketle yeniden skorlayıp CSV olarak dışa aktarır."""
+    scorer = get_mood_scorer()
+    columns = ['test_id', 'user_id', 'date'] + [f'{cat}_avg' for cat in scorer.categories] + ['general_analysis']
+    exported = 0
+    last_id = 0
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        while True:
+            tests = (MoodStressTest.query
+                     .filter(MoodStressTest.id > last_id, MoodStressTest.answers.isnot(None))
+                     .order_by(MoodStressTest.id)
+                     .limit(batch_size)
+                     .all())
+            if not tests:
+                break
+            last_id = tests[-1].id
+            for test, result in zip(tests, scorer.score_batch([t.answers for t in tests])):
+                writer.writerow(
+                    [test.id, test.user_id, test.date.isoformat()]
+                    + [result['feedback'].get(cat, {}).get('avg', '') for cat in scorer.categories]
+                    + [result['general_analysis']]
+                )
+            exported += len(tests)
+    print(f"{exported} ruh hali testi {output} dosyasına aktarıldı (anket sürümü {scorer.version}).")
+
 @app.route('/health-trends')
 @login_required
 def health_trends():
+    windows = app.config['HEALTH_TRENDS_WINDOWS']
+    window = request.args.get('window', type=int)
+    if window not in windows:
+        window = app.config['HEALTH_TRENDS_DEFAULT_WINDOW']
+    since = date.today() - timedelta(days=window)
+    # Yalnızca seçilen penceredeki kayıtlar okunur, (user_id, date) indeksi kullanılır
+    window_tests = MoodStressTest.query.filter(
+        MoodStressTest.user_id == current_user.id,
+        MoodStressTest.date >= datetime.combine(since, datetime.min.time()),
+    )
     # Duygu & stres testleri
-    mood_tests = MoodStressTest.query.filter_by(user_id=current_user.id).order_by(MoodStressTest.date.asc()).all()
-    mood_data = [{'date': t.date.strftime('%Y-%m-%d'), 'mood': t.result_json.get('mood', {}).get('avg', None), 'stress': t.result_json.get('stress', {}).get('avg', None)} for t in mood_tests]
+    mood_rows = (window_tests
+                 .with_entities(MoodStressTest.date, MoodStressTest.mood_avg, MoodStressTest.stress_avg)
+                 .order_by(MoodStressTest.date.asc(), MoodStressTest.id.asc())
+                 .all())
+    mood_data = [{'date': row.date.strftime('%Y-%m-%d'), 'mood': row.mood_avg, 'stress': row.stress_avg} for row in mood_rows]
     # Kronik hastalık ölçümleri (ör: kan şekeri, tansiyon)
-    chronic_measurements = ChronicMeasurement.query.filter_by(user_id=current_user.id).order_by(ChronicMeasurement.date.asc()).all()
-    chronic_data = [{'date': m.date.strftime('%Y-%m-%d'), 'type': m.measurement_type, 'value': m.value} for m in chronic_measurements]
-    # Son 30 gün için stres değişimi
-    import datetime
-    today = datetime.date.today()
-    last_30 = [t for t in mood_tests if t.date.date() >= today - datetime.timedelta(days=30)]
-    if len(last_30) >= 2:
-        first = last_30[0].result_json.get('stress', {}).get('avg', None)
-        last = last_30[-1].result_json.get('stress', {}).get('avg', None)
+    chronic_rows = (db.session.query(ChronicMeasurement.date, ChronicMeasurement.measurement_type,
+                                     ChronicMeasurement.value_primary, ChronicMeasurement.value_secondary)
+                    .filter(ChronicMeasurement.user_id == current_user.id, ChronicMeasurement.date >= since)
+                    .order_by(ChronicMeasurement.date.asc())
+                    .all())
+    chronic_data = [
+        {'date': m.date.strftime('%Y-%m-%d'), 'type': m.measurement_type, 'value': m.value_primary, 'secondary': m.value_secondary}
+        for m in chronic_rows
+    ]
+    # Pencere içindeki stres değişimi: ilk ve son testin ortalaması
+    period = {7: 'Son 1 haftada', 30: 'Son 1 ayda', 90: 'Son 3 ayda'}.get(window, f'Son {window} günde')
+    if len(mood_rows) >= 2:
+        first = mood_rows[0].stress_avg
+        last = mood_rows[-1].stress_avg
         if first is not None and last is not None and first > 0:
             change = round(100 * (last - first) / first, 1)
             if change < 0:
-                motivation = f"Son 1 ayda stres seviyen %{abs(change)} azaldı! Harika gidiyorsun."
+                motivation = f"{period} stres seviyen %{abs(change)} azaldı! Harika gidiyorsun."
             elif change > 0:
-                motivation = f"Son 1 ayda stres seviyen %{change} arttı. Dilersen stres yönetimi için önerilerimize göz atabilirsin."
+                motivation = f"{period} stres seviyen %{change} arttı. Dilersen stres yönetimi için önerilerimize göz atabilirsin."
             else:
-                motivation = "Son 1 ayda stres seviyende önemli bir değişiklik olmadı."
+                motivation = f"{period} stres seviyende önemli bir değişiklik olmadı."
         else:
             motivation = "Yeterli veri yok."
     else:
-        motivation = "Son 1 ayda yeterli stres testi verisi yok."
-    return render_template('health_trends.html', mood_data=mood_data, chronic_data=chronic_data, motivation=motivation)
+        motivation = f"{period} yeterli stres testi verisi yok."
+    # Ölçüm özetleri önceden hesaplanmış istatistiklerden okunur
+    measurement_stats = MeasurementStats.query.filter_by(user_id=current_user.id).order_by(MeasurementStats.measurement_type).all()
+    return render_template('health_trends.html', mood_data=mood_data, chronic_data=chronic_data, motivation=motivation,
+                           windows=windows, window=window, measurement_stats=measurement_stats)
 
 @app.route('/health-goals', methods=['GET', 'POST'])
 @login_required
 def health_goals():
-    # Kullanıcının hedefleri
+    # Kullanıcının hedefleri; GET isteğinde kayıt oluşturulmaz, varsayılanlar gösterilir
     goal = HealthGoal.query.filter_by(user_id=current_user.id).first()
-    if not goal:
-        goal = HealthGoal(user_id=current_user.id)
-        db.session.add(goal)
-        db.session.commit()
+    if goal is None:
+        goal = HealthGoal(user_id=current_user.id, **goal_progress.DEFAULT_TARGETS)
+    today = date.today()
     message = None
     if request.method == 'POST':
+        if goal.id is None:
+            db.session.add(goal)
         if 'update_goal' in request.form:
             goal.steps = int(request.form.get('steps', 8000))
             goal.water = float(request.form.get('water', 2.0))
             goal.sleep = float(request.form.get('sleep', 7.0))
             goal.weight = float(request.form.get('weight') or 0) or None
             goal.calories = int(request.form.get('calories') or 0) or None
-            db.session.commit()
             message = 'Hedefleriniz güncellendi.'
         elif 'add_entry' in request.form:
-            entry = HealthGoalEntry(
-                user_id=current_user.id,
-                date=request.form.get('date') or date.today(),
-                steps=int(request.form.get('entry_steps', 0)),
-                water=float(request.form.get('entry_water', 0)),
-                sleep=float(request.form.get('entry_sleep', 0)),
-                weight=float(request.form.get('entry_weight', 0)),
-                calories=int(request.form.get('entry_calories', 0))
-            )
-            db.session.add(entry)
-            db.session.commit()
+            try:
+                entry_date = datetime.strptime(request.form['date'], '%Y-%m-%d').date() if request.form.get('date') else today
+            except ValueError:
+                entry_date = today
+            # Gün başına tek giriş: varsa güncellenir
+            entry = HealthGoalEntry.query.filter_by(user_id=current_user.id, date=entry_date).first()
+            was_met = entry.goals_met if entry else None
+            if entry is None:
+                entry = HealthGoalEntry(user_id=current_user.id, date=entry_date)
+                db.session.add(entry)
+            entry.steps = int(request.form.get('entry_steps') or 0)
+            entry.water = float(request.form.get('entry_water') or 0)
+            entry.sleep = float(request.form.get('entry_sleep') or 0)
+            entry.weight = float(request.form.get('entry_weight') or 0)
+            entry.calories = int(request.form.get('entry_calories') or 0)
+            entry.goals_met = goal_progress.goals_met(goal, entry)
+            # Geçmiş bir günün düzeltilmesi serileri birleştirebilir/bölebilir; o zaman yeniden hesaplanır
+            if not goal_progress.mark_day(goal, entry_date, entry.goals_met, was_met):
+                rebuild_goal_progress(goal)
             message = 'Günlük giriş kaydedildi.'
-    # Son giriş (bugün)
-    today_entry = HealthGoalEntry.query.filter_by(user_id=current_user.id, date=date.today()).first()
-    # Son 7 gün girişleri
-    last_entries = HealthGoalEntry.query.filter_by(user_id=current_user.id).order_by(HealthGoalEntry.date.desc()).limit(7).all()
-    # Rozet/tebrik: bugünkü giriş hedefleri karşıladıysa
-    congrats = False
-    if today_entry:
-        congrats = (
-            (goal.steps and today_entry.steps and today_entry.steps >= goal.steps) and
-            (goal.water and today_entry.water and today_entry.water >= goal.water) and
-            (goal.sleep and today_entry.sleep and today_entry.sleep >= goal.sleep)
-        )
-    return render_template('health_goals.html', goal=goal, today_entry=today_entry, last_entries=last_entries, congrats=congrats, message=message)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Aynı gün için eşzamanlı iki kayıt
+            db.session.rollback()
+            message = 'Giriş aynı anda başka bir istekle kaydedildi, lütfen tekrar deneyin.'
+            goal = HealthGoal.query.filter_by(user_id=current_user.id).first() or HealthGoal(user_id=current_user.id, **goal_progress.DEFAULT_TARGETS)
+    # Son 7 giriş (bugünkü giriş varsa ilk sıradadır)
+    last_entries = []
+    if goal.id is not None:
+        last_entries = (HealthGoalEntry.query
+                        .filter(HealthGoalEntry.user_id == current_user.id, HealthGoalEntry.date <= today)
+                        .order_by(HealthGoalEntry.date.desc())
+                        .limit(7)
+                        .all())
+    today_entry = last_entries[0] if last_entries and last_entries[0].date == today else None
+    # Rozet/tebrik kayıt anında hesaplanan sonuçtan okunur
+    congrats = bool(today_entry and today_entry.goals_met)
+    progress = {
+        'streak': goal.streak(today),
+        'longest_streak': goal.longest_streak or 0,
+        'weekly': goal.compliance(goal_progress.WEEK_DAYS, today),
+        'monthly': goal.compliance(goal_progress.MONTH_DAYS, today),
+    }
+    return render_template('health_goals.html', goal=goal, today_entry=today_entry, last_entries=last_entries,
+                           congrats=congrats, message=message, progress=progress)
 
 @app.route('/health-library')
+@response_cache.cached(CachePolicy(ttl=600, datasets=('health_library_data',)))
 def health_library():
+    query = request.args.get('q', '').strip()
+    tags = tuple(sorted(set(request.args.getlist('tag'))))
+    page = request.args.get('page', 1, type=int)
     try:
-        with open('health_app/health_library_data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            contents = data['contents']
+        index = health_search.get_index()
     except FileNotFoundError:
         flash('Sağlık kütüphanesi içeriği yüklenemedi.', 'error')
-        contents = []
-    return render_template('health_library.html', contents=contents)
+        return render_template('health_library.html', results_html='', all_tags=[], query=query, selected_tags=tags)
+    per_page = app.config['HEALTH_LIBRARY_PAGE_SIZE']
+
+    def render_results():
+        results = index.search(query, tags=tags, page=page, per_page=per_page)
+        return Markup(render_template('health_library_results.html', results=results))
+
+    # Sonuç listesi sorgu bazında önbelleğe alınır; sayfa iskeleti her istekte çizilir
+    results_html = health_search.result_cache.get_or_render(
+        (index.version, query, tags, page, per_page), render_results)
+    return render_template('health_library.html', results_html=results_html, all_tags=index.tags,
+                           query=query, selected_tags=tags)
+
+@app.route('/api/response-cache/stats')
+@login_required
+def response_cache_stats():
+    return jsonify(response_cache.stats())
+
+@app.route('/api/health-library/cache-stats')
+@login_required
+def health_library_cache_stats():
+    return jsonify(health_search.result_cache.stats())
 
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    # Geliştirme sunucusu tek süreçtir; geçişler açılışta uygulanabilir
+    create_app({'AUTO_MIGRATE': True}).run(debug=True) 
\ No newline at end of file
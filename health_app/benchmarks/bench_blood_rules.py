@@ -0,0 +1,59 @@
+"""Kan tahlili kural motoru mikro ölçümü.
+
+Kullanım: python benchmarks/bench_blood_rules.py [--reports N]
+Rapor başına değerlendirme maliyetini, eski yolun her çağrıda ödediği
+dosya okuma + JSON ayrıştırma + derleme maliyetiyle karşılaştırır.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blood_rules import RuleSet, engine  # noqa: E402
+from reference_data import store  # noqa: E402
+
+FIELDS = {
+    'hemogram': ['hgb', 'hct', 'wbc', 'rbc', 'plt', 'mcv'],
+    'biyokimya': ['glucose', 'urea', 'creatinine', 'alt', 'ast', 'cholesterol', 'hdl', 'ldl', 'triglycerides'],
+    'vitamin_mineral': ['vitamin_d', 'vitamin_b12', 'iron', 'ferritin', 'folic_acid'],
+}
+
+
+def synthetic_report(rng):
+    return {panel: {key: rng.choice(['', f'{rng.uniform(0, 300):.1f}']) for key in keys}
+            for panel, keys in FIELDS.items()}
+
+
+def per_call_us(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def run(n):
+    rng = random.Random(0)
+    reports = [synthetic_report(rng) for _ in range(n)]
+
+    def load_and_compile(_):
+        with open(store.paths['blood_test_references'], 'r', encoding='utf-8') as f:
+            return RuleSet(json.load(f))
+
+    ruleset = engine.ruleset()
+    load_us = per_call_us(load_and_compile, reports[:min(n, 2000)])
+    parse_us = per_call_us(ruleset.parse_values, reports)
+    eval_us = per_call_us(ruleset.analyze, reports)
+    print(f'kurallar: {len(ruleset.rules)}  rapor: {n}')
+    print(f'{"dosya okuma + derleme (eski yolda her çağrıda)":<52}{load_us:9.1f} µs')
+    print(f'{"değer ayrıştırma":<52}{parse_us:9.1f} µs/rapor')
+    print(f'{"tam değerlendirme (ayrıştırma + sınıflama + metin)":<52}{eval_us:9.1f} µs/rapor')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reports', type=int, default=20000)
+    run(parser.parse_args().reports)
@@ -0,0 +1,65 @@
+"""İşçi başına soğuk açılış ölçümü (ilk isteğe kadar geçen süre).
+
+Kullanım: python benchmarks/bench_cold_start.py [--workers N]
+Geçici bir SQLite veritabanı bir kez geçirilir; ardından her işçi ayrı bir
+Python sürecinde açılır ve içe aktarma, create_app ve ilk istek süreleri
+ölçülür. "önce" kipi, eski sürümün her açılışta yaptığı şema kontrollerini
+(tüm geçiş adımlarının yeniden çalıştırılması) taklit eder; "sonra" kipi
+yalnızca kayıtlı şema sürümünü okur.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = '''
+import json, sys, time
+start = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+application = module.create_app()
+if sys.argv[1] == 'before':
+    with application.app_context():
+        module.migrate_db(force=True)
+created = time.perf_counter()
+response = application.test_client().get('/')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({'import': imported - start, 'create_app': created - imported,
+                  'first_request': done - created, 'total': done - start}))
+'''
+
+
+def spawn(mode, env):
+    result = subprocess.run([sys.executable, '-W', 'ignore', '-c', WORKER, mode], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    # Son satır ölçüm çıktısıdır; öncesi uygulamanın açılış mesajları
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(workers):
+    workdir = tempfile.mkdtemp(prefix='bench_cold_start_')
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'), AUTO_MIGRATE='0',
+               PYTHONPATH=APP_DIR)
+    # Dağıtım adımı: şema bir kez geçirilir
+    subprocess.run([sys.executable, '-W', 'ignore', 'migrations.py'], cwd=APP_DIR, env=env,
+                   capture_output=True, check=True)
+    print(f'workers={workers}')
+    print(f'{"mode":<8} {"stage":<14} {"p50 ms":>10} {"max ms":>10}')
+    for mode in ('before', 'after'):
+        samples = [spawn(mode, env) for _ in range(workers)]
+        for stage in ('import', 'create_app', 'first_request', 'total'):
+            values = [sample[stage] * 1000 for sample in samples]
+            print(f'{mode:<8} {stage:<14} {np.percentile(values, 50):>10.1f} {max(values):>10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=5)
+    run(parser.parse_args().workers)
@@ -0,0 +1,151 @@
+"""SQLite eşzamanlı yazma ölçümü: varsayılan ayarlar ile ayarlı bağlantı profili.
+
+Kullanım: python benchmarks/bench_concurrent_writes.py [--writers N] [--readers N] [--transactions N]
+Ayrı süreçler (gunicorn işçileri gibi) aynı veritabanı dosyasına ölçüm
+kaydı + istatistik güncellemesi işlemleri yazarken okuyucular son kayıtları
+sorgular. Her profil için yazma/okuma verimi, p95 işlem süresi ve
+"database is locked" hatası sayısı raporlanır.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import (Column, Date, Float, Integer, MetaData, String, Table, create_engine,  # noqa: E402
+                        func, select, update)
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+import database  # noqa: E402
+
+metadata = MetaData()
+measurements = Table(
+    'chronic_measurement', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, nullable=False, index=True),
+    Column('measurement_type', String(50), nullable=False),
+    Column('value_primary', Float),
+    Column('date', Date),
+)
+stats = Table(
+    'measurement_stats', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, nullable=False, unique=True),
+    Column('count', Integer, nullable=False),
+    Column('mean', Float),
+)
+
+USERS = 50
+
+
+def make_engine(uri, tuned):
+    if not tuned:
+        # Eski davranış: sqlite3 varsayılanları, PRAGMA yok
+        return create_engine(uri)
+    return database.configure_engine(create_engine(uri, **database.engine_options(uri)))
+
+
+def writer(uri, tuned, transactions, start_at, results):
+    engine = make_engine(uri, tuned)
+    rng = random.Random(os.getpid())
+    latencies = []
+    errors = 0
+    time.sleep(max(0.0, start_at - time.time()))
+    started = time.perf_counter()
+    for _ in range(transactions):
+        user_id = rng.randrange(USERS)
+        value = rng.gauss(110, 10)
+        t0 = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                row = conn.execute(select(stats.c.count, stats.c.mean).where(stats.c.user_id == user_id)).one()
+                conn.execute(measurements.insert().values(user_id=user_id, measurement_type='blood_glucose',
+                                                          value_primary=value))
+                count = row.count + 1
+                conn.execute(update(stats).where(stats.c.user_id == user_id)
+                             .values(count=count, mean=(row.mean or 0) + (value - (row.mean or 0)) / count))
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - t0)
+    results.put(('writer', len(latencies), errors, time.perf_counter() - started, latencies))
+
+
+def reader(uri, tuned, stop_at, start_at, results):
+    engine = make_engine(uri, tuned)
+    rng = random.Random(os.getpid())
+    done = 0
+    errors = 0
+    time.sleep(max(0.0, start_at - time.time()))
+    started = time.perf_counter()
+    while time.time() < stop_at.value:
+        try:
+            with engine.connect() as conn:
+                conn.execute(select(func.count(), func.avg(measurements.c.value_primary))
+                             .where(measurements.c.user_id == rng.randrange(USERS))).one()
+            done += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            errors += 1
+    results.put(('reader', done, errors, time.perf_counter() - started, []))
+
+
+def run_profile(name, tuned, writers, readers, transactions):
+    path = os.path.join(tempfile.mkdtemp(prefix='bench_writes_'), 'bench.db')
+    uri = 'sqlite:///' + path
+    engine = make_engine(uri, tuned)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(stats.insert(), [{'user_id': i, 'count': 0, 'mean': None} for i in range(USERS)])
+    engine.dispose()
+
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1.0
+    stop_at = multiprocessing.Value('d', start_at + 3600)
+    procs = [multiprocessing.Process(target=writer, args=(uri, tuned, transactions, start_at, results))
+             for _ in range(writers)]
+    procs += [multiprocessing.Process(target=reader, args=(uri, tuned, stop_at, start_at, results))
+              for _ in range(readers)]
+    for proc in procs:
+        proc.start()
+    collected = [results.get() for _ in range(writers)]
+    stop_at.value = time.time()  # yazarlar bitince okuyucular durur
+    collected += [results.get() for _ in range(readers)]
+    for proc in procs:
+        proc.join()
+
+    write_rows = [r for r in collected if r[0] == 'writer']
+    read_rows = [r for r in collected if r[0] == 'reader']
+    commits = sum(r[1] for r in write_rows)
+    write_elapsed = max(r[3] for r in write_rows)
+    latencies = [latency for r in write_rows for latency in r[4]]
+    reads = sum(r[1] for r in read_rows)
+    read_elapsed = max((r[3] for r in read_rows), default=0)
+    p95 = np.percentile(latencies, 95) * 1000 if latencies else float('nan')
+    print(f'{name:<8} {commits / write_elapsed:>10.0f} {p95:>10.2f} {sum(r[2] for r in write_rows):>12} '
+          f'{reads / read_elapsed if read_elapsed else 0:>10.0f} {sum(r[2] for r in read_rows):>12}')
+
+
+def run(writers, readers, transactions):
+    print(f'writers={writers} readers={readers} transactions/writer={transactions}')
+    print(f'{"profile":<8} {"commits/s":>10} {"p95 ms":>10} {"write locked":>12} {"reads/s":>10} {"read locked":>12}')
+    run_profile('default', False, writers, readers, transactions)
+    run_profile('tuned', True, writers, readers, transactions)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--transactions', type=int, default=500)
+    args = parser.parse_args()
+    run(args.writers, args.readers, args.transactions)
@@ -0,0 +1,44 @@
+"""Toplu risk tahmini verimlilik ölçümü.
+
+Kullanım: python benchmarks/bench_risk_batch.py [--repeat N]
+Her model için 1, 100 ve 10.000 satırlık sentetik partilerle satır/saniye raporlar.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_models import MODEL_FEATURES, build_feature_matrix, predict_matrix, registry  # noqa: E402
+
+BATCH_SIZES = [1, 100, 10000]
+
+
+def synthetic_rows(model_name, n, seed=0):
+    rng = np.random.default_rng(seed)
+    width = len(MODEL_FEATURES[model_name])
+    return rng.uniform(0, 200, size=(n, width)).tolist()
+
+
+def run(repeat):
+    for model_name in MODEL_FEATURES:
+        registry.get(model_name)  # Yükleme süresini ölçüme katma
+        for size in BATCH_SIZES:
+            rows = synthetic_rows(model_name, size)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                X = build_feature_matrix(model_name, rows, max_rows=None)
+                predict_matrix(model_name, X)
+            elapsed = time.perf_counter() - start
+            rows_per_sec = size * repeat / elapsed
+            print(f'{model_name:<9} batch={size:<6} {rows_per_sec:>14,.0f} rows/sec  '
+                  f'({elapsed / repeat * 1000:.3f} ms/batch)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    run(parser.parse_args().repeat)
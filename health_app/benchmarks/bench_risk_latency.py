@@ -0,0 +1,68 @@
+"""Risk modelleri için gecikme ve verimlilik ölçümü.
+
+Kullanım: python benchmarks/bench_risk_latency.py [--backend compiled|sklearn] [--iterations N]
+Her model ve parti boyutu için sentetik satırlarla p50/p95/p99 gecikmeyi ve
+satır/saniye değerini raporlar. Model yeniden eğitildiğinde önceki çıktıyla
+karşılaştırılarak gerilemeler yakalanabilir.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_models import MODEL_FEATURES, ModelRegistry, build_feature_matrix  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def synthetic_rows(model_name, n, rng):
+    return rng.uniform(0, 200, size=(n, len(MODEL_FEATURES[model_name]))).tolist()
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+def run(backend, iterations, seed):
+    rng = np.random.default_rng(seed)
+    registry = ModelRegistry(backend=backend)
+    print(f'backend={backend} iterations={iterations}')
+    print(f'{"model":<9} {"stage":<10} {"batch":>6} {"p50 ms":>10} {"p95 ms":>10} {"p99 ms":>10} {"rows/sec":>14}')
+    for model_name in MODEL_FEATURES:
+        start = time.perf_counter()
+        model = registry.get(model_name)
+        load_ms = (time.perf_counter() - start) * 1000
+        print(f'{model_name:<9} {"load":<10} {"-":>6} {load_ms:>10.3f} {"":>10} {"":>10} {"":>14}')
+        for size in BATCH_SIZES:
+            # Büyük partilerde tekrar sayısını azalt, toplam süre makul kalsın
+            repeat = max(3, min(iterations, iterations * 100 // size))
+            parse_samples = []
+            infer_samples = []
+            for _ in range(repeat):
+                rows = synthetic_rows(model_name, size, rng)
+                t0 = time.perf_counter()
+                X = build_feature_matrix(model_name, rows, max_rows=None)
+                t1 = time.perf_counter()
+                model.predict(X)
+                if hasattr(model, 'predict_proba'):
+                    model.predict_proba(X)
+                t2 = time.perf_counter()
+                parse_samples.append(t1 - t0)
+                infer_samples.append(t2 - t1)
+            for stage, samples in (('parse', parse_samples), ('inference', infer_samples)):
+                rows_per_sec = size * len(samples) / sum(samples)
+                print(f'{model_name:<9} {stage:<10} {size:>6} {percentile_ms(samples, 50):>10.3f} '
+                      f'{percentile_ms(samples, 95):>10.3f} {percentile_ms(samples, 99):>10.3f} {rows_per_sec:>14,.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--backend', choices=['compiled', 'sklearn'], default='compiled')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.backend, args.iterations, args.seed)
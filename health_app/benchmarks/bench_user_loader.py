@@ -0,0 +1,89 @@
+"""Flask-Login kullanıcı yükleyicisinin istek başına sorgu ve gecikme ölçümü.
+
+Kullanım: python benchmarks/bench_user_loader.py [--users N] [--requests N]
+Geçici bir SQLite veritabanında kullanıcılar oluşturur, her biriyle oturum açıp
+/search-food uç noktasına istek atar ve kullanıcı önbelleği kapalıyken ve
+açıkken istek başına SQL sorgusu sayısını ve p50/p95 gecikmeyi raporlar.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Uygulama içe aktarılmadan önce geçici veritabanı seçilir; gerçek veritabanına dokunulmaz
+_workdir = tempfile.mkdtemp(prefix='bench_user_loader_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_workdir, 'bench.db')
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db, User  # noqa: E402
+from user_cache import user_cache  # noqa: E402
+
+
+app = create_app({'AUTO_MIGRATE': True})
+
+
+def create_clients(n_users):
+    with app.app_context():
+        for i in range(n_users):
+            user = User(email=f'bench{i}@example.com', name=f'Bench {i}', activity_level='sedentary', goal='maintain')
+            user.set_password('bench-password')
+            db.session.add(user)
+        db.session.commit()
+    clients = []
+    for i in range(n_users):
+        client = app.test_client()
+        client.post('/login', data={'email': f'bench{i}@example.com', 'password': 'bench-password'})
+        clients.append(client)
+    return clients
+
+
+def measure(clients, n_requests):
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+    samples = []
+    try:
+        for i in range(n_requests):
+            client = clients[i % len(clients)]
+            start = time.perf_counter()
+            response = client.get('/search-food?query=elma')
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', count)
+    return queries[0] / n_requests, samples
+
+
+def run(n_users, n_requests):
+    app.config['WTF_CSRF_ENABLED'] = False
+    clients = create_clients(n_users)
+    print(f'users={n_users} requests={n_requests}')
+    print(f'{"mode":<10} {"queries/req":>12} {"p50 ms":>10} {"p95 ms":>10}')
+    configured = user_cache.maxsize
+    for mode, maxsize in (('no-cache', 0), ('cache', configured)):
+        user_cache.clear()
+        user_cache.maxsize = maxsize
+        per_request, samples = measure(clients, n_requests)
+        print(f'{mode:<10} {per_request:>12.2f} {np.percentile(samples, 50) * 1000:>10.3f} '
+              f'{np.percentile(samples, 95) * 1000:>10.3f}')
+    user_cache.maxsize = configured
+    print('cache stats:', user_cache.stats())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.users, args.requests)
@@ -0,0 +1,196 @@
+from collections import namedtuple
+
+import numpy as np
+
+from reference_data import store as reference_store
+
+# Sonuç kodları
+MISSING, INVALID, NORMAL, LOW, HIGH = -2, -1, 0, 1, 2
+
+# Referans bölümü -> (sonuçlarda okunacak panel, değerlendirme biçimi)
+# full: düşük/yüksek/normal yorumu, lipid ve vitamin: özet satırına durum eklenir
+SECTIONS = [
+    ('hemogram', 'hemogram', 'full'),
+    ('biyokimya', 'biyokimya', 'full'),
+    ('lipid', 'biyokimya', 'lipid'),
+    ('vitamin_mineral', 'vitamin_mineral', 'vitamin'),
+]
+
+Rule = namedtuple('Rule', 'section panel key name mode outcomes')
+# outcomes: {LOW/HIGH/NORMAL: (yorum veya None, öneriler, durum veya None)}
+
+FLAG_NAMES = {LOW: 'low', HIGH: 'high', NORMAL: 'normal'}
+
+
+class RuleSet:
+    """Flat, precompiled rule table built from blood_test_references.json"""
+
+    def __init__(self, references, version=None):
+        self.version = version
+        self.lifestyle = references.get('lifestyle_recommendations', {})
+        self.rules = []
+        self.units = {}  # (panel, key) -> birim
+        mins = []
+        maxs = []
+        for section, panel, mode in SECTIONS:
+            for key, ref in references.get(section, {}).items():
+                ref_range = ref.get('reference_range', {})
+                self.units.setdefault((panel, key), ref.get('unit'))
+                outcomes = {}
+                for code, level in ((LOW, 'low'), (HIGH, 'high'), (NORMAL, 'normal')):
+                    data = ref.get(level) or {}
+                    recommendations = tuple(data.get('recommendations', ()))
+                    if mode == 'full':
+                        outcomes[code] = (data.get('comment'), recommendations, None)
+                    elif code == LOW:
+                        outcomes[code] = (None, recommendations, f"düşük {ref['name']}")
+                    elif code == HIGH:
+                        outcomes[code] = (None, recommendations, f"yüksek {ref['name']}")
+                    else:
+                        outcomes[code] = (None, (), None)
+                self.rules.append(Rule(section, panel, key, ref['name'], mode, outcomes))
+                mins.append(ref_range.get('min', np.nan))
+                # Vitaminlerde yalnızca eksiklik değerlendirilir
+                maxs.append(np.nan if mode == 'vitamin' else ref_range.get('max', np.nan))
+        self.mins = np.array(mins, dtype=np.float64)
+        self.maxs = np.array(maxs, dtype=np.float64)
+        self.columns = [(rule.panel, rule.key) for rule in self.rules]
+        self.column_index = {}
+        for i, column in enumerate(self.columns):
+            self.column_index.setdefault(column, i)
+
+    def parse_values(self, results):
+        """Read one results dict into a value row; returns (values, invalid mask)"""
+        values = np.full(len(self.rules), np.nan)
+        invalid = np.zeros(len(self.rules), dtype=bool)
+        for i, (panel, key) in enumerate(self.columns):
+            raw = (results.get(panel) or {}).get(key)
+            if raw in (None, ''):
+                continue
+            try:
+                values[i] = float(raw)
+            except (TypeError, ValueError):
+                invalid[i] = True
+        return values, invalid
+
+    def classify(self, values, invalid=None):
+        """Vectorized outcome codes for a (n_reports, n_rules) or (n_rules,) value array"""
+        values = np.asarray(values, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            low = values < self.mins
+            high = ~low & (values > self.maxs)
+        codes = np.where(low, LOW, np.where(high, HIGH, NORMAL))
+        codes = np.where(np.isnan(values), MISSING, codes)
+        if invalid is not None:
+            codes = np.where(invalid, INVALID, codes)
+        return codes
+
+    def render(self, codes):
+        """Build the report text from one row of outcome codes"""
+        comments = []
+        general_recommendations = []
+        lifestyle_recommendations = []
+        lipid_status = []
+        vitamin_status = []
+        for rule, code in zip(self.rules, codes.tolist()):
+            if code == MISSING:
+                continue
+            if code == INVALID:
+                comments.append(f"{rule.name} değeri analiz edilemedi.")
+                continue
+            comment, recommendations, status = rule.outcomes[code]
+            if comment:
+                comments.append(comment)
+            general_recommendations.extend(recommendations)
+            if status:
+                (lipid_status if rule.mode == 'lipid' else vitamin_status).append(status)
+
+        if lipid_status:
+            comments.append(f'Lipid profilinizde {", ".join(lipid_status)} tespit edildi. Kardiyovasküler risk faktörlerini azaltmak için öneriler:')
+            lifestyle_recommendations.extend(self.lifestyle.get('lipid_abnormal', []))
+
+        if vitamin_status:
+            comments.append(f'Vitamin profilinizde {", ".join(vitamin_status)} tespit edildi. Öneriler:')
+            lifestyle_recommendations.extend(self.lifestyle.get('vitamin_deficiency', []))
+
+        # Genel değerlendirme ve öneriler
+        if not comments:
+            comments.append('Tüm değerler referans aralığında görünüyor.')
+            lifestyle_recommendations.extend(self.lifestyle.get('all_normal', []))
+
+        # Sonuç raporu oluşturma
+        report = []
+        report.append("KAN TAHLİLİ ANALİZ RAPORU")
+        report.append("=" * 30)
+        report.append("\nDEĞERLENDİRME:")
+        report.extend(comments)
+
+        if general_recommendations:
+            report.append("\nÖNERİLER:")
+            report.extend([f"• {rec}" for rec in dict.fromkeys(general_recommendations)])
+
+        if lifestyle_recommendations:
+            report.append("\nYAŞAM TARZI ÖNERİLERİ:")
+            report.extend([f"• {rec}" for rec in dict.fromkeys(lifestyle_recommendations)])
+
+        report.append("\nNOT: Bu değerlendirme genel bilgi amaçlıdır. Kesin tanı ve tedavi için mutlaka bir hekime başvurunuz.")
+
+        return "\n".join(report)
+
+    def analyze(self, results):
+        values, invalid = self.parse_values(results)
+        return self.render(self.classify(values, invalid))
+
+    def lab_values(self, results):
+        """Numeric analytes of one report as (panel, analyte, value, unit, flag) rows
+
+        Every numeric value is returned; the flag (low/high/normal) and unit are
+        filled in for analytes that have a reference rule.
+        """
+        values, invalid = self.parse_values(results)
+        codes = self.classify(values, invalid).tolist()
+        rows = []
+        for panel, panel_values in (results or {}).items():
+            if not isinstance(panel_values, dict):
+                continue
+            for key, raw in panel_values.items():
+                if raw in (None, ''):
+                    continue
+                try:
+                    value = float(raw)
+                except (TypeError, ValueError):
+                    continue
+                if not np.isfinite(value):
+                    continue
+                index = self.column_index.get((panel, key))
+                flag = FLAG_NAMES.get(codes[index]) if index is not None else None
+                rows.append((panel, key, value, self.units.get((panel, key)), flag))
+        return rows
+
+    def analyze_batch(self, results_list):
+        """Analyze many reports with one vectorized classification over the value matrix"""
+        if not results_list:
+            return []
+        parsed = [self.parse_values(results or {}) for results in results_list]
+        values = np.vstack([row[0] for row in parsed])
+        invalid = np.vstack([row[1] for row in parsed])
+        codes = self.classify(values, invalid)
+        return [self.render(row) for row in codes]
+
+
+class RuleEngine:
+    """Serves the RuleSet compiled from the current blood_test_references snapshot"""
+
+    def __init__(self, store=reference_store, name='blood_test_references'):
+        self.store = store
+        self.name = name
+
+    def ruleset(self):
+        # Dosya değişmedikçe aynı derlenmiş tablo döner
+        return self.store.derived(self.name, RuleSet)
+
+    def analyze(self, results):
+        return self.ruleset().analyze(results)
+
+
+engine = RuleEngine()
@@ -0,0 +1,67 @@
+import numpy as np
+
+# scikit-learn gerektirmeyen, NumPy ile çalışan model değerlendiricileri.
+# Diziler export_models.py tarafından saved_models/*.npz dosyalarına yazılır.
+
+
+class CompiledLinearModel:
+    """Pure-NumPy evaluator for an exported linear classifier"""
+
+    kind = None
+
+    def __init__(self, coef, intercept, classes, source_sha=''):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(np.asarray(intercept, dtype=np.float64).ravel()[0])
+        self.classes_ = np.asarray(classes)
+        self.source_sha = source_sha
+        self.n_features_in_ = self.coef.shape[0]
+
+    def save(self, path):
+        np.savez(
+            path,
+            kind=np.array(self.kind),
+            coef=self.coef,
+            intercept=np.array([self.intercept]),
+            classes=self.classes_,
+            source_sha=np.array(self.source_sha),
+        )
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+
+class CompiledLinearSVC(CompiledLinearModel):
+    """Linear-kernel SVC; no probabilities (trained with probability=False)"""
+
+    kind = 'linear_svc'
+
+
+class CompiledLogisticRegression(CompiledLinearModel):
+    """Binary logistic regression"""
+
+    kind = 'logistic'
+
+    def predict_proba(self, X):
+        # 1 / (1 + e^-z), aşırı değerlerde exp taşmasın diye log-uzayında
+        p = np.exp(-np.logaddexp(0.0, -self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+COMPILED_KINDS = {cls.kind: cls for cls in (CompiledLinearSVC, CompiledLogisticRegression)}
+
+
+def load_compiled_model(path):
+    """Load an exported .npz model"""
+    with np.load(path, allow_pickle=False) as data:
+        kind = str(data['kind'])
+        if kind not in COMPILED_KINDS:
+            raise ValueError(f'Desteklenmeyen model türü: {kind}')
+        return COMPILED_KINDS[kind](
+            coef=data['coef'],
+            intercept=data['intercept'],
+            classes=data['classes'],
+            source_sha=str(data['source_sha']),
+        )
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import event
+
+# Özetin bellekte kalma süresi (saniye) ve en fazla kullanıcı sayısı. Önbellek süreç
+# başınadır; diğer işçilerdeki yazmalar veritabanındaki özet sürümüyle fark edilir
+DASHBOARD_CACHE_TTL = float(os.getenv('DASHBOARD_CACHE_TTL', 300))
+DASHBOARD_CACHE_SIZE = int(os.getenv('DASHBOARD_CACHE_SIZE', 1024))
+
+
+class SummaryCache:
+    """Per-user dashboard summaries, valid for one calendar day and dropped on writes
+
+    The cache lives in one worker process. Writes committed by other workers
+    are detected through a per-user version stored in the database: watch()
+    bumps it in the writing transaction, and get_or_build() only serves an
+    entry built for the version the caller just read.
+    """
+
+    def __init__(self, ttl=DASHBOARD_CACHE_TTL, maxsize=DASHBOARD_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # user_id -> (gün, bitiş zamanı, sürüm, özet)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_build(self, user_id, build, version=None):
+        today = date.today()
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is not None and item[0] == today and item[1] > time.monotonic() and item[2] == version:
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return item[3]
+            self.misses += 1
+        summary = build()
+        if self.maxsize > 0:
+            with self._lock:
+                self._data[user_id] = (today, time.monotonic() + self.ttl, version, summary)
+                self._data.move_to_end(user_id)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return summary
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._data.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """For bulk UPDATE/INSERT statements that bypass the session hooks"""
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def watch(self, session, models, bump_versions=None):
+        """Invalidate a user's summary whenever a row of `models` with that user_id is committed
+
+        bump_versions(connection, user_ids), if given, runs inside the flushing
+        transaction so the version change commits together with the write.
+        """
+        models = tuple(models)
+
+        @event.listens_for(session, 'after_flush')
+        def collect(sess, flush_context):
+            flushed = {obj.user_id for obj in list(sess.new) + list(sess.dirty) + list(sess.deleted)
+                       if isinstance(obj, models) and getattr(obj, 'user_id', None) is not None}
+            if flushed:
+                sess.info.setdefault('dashboard_users', set()).update(flushed)
+                if bump_versions is not None:
+                    bump_versions(sess.connection(), flushed)
+
+        @event.listens_for(session, 'after_commit')
+        def invalidate(sess):
+            for user_id in sess.info.pop('dashboard_users', ()):
+                self.invalidate(user_id)
+
+        @event.listens_for(session, 'after_rollback')
+        def discard(sess):
+            sess.info.pop('dashboard_users', None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+summary_cache = SummaryCache()
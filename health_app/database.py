@@ -0,0 +1,110 @@
+import os
+
+from sqlalchemy import event, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+
+# SQLite bağlantı ayarları (her yeni bağlantıda PRAGMA olarak uygulanır)
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bayt
+SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024))  # negatif: KiB cinsinden
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # milisaniye
+
+# Sunucu veritabanı (PostgreSQL/MySQL) bağlantı havuzu boyutları, işçi süreci başına
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # saniye; sunucunun boşta bağlantı kesmesinden önce
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for the given database URI"""
+    if is_sqlite(uri):
+        # sqlite3 modülünün kendi bekleme süresi PRAGMA busy_timeout ile aynı tutulur
+        return {'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT / 1000}}
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': True,
+    }
+
+
+def sqlite_pragmas():
+    return (
+        ('journal_mode', SQLITE_JOURNAL_MODE),
+        ('synchronous', SQLITE_SYNCHRONOUS),
+        ('mmap_size', SQLITE_MMAP_SIZE),
+        ('cache_size', SQLITE_CACHE_SIZE),
+        ('busy_timeout', SQLITE_BUSY_TIMEOUT),
+    )
+
+
+def configure_engine(engine):
+    """Apply the SQLite connection profile to every new connection of `engine`
+
+    WAL lets readers and a writer proceed concurrently across worker processes,
+    synchronous=NORMAL drops the fsync per commit (WAL stays consistent on power
+    loss, only the last commits may roll back), and busy_timeout makes writers
+    wait for the lock instead of failing with "database is locked". Server
+    databases are left untouched; their pooling comes from engine_options().
+    """
+    if engine.dialect.name != 'sqlite':
+        return engine
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    return engine
+
+
+# Çakışan satırı sessizce atlayan INSERT biçimleri (ON CONFLICT DO NOTHING)
+CONFLICT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def insert_if_absent(session, table, values, index_elements):
+    """Insert a row unless one with the same unique key `index_elements` exists
+
+    Lets concurrent workers create the same row without one of them failing
+    with IntegrityError: the loser's insert waits for the winner's commit and
+    then does nothing. Dialects without a conflict-ignoring INSERT insert
+    inside a savepoint and roll back to it on IntegrityError.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name in CONFLICT_INSERTS:
+        session.execute(CONFLICT_INSERTS[dialect_name](table).values(**values)
+                        .on_conflict_do_nothing(index_elements=index_elements))
+    elif dialect_name in ('mysql', 'mariadb'):
+        session.execute(insert(table).values(**values).prefix_with('IGNORE'))
+    else:
+        try:
+            with session.begin_nested():
+                session.execute(insert(table).values(**values))
+        except IntegrityError:
+            pass  # satırı başka bir işlem ekledi; savepoint geri alındı
+
+
+def describe(engine):
+    """Effective connection settings, for diagnostics"""
+    info = {'backend': engine.dialect.name, 'pool': type(engine.pool).__name__}
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as conn:
+            for name, _ in sqlite_pragmas():
+                info[name] = conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+    else:
+        info.update(pool_size=engine.pool.size(), checked_out=engine.pool.checkedout(), overflow=engine.pool.overflow())
+    return info
@@ -0,0 +1,107 @@
+import re
+from collections import deque
+
+from reference_data import store as reference_store
+
+# doctor_data.json'daki desenler "(kelime1|kelime2|...)" biçiminde basit alternatifler
+_SIMPLE_ALTERNATION = re.compile(r'^\(?([^()\[\]\\.*+?{}^$]+)\)?$')
+
+
+def turkish_fold(text):
+    """Case-fold Turkish text (I -> ı, İ -> i) before lowercasing"""
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: finds every keyword occurrence in one scan of the text"""
+
+    def __init__(self, keywords):
+        # keywords: {anahtar kelime: değer}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for keyword, value in keywords.items():
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((keyword, value))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                yield from out[state]
+
+
+class DoctorMatcher:
+    """Matches a free-text complaint against every keyword_doctor_map entry at once"""
+
+    def __init__(self, doctor_data, version=None):
+        self.version = version
+        self.entries = [item['doctor'] for item in doctor_data.get('keyword_doctor_map', [])]
+        self.all_doctors = doctor_data.get('all_doctors', [])
+        keywords = {}
+        self._fallback = []  # Basit alternatif olmayan desenler regex olarak kalır
+        for index, item in enumerate(doctor_data.get('keyword_doctor_map', [])):
+            simple = _SIMPLE_ALTERNATION.match(item['pattern'])
+            if not simple:
+                self._fallback.append((index, re.compile(item['pattern'], re.IGNORECASE)))
+                continue
+            for keyword in simple.group(1).split('|'):
+                keyword = turkish_fold(keyword.strip())
+                if keyword:
+                    keywords.setdefault(keyword, set()).add(index)
+        self._automaton = KeywordAutomaton(keywords)
+
+    def match(self, complaint):
+        """Return every matching doctor in data-file order
+
+        The first entry is the doctor the original linear regex scan recommended:
+        file order encodes precedence, so a generic keyword such as "ağrı" never
+        outranks a clinic listed before it.
+        """
+        if not complaint:
+            return []
+        hits = {}
+        for keyword, indexes in self._automaton.iter_matches(turkish_fold(complaint)):
+            for index in indexes:
+                hits.setdefault(index, set()).add(keyword)
+        for index, pattern in self._fallback:
+            found = pattern.search(complaint)
+            if found:
+                hits.setdefault(index, set()).add(turkish_fold(found.group(0)))
+        # Önceliği veri dosyasındaki sıra belirler (ilk eşleşen desen önerilir)
+        ranked = sorted(hits.items())
+        return [
+            {'doctor': self.entries[index], 'keywords': sorted(keywords), 'score': len(keywords)}
+            for index, keywords in ranked
+        ]
+
+
+def get_matcher(store=reference_store):
+    """Matcher built from the current doctor_data snapshot (rebuilt only when the file changes)"""
+    return store.derived('doctor_data', DoctorMatcher)
@@ -0,0 +1,98 @@
+"""Kayıtlı scikit-learn modellerini saf NumPy (.npz) biçimine dönüştürür.
+
+Kullanım: python export_models.py [--rows N]
+Her model için orijinal pickle ile derlenmiş değerlendirici rastgele satırlar
+üzerinde karşılaştırılır; tahminler birebir eşleşmezse dosya yazılmaz.
+"""
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+
+from compiled_models import CompiledLinearSVC, CompiledLogisticRegression, load_compiled_model
+from risk_models import MODEL_FEATURES, MODEL_FILES, MODELS_DIR, compiled_path, file_sha
+
+# Karşılaştırma satırları için özellik aralıkları (eğitim verisinin kapsadığından geniş)
+FEATURE_RANGES = {
+    'diabetes': [(0, 17), (0, 250), (0, 130), (0, 100), (0, 850), (0, 70), (0.05, 2.5), (18, 90)],
+    'heart': [(20, 90), (0, 1), (0, 3), (80, 210), (100, 600), (0, 1), (0, 2), (60, 210),
+              (0, 1), (0, 6.5), (0, 2), (0, 4), (0, 3)],
+}
+
+# SVC karar değeri libsvm içinde destek vektörleri üzerinden toplandığı için
+# coef_ ile hesaplanandan ~1e-8 mertebesinde sapabilir
+TOLERANCE = 1e-6
+
+
+def compile_estimator(estimator, source_sha):
+    kind = type(estimator).__name__
+    if kind == 'SVC':
+        if estimator.kernel != 'linear':
+            raise ValueError(f'Yalnızca doğrusal çekirdekli SVC derlenebilir (kernel={estimator.kernel})')
+        cls = CompiledLinearSVC
+    elif kind == 'LogisticRegression':
+        if len(estimator.classes_) != 2:
+            raise ValueError('Yalnızca ikili lojistik regresyon derlenebilir')
+        cls = CompiledLogisticRegression
+    else:
+        raise ValueError(f'Desteklenmeyen model: {kind}')
+    return cls(estimator.coef_, estimator.intercept_, estimator.classes_, source_sha=source_sha)
+
+
+def parity_rows(model_name, n, seed=0):
+    rng = np.random.default_rng(seed)
+    lows, highs = zip(*FEATURE_RANGES[model_name])
+    X = rng.uniform(lows, highs, size=(n, len(lows)))
+    # Karar sınırına yakın satırlar da eklensin diye tam sayıya yuvarlanmış bir kopya
+    return np.vstack([X, np.round(X)])
+
+
+def check_parity(model_name, estimator, compiled, rows):
+    """Return a list of mismatch descriptions (empty when outputs agree)"""
+    X = parity_rows(model_name, rows)
+    problems = []
+    if not np.array_equal(estimator.predict(X), compiled.predict(X)):
+        problems.append('predict farklı')
+    if not np.allclose(estimator.decision_function(X), compiled.decision_function(X), rtol=TOLERANCE, atol=TOLERANCE):
+        problems.append('decision_function farklı')
+    if hasattr(estimator, 'predict_proba') and estimator.__class__.__name__ == 'LogisticRegression':
+        if not np.allclose(estimator.predict_proba(X), compiled.predict_proba(X), rtol=TOLERANCE, atol=TOLERANCE):
+            problems.append('predict_proba farklı')
+    return problems
+
+
+def export(rows):
+    failed = False
+    for model_name, filename in MODEL_FILES.items():
+        path = os.path.join(MODELS_DIR, filename)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        estimator = pickle.loads(raw)
+        if estimator.n_features_in_ != len(MODEL_FEATURES[model_name]):
+            print(f'{model_name}: özellik sayısı uyuşmuyor')
+            failed = True
+            continue
+        compiled = compile_estimator(estimator, file_sha(raw))
+        problems = check_parity(model_name, estimator, compiled, rows)
+        if problems:
+            print(f'{model_name}: parite hatası ({", ".join(problems)}), dosya yazılmadı')
+            failed = True
+            continue
+        out_path = compiled_path(path)
+        compiled.save(out_path)
+        # Diskten okunan dosya da aynı sonuçları vermeli
+        problems = check_parity(model_name, estimator, load_compiled_model(out_path), rows)
+        if problems:
+            print(f'{model_name}: kaydedilen dosyada parite hatası ({", ".join(problems)})')
+            failed = True
+            continue
+        print(f'{model_name}: {os.path.basename(out_path)} yazıldı ({compiled.kind}, sürüm {compiled.source_sha}, {2 * rows} satırda parite tamam)')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    sys.exit(export(parser.parse_args().rows))
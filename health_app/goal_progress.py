@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+# Günlük hedeflerin varsayılan değerleri (model varsayılanları da buradan okunur)
+DEFAULT_TARGETS = {
+    'steps': 8000,
+    'water': 2.0,  # litre
+    'sleep': 7.0,  # saat
+}
+
+# Bir günün "hedeflere ulaşıldı" sayılması için karşılanması gereken alanlar
+GOAL_FIELDS = tuple(DEFAULT_TARGETS)
+
+# Son günlerin bit maskesi genişliği; SQLite tamsayıları işaretli 64 bit olduğundan 62 gün
+MASK_DAYS = 62
+_FULL_MASK = (1 << MASK_DAYS) - 1
+
+WEEK_DAYS = 7
+MONTH_DAYS = 30
+
+
+def goals_met(goal, entry):
+    """True when the entry reaches every daily target that is set on the goal"""
+    targets = [(getattr(goal, field), getattr(entry, field)) for field in GOAL_FIELDS]
+    targets = [(target, value) for target, value in targets if target]
+    return bool(targets) and all(value is not None and value >= target for target, value in targets)
+
+
+def _mark_mask(progress, day, met):
+    # Bit i, mask_date'ten i gün önceki günü temsil eder
+    if progress.mask_date is None or day > progress.mask_date:
+        shift = (day - progress.mask_date).days if progress.mask_date is not None else MASK_DAYS
+        progress.met_mask = ((progress.met_mask or 0) << shift) & _FULL_MASK if shift < MASK_DAYS else 0
+        progress.mask_date = day
+    offset = (progress.mask_date - day).days
+    if offset < MASK_DAYS:
+        if met:
+            progress.met_mask = (progress.met_mask or 0) | (1 << offset)
+        else:
+            progress.met_mask = (progress.met_mask or 0) & ~(1 << offset)
+    if progress.first_entry_date is None or day < progress.first_entry_date:
+        progress.first_entry_date = day
+
+
+def mark_day(progress, day, met, was_met=None):
+    """Fold one day's upserted entry into the streak and compliance state in O(1)
+
+    `was_met` is the day's previous result (None for a new entry). Logging a day
+    after the latest met day extends or restarts the current streak; corrections
+    to earlier days can merge or split runs, so those return False and the caller
+    rebuilds from the stored entries.
+    """
+    _mark_mask(progress, day, met)
+    if met == bool(was_met):
+        return True
+    end = progress.streak_end
+    if not met or (end is not None and day < end):
+        return False
+    progress.current_streak = (progress.current_streak or 0) + 1 if end is not None and day == end + timedelta(days=1) else 1
+    progress.streak_end = day
+    progress.longest_streak = max(progress.longest_streak or 0, progress.current_streak)
+    return True
+
+
+def rebuild(progress, days):
+    """Recompute all streak and compliance state from (date, met) pairs in date order"""
+    progress.met_mask = 0
+    progress.mask_date = None
+    progress.first_entry_date = None
+    progress.current_streak = 0
+    progress.longest_streak = 0
+    progress.streak_end = None
+    for day, met in days:
+        if day is None:
+            continue
+        _mark_mask(progress, day, met)
+        if met:
+            end = progress.streak_end
+            progress.current_streak = progress.current_streak + 1 if end is not None and day == end + timedelta(days=1) else 1
+            progress.streak_end = day
+            progress.longest_streak = max(progress.longest_streak, progress.current_streak)
+    return progress
+
+
+def current_streak(progress, today):
+    """Consecutive met days ending today, or yesterday while today is not logged yet"""
+    if progress is None or progress.streak_end is None or progress.streak_end < today - timedelta(days=1):
+        return 0
+    return progress.current_streak or 0
+
+
+def compliance(progress, today, days):
+    """Share of the last `days` days (today included, none before the first entry) that met every goal"""
+    if progress is None or progress.mask_date is None or progress.first_entry_date is None:
+        return None
+    window = min(days, MASK_DAYS, (today - progress.first_entry_date).days + 1)
+    if window <= 0:
+        return None
+    # Penceredeki günlerin maskedeki bit aralığı
+    lead = (progress.mask_date - today).days
+    low = max(0, lead)
+    high = min(MASK_DAYS, lead + window)
+    if high <= low:
+        return 0.0
+    bits = ((progress.met_mask or 0) >> low) & ((1 << (high - low)) - 1)
+    return bin(bits).count('1') / window
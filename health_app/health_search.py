@@ -0,0 +1,190 @@
+import math
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from doctor_matcher import turkish_fold
+from reference_data import store as reference_store
+
+# Önbellekte tutulacak en fazla sonuç sayfası
+RESULT_CACHE_SIZE = int(os.getenv('HEALTH_LIBRARY_CACHE_SIZE', 256))
+DEFAULT_PAGE_SIZE = 12
+
+# Alan ağırlıkları: başlıkta geçen terim açıklamada geçenden daha değerli
+FIELD_WEIGHTS = (('title', 3.0), ('category', 2.0), ('tags', 2.0), ('desc', 1.0))
+
+_ASCII_FOLD = str.maketrans('ıçğöşüâîû', 'icgosuaiu')
+_TOKEN = re.compile(r'\w+')
+
+# Sık kullanılan çekim ekleri, uzundan kısaya (hafif bir kök bulucu). Tek ünlü
+# ekler (-ı, -e, ...) listede yok: kökün son ünlüsünden ayırt edilemezler
+SUFFIXES = sorted({
+    'lerinden', 'larından', 'lerinde', 'larında', 'lerine', 'larına', 'lerini', 'larını',
+    'leri', 'ları', 'ler', 'lar', 'nden', 'ndan', 'nde', 'nda', 'den', 'dan', 'ten', 'tan',
+    'de', 'da', 'te', 'ta', 'nin', 'nın', 'nun', 'nün', 'in', 'ın', 'un', 'ün',
+    'ım', 'im', 'um', 'üm', 'yi', 'yı', 'yu', 'yü', 'ye', 'ya', 'si', 'sı', 'su', 'sü',
+}, key=len, reverse=True)
+VOWELS = frozenset('aeıioöuü')
+# -nda/-nden yalnızca iyelik ekinden (-ı, -su, ...) sonra gelir; "tansiyonda" kökün n'sini korur
+PRONOMINAL_SUFFIXES = frozenset(('nden', 'ndan', 'nde', 'nda'))
+HIGH_VOWELS = frozenset('ıiuü')
+MIN_STEM_LENGTH = 3
+
+SearchPage = namedtuple('SearchPage', 'items total page pages per_page query tags')
+
+
+def stem(token):
+    """Strip common Turkish suffixes, then a final vowel, keeping at least MIN_STEM_LENGTH characters
+
+    A final vowel may be the root's own ("uyku") or a bare possessive/accusative
+    suffix ("baş-ı"); dropping it after the suffixes are gone maps both to the
+    same stem, so "uyku", "uykusu" and "uykuda" (and "baş", "başı", "başım")
+    share one index term.
+    """
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                if suffix in PRONOMINAL_SUFFIXES and token[-len(suffix) - 1] not in HIGH_VOWELS:
+                    continue
+                token = token[:-len(suffix)]
+                stripped = True
+                break
+    if token[-1:] in VOWELS and len(token) > MIN_STEM_LENGTH:
+        token = token[:-1]
+    return token
+
+
+def normalize(text):
+    """Turkish-aware case and accent folding (İ/I, ş -> s, ...)"""
+    return turkish_fold(text).translate(_ASCII_FOLD)
+
+
+def analyze(text):
+    # Eklerin kaldırılması aksanlı halde yapılır, sonra ASCII'ye katlanır
+    return [stem(token).translate(_ASCII_FOLD) for token in _TOKEN.findall(turkish_fold(text))]
+
+
+def item_tags(item):
+    tags = [item['category']] if item.get('category') else []
+    tags.extend(item.get('tags', ()))
+    return list(dict.fromkeys(tags))
+
+
+class HealthLibraryIndex:
+    """Inverted index over the health library, built once per content version"""
+
+    def __init__(self, library_data, version=None):
+        self.version = version
+        self.contents = list(library_data.get('contents', ()))
+        self.postings = {}  # terim -> {belge no: ağırlıklı terim sıklığı}
+        self.tag_index = {}  # katlanmış etiket -> belge numaraları
+        self.tags = []
+        for doc_id, item in enumerate(self.contents):
+            for field, weight in FIELD_WEIGHTS:
+                value = item.get(field)
+                if not value:
+                    continue
+                text = ' '.join(value) if isinstance(value, (list, tuple)) else value
+                for term in analyze(text):
+                    doc_terms = self.postings.setdefault(term, {})
+                    doc_terms[doc_id] = doc_terms.get(doc_id, 0.0) + weight
+            for tag in item_tags(item):
+                key = normalize(tag)
+                if key not in self.tag_index:
+                    self.tag_index[key] = set()
+                    self.tags.append(tag)
+                self.tag_index[key].add(doc_id)
+        n_docs = len(self.contents)
+        self.idf = {term: math.log(1 + n_docs / len(docs)) for term, docs in self.postings.items()}
+
+    def search(self, query='', tags=(), page=1, per_page=DEFAULT_PAGE_SIZE):
+        """Ranked, tag-filtered and paginated search; an empty query lists matches in file order"""
+        candidates = None
+        if tags:
+            # Seçilen etiketlerden herhangi birini taşıyan içerikler
+            candidates = set().union(*(self.tag_index.get(normalize(tag), ()) for tag in tags))
+
+        terms = list(dict.fromkeys(analyze(query or '')))
+        if terms:
+            scores = {}
+            for term in terms:
+                idf = self.idf.get(term)
+                if idf is None:
+                    continue
+                for doc_id, tf in self.postings[term].items():
+                    if candidates is None or doc_id in candidates:
+                        scores[doc_id] = scores.get(doc_id, 0.0) + tf * idf
+            ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        elif candidates is not None:
+            ranked = sorted(candidates)
+        else:
+            ranked = list(range(len(self.contents)))
+
+        per_page = max(1, per_page)
+        pages = max(1, math.ceil(len(ranked) / per_page))
+        page = min(max(1, page), pages)
+        start = (page - 1) * per_page
+        items = [self.contents[doc_id] for doc_id in ranked[start:start + per_page]]
+        return SearchPage(items, len(ranked), page, pages, per_page, query or '', tuple(tags))
+
+
+class ResultPageCache:
+    """LRU cache of rendered result fragments, keyed by index version and query"""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = render()
+        if self.maxsize > 0:
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+result_cache = ResultPageCache()
+
+
+def get_index(store=reference_store):
+    """Index built from the current health_library_data snapshot"""
+    return store.derived('health_library_data', HealthLibraryIndex)
+
+
+def _on_reference_reload(name, snapshot):
+    # İçerik değişince eski sürümün sayfaları yer kaplamasın
+    if name == 'health_library_data':
+        result_cache.clear()
+
+
+reference_store.on_reload(_on_reference_reload)
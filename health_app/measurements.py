@@ -0,0 +1,100 @@
+import math
+import os
+import re
+
+# Ölçüm türü -> formda kullanılan birim
+DEFAULT_UNITS = {
+    'blood_glucose': 'mg/dL',
+    'blood_pressure': 'mmHg',
+    'peak_flow': 'L/min',
+}
+
+# Ölçüm türü -> hedef aralık (birincil değer için, formdaki önerilen aralıklar)
+TARGET_RANGES = {
+    'blood_glucose': (70.0, 130.0),
+    'blood_pressure': (90.0, 140.0),
+    'peak_flow': (400.0, 700.0),
+}
+
+# Üstel hareketli ortalamada yeni ölçümün ağırlığı
+EWMA_ALPHA = float(os.getenv('MEASUREMENT_EWMA_ALPHA', 0.2))
+# Anomali taban çizgisinin varyansı daha yavaş güncellenir; kısa pencere z-skorlarını şişirir
+EWM_VAR_ALPHA = float(os.getenv('MEASUREMENT_EWM_VAR_ALPHA', 0.05))
+
+# Kişisel taban çizgisinden bu kadar standart sapma uzaklaşan ölçüm işaretlenir
+ANOMALY_Z_THRESHOLD = float(os.getenv('ANOMALY_Z_THRESHOLD', 3.0))
+# Taban çizgisi bu kadar ölçümden sonra güvenilir sayılır
+ANOMALY_MIN_COUNT = int(os.getenv('ANOMALY_MIN_COUNT', 5))
+
+# "120", "5,6", "120/80", "120 / 80 mmHg", "110 mg/dL" gibi girişler
+_VALUE = re.compile(r'^\s*(-?\d+(?:[.,]\d+)?)\s*(?:/\s*(-?\d+(?:[.,]\d+)?))?\s*(.*?)\s*$')
+
+
+def _number(text):
+    return float(text.replace(',', '.'))
+
+
+def parse_measurement(measurement_type, value):
+    """Split a free-text measurement into (primary, secondary, unit)
+
+    secondary is the second number of a pair such as blood pressure (diastolic).
+    Values that cannot be read return (None, None, unit).
+    """
+    unit = DEFAULT_UNITS.get(measurement_type)
+    match = _VALUE.match(value or '')
+    if not match:
+        return None, None, unit
+    primary, secondary, written_unit = match.groups()
+    return (
+        _number(primary),
+        _number(secondary) if secondary is not None else None,
+        written_unit[:20] or unit,
+    )
+
+
+def update_running_stats(stats, value, measured_on, alpha=EWMA_ALPHA, var_alpha=EWM_VAR_ALPHA):
+    """Fold one reading into a running-statistics row in O(1)
+
+    Count/mean/M2 follow Welford's algorithm; EWMA and its exponentially weighted
+    variance follow insert order, while the last value follows the measurement date. Readings inside TARGET_RANGES are
+    counted for time in range.
+    """
+    count = (stats.count or 0) + 1
+    mean = stats.mean or 0.0
+    delta = value - mean
+    mean += delta / count
+    stats.m2 = (stats.m2 or 0.0) + delta * (value - mean)
+    stats.count = count
+    stats.mean = mean
+    if stats.ewma is None:
+        stats.ewma = value
+        stats.ewm_var = 0.0
+    else:
+        diff = value - stats.ewma
+        stats.ewma += alpha * diff
+        stats.ewm_var = (1 - var_alpha) * ((stats.ewm_var or 0.0) + var_alpha * diff * diff)
+    stats.min_value = value if stats.min_value is None else min(stats.min_value, value)
+    stats.max_value = value if stats.max_value is None else max(stats.max_value, value)
+    if stats.last_date is None or measured_on >= stats.last_date:
+        stats.last_value = value
+        stats.last_date = measured_on
+    target = TARGET_RANGES.get(stats.measurement_type)
+    if target is not None and target[0] <= value <= target[1]:
+        stats.in_range_count = (stats.in_range_count or 0) + 1
+    return stats
+
+
+def anomaly_score(stats, value, min_count=ANOMALY_MIN_COUNT, var_alpha=EWM_VAR_ALPHA):
+    """z-score of a new reading against the EWMA baseline, before the reading is folded in
+
+    The variance starts at zero, so it is bias-corrected by the number of updates
+    it has seen. Returns None while the baseline is too short or flat to judge.
+    """
+    if stats is None or (stats.count or 0) < min_count or not stats.ewm_var:
+        return None
+    variance = stats.ewm_var / (1 - (1 - var_alpha) ** (stats.count - 1))
+    return (value - stats.ewma) / math.sqrt(variance)
+
+
+def is_anomaly(score, threshold=ANOMALY_Z_THRESHOLD):
+    return score is not None and abs(score) > threshold
@@ -0,0 +1,262 @@
+import bisect
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import request
+from sqlalchemy import event
+
+# Süre histogramları için varsayılan kova sınırları (saniye)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# İstek/yanıt gövdesi boyutları (bayt) ve istek başına SQL sorgusu sayısı için kovalar
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        # value <= sınır olan ilk kova
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile from the buckets (upper bound of the matching bucket)"""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return None
+        target = q * total
+        running = 0
+        for i, c in enumerate(counts):
+            running += c
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = []
+            running = 0
+            for c in self.counts:
+                running += c
+                cumulative.append(running)
+            return {
+                'buckets': [[str(b), c] for b, c in zip(self.buckets + ('+Inf',), cumulative)],
+                'count': self.count,
+                'sum': round(self.sum, 6),
+            }
+
+
+class HistogramRegistry:
+    """Named, labelled histograms shared by the whole process"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._buckets = {}  # ad -> kova sınırları (aynı adlı serilerde ortak)
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, help_text, buckets=None):
+        self._help[name] = help_text
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram(self._buckets.get(name, DEFAULT_BUCKETS)))
+        return hist
+
+    def items(self):
+        with self._lock:
+            return list(self._histograms.items())
+
+    def snapshot(self, name=None):
+        result = []
+        for (hist_name, labels), hist in self.items():
+            if name is not None and hist_name != name:
+                continue
+            data = hist.snapshot()
+            data['name'] = hist_name
+            data['labels'] = dict(labels)
+            data['p50'] = hist.quantile(0.5)
+            data['p95'] = hist.quantile(0.95)
+            data['p99'] = hist.quantile(0.99)
+            result.append(data)
+        return result
+
+    def render_prometheus(self):
+        """All histograms in the Prometheus text exposition format (version 0.0.4)"""
+        by_name = {}
+        for (name, labels), hist in self.items():
+            by_name.setdefault(name, []).append((labels, hist))
+        lines = []
+        for name in sorted(by_name):
+            if name in self._help:
+                lines.append(f'# HELP {name} {self._help[name]}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, hist in sorted(by_name[name], key=lambda item: item[0]):
+                data = hist.snapshot()
+                for bound, count in data['buckets']:
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {data["sum"]}')
+                lines.append(f'{name}_count{_format_labels(labels)} {data["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+histograms = HistogramRegistry()
+
+REQUEST_LATENCY_METRIC = 'http_request_duration_seconds'
+REQUEST_SIZE_METRIC = 'http_request_size_bytes'
+RESPONSE_SIZE_METRIC = 'http_response_size_bytes'
+REQUEST_SQL_QUERIES_METRIC = 'http_request_sql_queries'
+REQUEST_SQL_TIME_METRIC = 'http_request_sql_seconds'
+SQL_QUERY_METRIC = 'sql_query_duration_seconds'
+
+
+class _RequestState:
+    __slots__ = ('endpoint', 'method', 'detailed', 'start', 'queries', 'sql_time')
+
+    def __init__(self, endpoint, method, detailed):
+        self.endpoint = endpoint
+        self.method = method
+        self.detailed = detailed
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+
+
+class RequestMetrics:
+    """Per-endpoint latency, payload sizes and SQL usage, recorded from Flask request hooks
+
+    A request is recorded with probability `sample_rate`; endpoints listed in
+    `detailed` are always recorded and additionally get a histogram per SQL
+    statement. SQL is counted from engine cursor events into a thread-local
+    that exists only while a sampled request runs, so unsampled requests and
+    background threads pay a single attribute lookup per query.
+    """
+
+    def __init__(self, registry=histograms):
+        self.registry = registry
+        self.sample_rate = 1.0
+        self.detailed = frozenset()
+        self._local = threading.local()
+        self._series_cache = {}  # (uç nokta, yöntem, durum) -> histogramlar
+        registry.describe(REQUEST_LATENCY_METRIC, 'Request latency by endpoint, method and status')
+        registry.describe(REQUEST_SIZE_METRIC, 'Request body size', SIZE_BUCKETS)
+        registry.describe(RESPONSE_SIZE_METRIC, 'Response body size', SIZE_BUCKETS)
+        registry.describe(REQUEST_SQL_QUERIES_METRIC, 'SQL statements executed per request', COUNT_BUCKETS)
+        registry.describe(REQUEST_SQL_TIME_METRIC, 'Total SQL time per request')
+        registry.describe(SQL_QUERY_METRIC, 'Single SQL statement latency on detailed endpoints')
+
+    def init_app(self, app, engine, sample_rate=1.0, detailed=()):
+        self.sample_rate = sample_rate
+        self.detailed = frozenset(detailed)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor)
+
+    def _start(self):
+        endpoint = request.endpoint or 'unmatched'
+        detailed = endpoint in self.detailed
+        if not detailed and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._local.state = None
+            return
+        self._local.state = _RequestState(endpoint, request.method, detailed)
+
+    def _before_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'state', None) is not None:
+            context._metrics_start = time.perf_counter()
+
+    def _after_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        state = getattr(self._local, 'state', None)
+        start = getattr(context, '_metrics_start', None)
+        if state is None or start is None:
+            return
+        elapsed = time.perf_counter() - start
+        state.queries += 1
+        state.sql_time += elapsed
+        if state.detailed:
+            verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+            self.registry.histogram(SQL_QUERY_METRIC, endpoint=state.endpoint, statement=verb).observe(elapsed)
+
+    def _finish(self, response):
+        state = getattr(self._local, 'state', None)
+        if state is not None:
+            self._local.state = None
+            self._record(state, response.status_code, response.content_length)
+        return response
+
+    def _teardown(self, exc):
+        # after_request çalışmadıysa (yakalanmamış hata) istek 500 olarak kaydedilir
+        state = getattr(self._local, 'state', None)
+        if state is not None:
+            self._local.state = None
+            self._record(state, 500, None)
+
+    def _series(self, endpoint, method, status):
+        # Etiket sıralaması ve sözlük aramaları istek başına tekrarlanmasın
+        key = (endpoint, method, status)
+        series = self._series_cache.get(key)
+        if series is None:
+            labels = {'endpoint': endpoint, 'method': method}
+            series = self._series_cache[key] = (
+                self.registry.histogram(REQUEST_LATENCY_METRIC, status=str(status), **labels),
+                self.registry.histogram(REQUEST_SIZE_METRIC, **labels),
+                self.registry.histogram(RESPONSE_SIZE_METRIC, **labels),
+                self.registry.histogram(REQUEST_SQL_QUERIES_METRIC, **labels),
+                self.registry.histogram(REQUEST_SQL_TIME_METRIC, **labels),
+            )
+        return series
+
+    def _record(self, state, status, response_size):
+        elapsed = time.perf_counter() - state.start
+        latency, request_size, response_size_hist, sql_queries, sql_time = self._series(state.endpoint, state.method, status)
+        latency.observe(elapsed)
+        if request.content_length is not None:
+            request_size.observe(request.content_length)
+        if response_size is not None:
+            response_size_hist.observe(response_size)
+        sql_queries.observe(state.queries)
+        sql_time.observe(state.sql_time)
+
+
+request_metrics = RequestMetrics()
+
+
+@contextmanager
+def timed(name, **labels):
+    """Record the duration of the with-block into histogram `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograms.histogram(name, **labels).observe(time.perf_counter() - start)
@@ -1,56 +1,88 @@
-from app import app, db
-from sqlalchemy import text, inspect
-from flask import Flask
-from flask_migrate import Migrate
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///health_app.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db.init_app(app)
-migrate = Migrate(app, db)
-
-def migrate():
-    with app.app_context():
-        inspector = inspect(db.engine)
-        
-        # Create meals table if it doesn't exist
-        if 'meal' not in inspector.get_table_names():
-            try:
-                db.session.execute(text('''
-                    CREATE TABLE meal (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER NOT NULL,
-                        date DATE NOT NULL,
-                        meal_type VARCHAR(20),
-                        food_name VARCHAR(100) NOT NULL,
-                        portion FLOAT NOT NULL DEFAULT 100,
-                        calories FLOAT NOT NULL,
-                        protein FLOAT,
-                        carbs FLOAT,
-                        fat FLOAT,
-                        food_id INTEGER,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES user (id)
-                    )
-                '''))
-                print("Created meals table")
-            except Exception as e:
-                print(f"Error creating meals table: {e}")
-
-        try:
-            db.session.commit()
-            print("Migration completed successfully!")
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error committing changes: {e}")
+"""Sürümlü şema geçişleri.
+
+Geçişler her işçi açılışında değil, dağıtım sırasında bir kez çalıştırılır:
+    flask --app app migrate-db
+    (veya) python migrations.py
+Uygulanan sürümler schema_version tablosunda tutulur; create_app yalnızca
+kayıtlı sürümü okuyup koddaki son sürümle karşılaştırır.
+"""
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+# upgrade: argümansız çağrılır, uygulama bağlamı içinde çalışır
+Migration = namedtuple('Migration', 'version description upgrade')
+
+schema_version = Table(
+    'schema_version', MetaData(),
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('description', String(200)),
+    Column('applied_at', DateTime),
+)
+
+
+def add_column_ddl(dialect, table_name, column):
+    """ALTER TABLE ... ADD COLUMN for `column`, compiled for `dialect`
+
+    Types and server defaults are rendered by SQLAlchemy, so e.g.
+    server_default=false() becomes DEFAULT false on PostgreSQL and DEFAULT 0
+    on SQLite/MySQL.
+    """
+    Table(table_name, MetaData(), column)  # CreateColumn tabloya bağlı bir kolon ister
+    return (f'ALTER TABLE {dialect.identifier_preparer.quote(table_name)} '
+            f'ADD COLUMN {CreateColumn(column).compile(dialect=dialect)}')
+
+
+def add_column(conn, table_name, column):
+    conn.exec_driver_sql(add_column_ddl(conn.dialect, table_name, column))
+
+
+def create_index(conn, name, table_name, columns, unique=False):
+    """Create an index unless one with this name exists (CREATE INDEX IF NOT EXISTS is not portable)"""
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    Index(name, *(table.c[column] for column in columns), unique=unique).create(conn, checkfirst=True)
+
+
+def current_version(engine):
+    """Highest applied migration version, 0 for a database that was never migrated"""
+    with engine.connect() as conn:
+        if not inspect(conn).has_table('schema_version'):
+            return 0
+        return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+def latest_version(migrations):
+    return max(migration.version for migration in migrations)
+
+
+def upgrade(engine, migrations, force=False):
+    """Apply every migration newer than the recorded version, in version order
+
+    Steps must be idempotent: the first one creates the tables of the current
+    models, and databases created before versioning get every step once. With
+    force=True all steps are re-run, which repairs a partially migrated schema.
+    """
+    schema_version.create(engine, checkfirst=True)
+    current = 0 if force else current_version(engine)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        migration.upgrade()
+        with engine.begin() as conn:
+            conn.execute(text('DELETE FROM schema_version WHERE version = :version'), {'version': migration.version})
+            conn.execute(
+                text('INSERT INTO schema_version (version, description, applied_at) VALUES (:version, :description, :applied_at)'),
+                {'version': migration.version, 'description': migration.description, 'applied_at': datetime.utcnow()},
+            )
+        applied.append(migration)
+    return applied
+
 
 if __name__ == '__main__':
-    migrate()
-    with app.app_context():
-        # Yeni kolonları ekle
-        with db.engine.connect() as conn:
-            conn.execute('ALTER TABLE meal ADD COLUMN food_id INTEGER')
-            conn.execute('ALTER TABLE meal ADD COLUMN portion FLOAT NOT NULL DEFAULT 100')
-            conn.commit()
-        print("Veritabanı başarıyla güncellendi!") 
\ No newline at end of file
+    from app import create_app, migrate_db
+
+    with create_app().app_context():
+        migrate_db()
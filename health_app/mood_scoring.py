@@ -0,0 +1,155 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from reference_data import store as reference_store
+
+
+class CategoryFeedback:
+    """Threshold table of one category, compiled for bisect lookup
+
+    Keeps the questionnaire's rule: the first level in file order whose
+    threshold is <= avg wins, otherwise the last level is used.
+    """
+
+    def __init__(self, levels):
+        names = list(levels.keys())
+        self.levels = levels
+        self.fallback = names[-1]
+        ranked = sorted(
+            (data['threshold'], order, name)
+            for order, (name, data) in enumerate(levels.items())
+            if 'threshold' in data
+        )
+        self.thresholds = np.array([threshold for threshold, _, _ in ranked], dtype=np.float64)
+        self._threshold_list = self.thresholds.tolist()
+        # Eşiği <= avg olan seviyeler sıralı dizinin bir önekidir; önekteki
+        # en küçük dosya sırası aranan seviyeyi verir
+        self.prefix_level = []
+        best = None
+        for _, order, name in ranked:
+            if best is None or order < best[0]:
+                best = (order, name)
+            self.prefix_level.append(best[1])
+
+    def level(self, avg):
+        eligible = bisect_right(self._threshold_list, avg)
+        return self.prefix_level[eligible - 1] if eligible else self.fallback
+
+    def levels_for(self, avgs):
+        """Vectorized level lookup for an array of averages"""
+        eligible = np.searchsorted(self.thresholds, avgs, side='right')
+        return [self.prefix_level[k - 1] if k else self.fallback for k in eligible.tolist()]
+
+
+class MoodScorer:
+    """Questionnaire compiled into an id -> category index and per-category threshold tables"""
+
+    def __init__(self, test_data, version=None):
+        self.version = version
+        self.questions = test_data['questions']
+        self.general_analysis_data = test_data['general_analysis']
+        self.feedback_data = test_data['feedback']
+        self.categories = list(dict.fromkeys(q['category'] for q in self.questions))
+        category_index = {cat: i for i, cat in enumerate(self.categories)}
+        self.question_ids = [q['id'] for q in self.questions]
+        self.question_category = {q['id']: q['category'] for q in self.questions}
+        # Soru x kategori birim matrisi: toplu skorlamada tek matris çarpımı
+        self.membership = np.zeros((len(self.questions), len(self.categories)))
+        for i, q in enumerate(self.questions):
+            self.membership[i, category_index[q['category']]] = 1.0
+        self.category_feedback = {cat: CategoryFeedback(levels) for cat, levels in self.feedback_data.items()}
+
+    def collect_answers(self, form):
+        """Pick this questionnaire's answers out of a submitted form"""
+        answers = {}
+        for qid in self.question_ids:
+            val = form.get(qid)
+            if val is not None:
+                answers[qid] = int(val)
+        return answers
+
+    def score(self, answers):
+        """Score one answer set"""
+        scores = {}
+        counts = {}
+        for qid, val in answers.items():
+            cat = self.question_category.get(qid)
+            if cat is None:
+                continue
+            scores[cat] = scores.get(cat, 0) + int(val)
+            counts[cat] = counts.get(cat, 0) + 1
+        avgs = {cat: round(scores[cat] / counts[cat], 2) for cat in scores}
+        levels = {cat: self.category_feedback[cat].level(avg) for cat, avg in avgs.items()}
+        return self._result(answers, scores, avgs, levels)
+
+    def score_batch(self, answer_sets):
+        """Score many answer sets with one matrix product and vectorized threshold lookups"""
+        if not answer_sets:
+            return []
+        column = {qid: i for i, qid in enumerate(self.question_ids)}
+        values = np.zeros((len(answer_sets), len(self.question_ids)))
+        answered = np.zeros_like(values)
+        for row, answers in enumerate(answer_sets):
+            for qid, val in answers.items():
+                if qid in column:
+                    values[row, column[qid]] = int(val)
+                    answered[row, column[qid]] = 1.0
+        sums = values @ self.membership
+        counts = answered @ self.membership
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avgs = np.round(sums / counts, 2)
+        levels = {
+            cat: self.category_feedback[cat].levels_for(np.nan_to_num(avgs[:, k]))
+            for k, cat in enumerate(self.categories)
+        }
+        results = []
+        for row, answers in enumerate(answer_sets):
+            present = [k for k in range(len(self.categories)) if counts[row, k]]
+            row_scores = {self.categories[k]: int(sums[row, k]) for k in present}
+            row_avgs = {self.categories[k]: float(avgs[row, k]) for k in present}
+            row_levels = {self.categories[k]: levels[self.categories[k]][row] for k in present}
+            results.append(self._result(answers, row_scores, row_avgs, row_levels))
+        return results
+
+    def _result(self, answers, scores, avgs, levels):
+        # Yorumlar ve emojiler
+        feedback = {}
+        for cat, avg in avgs.items():
+            level = self.feedback_data[cat][levels[cat]]
+            feedback[cat] = {'avg': avg, 'text': level['text'], 'emoji': level['emoji']}
+        return {
+            'answers': answers,
+            'scores': scores,
+            'feedback': feedback,
+            'general_analysis': self.general_analysis(feedback),
+        }
+
+    def general_analysis(self, feedback):
+        general_analysis_data = self.general_analysis_data
+        low_cats = [cat for cat, v in feedback.items() if v['avg'] < 1.2]
+        high_cats = [cat for cat, v in feedback.items() if v['avg'] > 2.2]
+
+        if len(low_cats) >= general_analysis_data['multiple_low']['threshold']:
+            return general_analysis_data['multiple_low']['text']
+        if ('stress' in feedback and
+                feedback['stress']['avg'] > general_analysis_data['stress_motivation']['stress_threshold'] and
+                'motivation' in feedback and
+                feedback['motivation']['avg'] < general_analysis_data['stress_motivation']['motivation_threshold']):
+            return general_analysis_data['stress_motivation']['text']
+        if len(high_cats) >= general_analysis_data['multiple_high']['threshold']:
+            return general_analysis_data['multiple_high']['text']
+        # Kategoriye özel öneriler
+        suggestions = []
+        for cat in feedback:
+            if feedback[cat]['avg'] < 1.5:
+                if cat in self.feedback_data and 'low' in self.feedback_data[cat]:
+                    suggestions.append(self.feedback_data[cat]['low']['text'])
+        if suggestions:
+            return "\n".join(suggestions)
+        return general_analysis_data['default']
+
+
+def get_scorer(store=reference_store):
+    """Scorer compiled from the current mood_test_data snapshot"""
+    return store.derived('mood_test_data', MoodScorer)
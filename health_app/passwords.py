@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# PBKDF2 iterasyon sayısı (iş faktörü); değiştiğinde eski özetler girişte yenilenir
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 600000))
+PASSWORD_HASH_METHOD = f'pbkdf2:sha256:{PASSWORD_HASH_ITERATIONS}'
+# Aynı anda çalışan özetleme sayısı ve kuyrukta bekleyebilecek toplam iş
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 4 * PASSWORD_HASH_WORKERS))
+# Kuyrukta yer açılması için en fazla bekleme (saniye); sonra istek reddedilir
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 2.0))
+
+# Başarısız giriş sınırları: pencere (saniye) içinde en fazla deneme. IP sınırı
+# request.remote_addr ile tutulur; ters vekil arkasında PROXY_FIX_X_FOR ayarlanmazsa
+# tüm istemciler vekilin adresini paylaşır ve aynı sınıra takılır.
+# Sayaçlar işçi süreci belleğindedir: N işçiyle fiili sınır en fazla N x limit olur
+# (istekler işçilere dağıldıkça) ve her yeniden başlatmada sıfırlanır
+LOGIN_IP_LIMIT = int(os.getenv('LOGIN_IP_LIMIT', 20))
+LOGIN_IP_WINDOW = float(os.getenv('LOGIN_IP_WINDOW', 300))
+LOGIN_ACCOUNT_LIMIT = int(os.getenv('LOGIN_ACCOUNT_LIMIT', 5))
+LOGIN_ACCOUNT_WINDOW = float(os.getenv('LOGIN_ACCOUNT_WINDOW', 900))
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue stays full for longer than the queue timeout"""
+
+
+class PasswordHasher:
+    """Runs PBKDF2 on a small dedicated pool so hashing bursts cannot take every CPU
+
+    hashlib releases the GIL while deriving keys, so request threads that are
+    not hashing keep running. Callers beyond `max_pending` wait at most
+    `queue_timeout` seconds for a slot and then get HashingBusy.
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS,
+                 max_pending=PASSWORD_HASH_MAX_PENDING, queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT):
+        self.method = method
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max(workers, max_pending))
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        if not pwhash or password is None:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when the stored hash was made with a different method or work factor"""
+        return not pwhash or pwhash.split('$', 1)[0] != self.method
+
+
+class AttemptThrottle:
+    """Sliding-window count of failed attempts per key (IP address or account)
+
+    Counts are kept in this process only; see LOGIN_IP_LIMIT for what that
+    means with several workers.
+    """
+
+    def __init__(self, limit, window, maxsize=10000):
+        self.limit = limit
+        self.window = window
+        self.maxsize = maxsize
+        self._failures = OrderedDict()  # anahtar -> başarısız deneme zamanları
+        self._lock = threading.Lock()
+
+    def _prune(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, key):
+        """Seconds until `key` may try again; 0 when it is not throttled"""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._prune(key, now)
+            if failures is None or len(failures) < self.limit:
+                return 0
+            return failures[-self.limit] + self.window - now
+
+    def failure(self, key):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._prune(key, now)
+            if failures is None:
+                failures = self._failures[key] = deque(maxlen=self.limit)
+            failures.append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.maxsize:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._failures.clear()
+
+
+password_hasher = PasswordHasher()
+ip_throttle = AttemptThrottle(LOGIN_IP_LIMIT, LOGIN_IP_WINDOW)
+account_throttle = AttemptThrottle(LOGIN_ACCOUNT_LIMIT, LOGIN_ACCOUNT_WINDOW)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Uygulamanın okuduğu referans dosyaları (paket klasörüne göre)
+DATASETS = {
+    'doctor_data': 'doctor_data.json',
+    'mood_test_data': 'mood_test_data.json',
+    'health_library_data': 'health_library_data.json',
+    'blood_test_references': 'blood_test_references.json',
+    'food_db': 'food_db.json',
+}
+
+# Dosyaların değişip değişmediği en fazla bu sıklıkla (saniye) kontrol edilir
+CHECK_INTERVAL = float(os.getenv('REFERENCE_DATA_CHECK_INTERVAL', 2))
+
+
+def freeze(obj):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+
+def thaw(obj):
+    """Inverse of freeze, for writing a snapshot back to JSON"""
+    if isinstance(obj, (dict, MappingProxyType)):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(value) for value in obj]
+    return obj
+
+
+class Snapshot:
+    """One parsed, immutable version of a reference file"""
+
+    def __init__(self, data, version, mtime):
+        self.data = data
+        self.version = version
+        self.mtime = mtime
+
+
+class ReferenceDataStore:
+    """Parses each reference file once, serves frozen snapshots and reloads on mtime change"""
+
+    def __init__(self, datasets=DATASETS, base_dir=BASE_DIR, check_interval=CHECK_INTERVAL):
+        self.paths = {name: os.path.join(base_dir, filename) for name, filename in datasets.items()}
+        self.check_interval = check_interval
+        self._snapshots = {}
+        self._next_check = {}
+        self._derived = {}  # (name, builder) -> (version, value)
+        self._stats = {name: {'loads': 0, 'total_load_ms': 0.0, 'last_load_ms': None} for name in self.paths}
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    def on_reload(self, callback):
+        """Register callback(name, snapshot), called after a changed file has been reloaded"""
+        self._listeners.append(callback)
+
+    def snapshot(self, name):
+        snap = self._snapshots.get(name)
+        if snap is not None and time.monotonic() < self._next_check.get(name, 0):
+            return snap
+        path = self.paths[name]
+        with self._lock:
+            previous = self._snapshots.get(name)
+            mtime = os.stat(path).st_mtime_ns
+            self._next_check[name] = time.monotonic() + self.check_interval
+            if previous is not None and previous.mtime == mtime:
+                return previous
+            snap = self._load(name, path, mtime)
+        if previous is not None and previous.version != snap.version:
+            for callback in self._listeners:
+                callback(name, snap)
+        return snap
+
+    def get(self, name):
+        """Frozen contents of a reference file"""
+        return self.snapshot(name).data
+
+    def version(self, name):
+        return self.snapshot(name).version
+
+    def derived(self, name, builder):
+        """Cache builder(data, version) per snapshot, e.g. a compiled index or rule table"""
+        snap = self.snapshot(name)
+        key = (name, builder)
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == snap.version:
+            return cached[1]
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached is None or cached[0] != snap.version:
+                cached = (snap.version, builder(snap.data, snap.version))
+                self._derived[key] = cached
+        return cached[1]
+
+    def save(self, name, data):
+        """Atomically write new contents for a writable file (food_db) and publish them"""
+        path = self.paths[name]
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(thaw(data), f, ensure_ascii=False, indent=4)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            self._next_check[name] = 0
+        return self.snapshot(name)
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for name, path in self.paths.items():
+                snap = self._snapshots.get(name)
+                result[name] = dict(self._stats[name], path=path, version=snap.version if snap else None)
+            return result
+
+    def _load(self, name, path, mtime):
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            raw = f.read()
+        snap = Snapshot(freeze(json.loads(raw.decode('utf-8'))), hashlib.sha256(raw).hexdigest()[:12], mtime)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stats = self._stats[name]
+        stats['loads'] += 1
+        stats['total_load_ms'] = round(stats['total_load_ms'] + elapsed_ms, 3)
+        stats['last_load_ms'] = round(elapsed_ms, 3)
+        self._snapshots[name] = snap
+        return snap
+
+
+store = ReferenceDataStore()
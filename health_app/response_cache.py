@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from flask import Response, g, message_flashed, request, session
+from flask_login import current_user
+
+from reference_data import store as reference_store
+
+# Önbellekte tutulacak en fazla yanıt sayısı
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 512))
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', '1') == '1'
+
+CachedResponse = namedtuple('CachedResponse', 'body mimetype etag last_modified expires_at')
+
+
+class CachePolicy:
+    """Caching rules of one route
+
+    ttl: seconds a rendered response may be served again.
+    datasets: reference files whose reload invalidates the route.
+    vary_on_auth: keep separate entries per user (and one for anonymous visitors).
+    """
+
+    def __init__(self, ttl=300, datasets=(), vary_on_auth=True):
+        self.ttl = ttl
+        self.datasets = tuple(datasets)
+        self.vary_on_auth = vary_on_auth
+
+
+class ResponseCache:
+    """Per-route cache of rendered GET responses with ETag/Last-Modified validation"""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE, enabled=RESPONSE_CACHE_ENABLED):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.policies = {}  # endpoint -> CachePolicy
+        self._data = OrderedDict()  # (endpoint, path, auth) -> CachedResponse
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def cached(self, policy):
+        """Decorator for a view; only GET/HEAD requests are cached"""
+        def decorator(view):
+            endpoint = view.__name__
+            self.policies[endpoint] = policy
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+                # Bekleyen flash mesajı varsa sayfa kişiye özeldir
+                if session.get('_flashes'):
+                    self._count(endpoint, 'bypass')
+                    return view(*args, **kwargs)
+                # Değişen referans dosyası yeniden yüklenir ve bu rotanın kayıtları düşer
+                try:
+                    for name in policy.datasets:
+                        reference_store.snapshot(name)
+                except FileNotFoundError:
+                    return view(*args, **kwargs)
+                key = (endpoint, request.full_path, self._auth_key(policy))
+                entry = self._get(key)
+                if entry is not None:
+                    self._count(endpoint, 'hits')
+                    return self._respond(entry)
+                self._count(endpoint, 'misses')
+                g.response_cache_flashed = False
+                rv = view(*args, **kwargs)
+                response = rv if isinstance(rv, Response) else Response(rv) if isinstance(rv, str) else None
+                if (response is None or response.status_code != 200 or response.direct_passthrough
+                        or g.response_cache_flashed):
+                    return rv
+                body = response.get_data()
+                entry = CachedResponse(
+                    body, response.mimetype, hashlib.sha1(body).hexdigest()[:20],
+                    int(time.time()), time.monotonic() + policy.ttl,
+                )
+                self._put(key, entry)
+                return self._respond(entry)
+            return wrapper
+        return decorator
+
+    def invalidate(self, endpoint=None, user_id=None):
+        """Drop entries of one endpoint and/or one user; no arguments clears everything"""
+        if user_id is not None:
+            user_id = str(user_id)
+        with self._lock:
+            stale = [
+                key for key in self._data
+                if (endpoint is None or key[0] == endpoint) and (user_id is None or key[2] == user_id)
+            ]
+            for key in stale:
+                del self._data[key]
+        for key in stale:
+            self._count(key[0], 'invalidations')
+        return len(stale)
+
+    def invalidate_dataset(self, name):
+        """Drop every route that renders the given reference file"""
+        removed = 0
+        for endpoint, policy in self.policies.items():
+            if name in policy.datasets:
+                removed += self.invalidate(endpoint=endpoint)
+        return removed
+
+    def stats(self):
+        with self._lock:
+            size = len(self._data)
+            endpoints = {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+        for counts in endpoints.values():
+            lookups = counts.get('hits', 0) + counts.get('misses', 0)
+            counts['hit_rate'] = round(counts.get('hits', 0) / lookups, 4) if lookups else None
+        return {'enabled': self.enabled, 'size': size, 'maxsize': self.maxsize, 'endpoints': endpoints}
+
+    def _auth_key(self, policy):
+        if not policy.vary_on_auth:
+            return None
+        return current_user.get_id() if current_user.is_authenticated else 'anonymous'
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _respond(self, entry):
+        response = Response(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.last_modified = entry.last_modified
+        # Tarayıcı her seferinde ETag ile doğrular; yanıt kullanıcıya özel kalır
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            self._count(request.endpoint, 'not_modified')
+        return response
+
+    def _count(self, endpoint, field):
+        with self._lock:
+            counts = self._stats.setdefault(endpoint, {})
+            counts[field] = counts.get(field, 0) + 1
+
+
+response_cache = ResponseCache()
+
+
+def _on_flash(sender, **extra):
+    # Bu istekte flash üretildiyse yanıt önbelleğe alınmaz
+    g.response_cache_flashed = True
+
+
+message_flashed.connect(_on_flash)
+reference_store.on_reload(lambda name, snapshot: response_cache.invalidate_dataset(name))
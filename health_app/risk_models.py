@@ -0,0 +1,364 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from compiled_models import load_compiled_model
+from metrics import timed
+
+# Modellerin bulunduğu klasör (çalışma dizininden bağımsız)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'saved_models')
+
+MODEL_FILES = {
+    'diabetes': 'diabetes_model.sav',
+    'heart': 'heart_disease_model.sav',
+}
+
+# 'compiled': export_models.py çıktısı (.npz) kullanılır, sklearn import edilmez
+# 'sklearn': orijinal pickle dosyaları yüklenir
+MODEL_BACKEND = os.getenv('RISK_MODEL_BACKEND', 'compiled')
+# Model dosyalarının değişip değişmediği en fazla bu sıklıkla (saniye) kontrol edilir
+MODEL_CHECK_INTERVAL = float(os.getenv('RISK_MODEL_CHECK_INTERVAL', 5))
+
+PREDICTION_CACHE_SIZE = int(os.getenv('RISK_CACHE_SIZE', 1024))
+PREDICTION_CACHE_TTL = float(os.getenv('RISK_CACHE_TTL', 600))
+
+# Modellerin eğitildiği sırayla özellik isimleri
+MODEL_FEATURES = {
+    'diabetes': [
+        'pregnancies', 'glucose', 'blood_pressure', 'skin_thickness',
+        'insulin', 'bmi', 'diabetes_pedigree', 'age',
+    ],
+    'heart': [
+        'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+        'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal',
+    ],
+}
+
+DEFAULT_MAX_BATCH_ROWS = 1000
+
+# Aşama süreleri bu histogram adıyla kaydedilir (stage, model etiketleriyle)
+RISK_STAGE_METRIC = 'risk_stage_seconds'
+
+# Tahlilde karşılığı olmayan özellikler için eğitim verisindeki medyan/mod değerleri
+# (Pima Indians Diabetes ve Cleveland Heart Disease veri setleri)
+FEATURE_DEFAULTS = {
+    'diabetes': {
+        'pregnancies': 0, 'blood_pressure': 72, 'skin_thickness': 23,
+        'insulin': 30.5, 'bmi': 32.0, 'diabetes_pedigree': 0.3725, 'age': 29,
+    },
+    'heart': {
+        'age': 56, 'sex': 1, 'cp': 0, 'trestbps': 130, 'fbs': 0, 'restecg': 1,
+        'thalach': 153, 'exang': 0, 'oldpeak': 0.8, 'slope': 1, 'ca': 0, 'thal': 2,
+    },
+}
+
+# Her model için tahlilde mutlaka bulunması gereken değer
+REQUIRED_LAB_FEATURES = {
+    'diabetes': 'glucose',
+    'heart': 'chol',
+}
+
+
+class BatchValidationError(ValueError):
+    """Raised when a batch of feature rows cannot be turned into a matrix"""
+
+
+def file_sha(raw):
+    """Short content hash used as the model version"""
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def compiled_path(pickle_path):
+    return os.path.splitext(pickle_path)[0] + '.npz'
+
+
+class ModelRegistry:
+    """Loads each model once per process and reloads it when the file on disk changes"""
+
+    def __init__(self, models_dir=MODELS_DIR, backend=MODEL_BACKEND, check_interval=MODEL_CHECK_INTERVAL):
+        self.models_dir = models_dir
+        self.backend = backend
+        self.check_interval = check_interval
+        self._models = {}  # name -> (model, version, file stamp)
+        self._next_check = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def model_path(self, name):
+        if name not in MODEL_FILES:
+            raise KeyError(name)
+        return os.path.join(self.models_dir, MODEL_FILES[name])
+
+    def on_reload(self, callback):
+        """Register callback(name, new_version), called after a changed model file is loaded"""
+        self._listeners.append(callback)
+
+    def get(self, name):
+        return self._entry(name)[0]
+
+    def version(self, name):
+        """Short content hash of the loaded model file"""
+        return self._entry(name)[1]
+
+    def _entry(self, name):
+        entry = self._models.get(name)
+        if entry is not None and time.monotonic() < self._next_check.get(name, 0):
+            return entry
+        with self._lock:
+            previous = self._models.get(name)
+            path = self.model_path(name)
+            stamp = self._file_stamp(path)
+            self._next_check[name] = time.monotonic() + self.check_interval
+            if previous is not None and previous[2] == stamp:
+                return previous
+            with timed(RISK_STAGE_METRIC, stage='model_load', model=name):
+                model, version = self._load(path)
+            entry = (model, version, stamp)
+            self._models[name] = entry
+        if previous is not None and previous[1] != version:
+            for callback in self._listeners:
+                callback(name, version)
+        return entry
+
+    def _file_stamp(self, path):
+        stamp = [os.stat(path).st_mtime_ns]
+        if os.path.exists(compiled_path(path)):
+            stamp.append(os.stat(compiled_path(path)).st_mtime_ns)
+        return tuple(stamp)
+
+    def _load(self, path):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        version = file_sha(raw)
+        if self.backend == 'compiled' and os.path.exists(compiled_path(path)):
+            compiled = load_compiled_model(compiled_path(path))
+            if compiled.source_sha == version:
+                return compiled, version
+            # .npz eski pickle'dan üretilmiş; yeniden export edilene kadar pickle'a dön
+            print(f"Derlenmiş model güncel değil, pickle kullanılıyor: {os.path.basename(path)}")
+        return pickle.loads(raw), version
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of single-row predictions with a TTL"""
+
+    def __init__(self, maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_name=None):
+        """Drop every entry, or only the entries of one model"""
+        with self._lock:
+            if model_name is None:
+                removed = len(self._data)
+                self._data.clear()
+            else:
+                stale = [key for key in self._data if key[0] == model_name]
+                for key in stale:
+                    del self._data[key]
+                removed = len(stale)
+            self.invalidations += removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+registry = ModelRegistry()
+prediction_cache = PredictionCache()
+# Model dosyası değişince o modele ait önbellek girdileri silinir
+registry.on_reload(lambda name, version: prediction_cache.invalidate(name))
+
+
+def build_feature_matrix(model_name, rows, max_rows=DEFAULT_MAX_BATCH_ROWS):
+    """Validate feature rows (dicts or lists) into one float64 matrix"""
+    if model_name not in MODEL_FEATURES:
+        raise BatchValidationError(f'Bilinmeyen model: {model_name}')
+    if not isinstance(rows, list) or not rows:
+        raise BatchValidationError('"rows" boş olmayan bir liste olmalıdır.')
+    if max_rows and len(rows) > max_rows:
+        raise BatchValidationError(f'Bir istekte en fazla {max_rows} satır gönderilebilir.')
+
+    features = MODEL_FEATURES[model_name]
+    X = np.empty((len(rows), len(features)), dtype=np.float64)
+    for i, row in enumerate(rows):
+        if isinstance(row, dict):
+            missing = [name for name in features if row.get(name) in (None, '')]
+            if missing:
+                raise BatchValidationError(f'Satır {i}: eksik alanlar: {", ".join(missing)}')
+            values = [row[name] for name in features]
+        elif isinstance(row, (list, tuple)):
+            if len(row) != len(features):
+                raise BatchValidationError(f'Satır {i}: {len(features)} değer bekleniyordu, {len(row)} geldi.')
+            values = row
+        else:
+            raise BatchValidationError(f'Satır {i}: nesne veya liste olmalıdır.')
+        try:
+            X[i] = [float(v) for v in values]
+        except (TypeError, ValueError):
+            raise BatchValidationError(f'Satır {i}: sayısal olmayan değer var.')
+
+    if not np.isfinite(X).all():
+        bad_row = int(np.where(~np.isfinite(X).all(axis=1))[0][0])
+        raise BatchValidationError(f'Satır {bad_row}: sonlu olmayan değer var.')
+    return X
+
+
+def predict_matrix(model_name, X):
+    """Run one vectorized predict/predict_proba call over a feature matrix"""
+    model = registry.get(model_name)
+    predictions = model.predict(X).astype(int)
+    probabilities = None
+    # SVC modeli probability=False ile eğitildiği için predict_proba yok
+    if hasattr(model, 'predict_proba'):
+        probabilities = model.predict_proba(X)[:, 1]
+    return predictions, probabilities
+
+
+def predict_one(model_name, values):
+    """Predict a single row, answering repeats from the prediction cache"""
+    X = build_feature_matrix(model_name, [values])
+    key = (model_name, registry.version(model_name), tuple(X[0].tolist()))
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+    with timed(RISK_STAGE_METRIC, stage='inference', model=model_name):
+        predictions, probabilities = predict_matrix(model_name, X)
+    result = (int(predictions[0]), float(probabilities[0]) if probabilities is not None else None)
+    prediction_cache.put(key, result)
+    return result
+
+
+def predict_batch(model_name, rows, max_rows=DEFAULT_MAX_BATCH_ROWS):
+    """Predict many rows at once and return JSON-ready lists"""
+    with timed(RISK_STAGE_METRIC, stage='validation', model=model_name):
+        X = build_feature_matrix(model_name, rows, max_rows=max_rows)
+    with timed(RISK_STAGE_METRIC, stage='inference', model=model_name):
+        predictions, probabilities = predict_matrix(model_name, X)
+    return {
+        'model': model_name,
+        'count': int(X.shape[0]),
+        'predictions': predictions.tolist(),
+        'probabilities': probabilities.round(4).tolist() if probabilities is not None else None,
+    }
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def features_from_blood_test(model_name, results_data, profile=None):
+    """Map a stored TestResult.results_data blob (plus user profile) onto model features
+
+    Returns (features, imputed) or None when the key lab value is missing.
+    """
+    profile = profile or {}
+    biyokimya = (results_data or {}).get('biyokimya') or {}
+    glucose = _to_float(biyokimya.get('glucose'))
+    cholesterol = _to_float(biyokimya.get('cholesterol'))
+    age = _to_float(profile.get('age'))
+    gender = profile.get('gender')
+    weight = _to_float(profile.get('weight'))
+    height = _to_float(profile.get('height'))
+
+    known = {}
+    if model_name == 'diabetes':
+        known['glucose'] = glucose
+        known['age'] = age
+        if weight and height:
+            known['bmi'] = round(weight / (height / 100) ** 2, 1)
+    elif model_name == 'heart':
+        known['chol'] = cholesterol
+        known['age'] = age
+        if gender in ('male', 'female'):
+            known['sex'] = 1 if gender == 'male' else 0
+        if glucose is not None:
+            known['fbs'] = 1 if glucose > 120 else 0
+    else:
+        raise KeyError(model_name)
+
+    if known.get(REQUIRED_LAB_FEATURES[model_name]) is None:
+        return None
+
+    features = {}
+    imputed = []
+    for name in MODEL_FEATURES[model_name]:
+        if known.get(name) is not None:
+            features[name] = known[name]
+        else:
+            features[name] = FEATURE_DEFAULTS[model_name][name]
+            imputed.append(name)
+    return features, imputed
+
+
+def score_blood_test(results_data, profile=None):
+    """Score one stored blood test with every model it has enough data for"""
+    scores = []
+    for model_name in MODEL_FEATURES:
+        mapped = features_from_blood_test(model_name, results_data, profile)
+        if mapped is None:
+            continue
+        features, imputed = mapped
+        X = build_feature_matrix(model_name, [features])
+        predictions, probabilities = predict_matrix(model_name, X)
+        scores.append({
+            'model_name': model_name,
+            'model_version': registry.version(model_name),
+            'prediction': int(predictions[0]),
+            'probability': float(probabilities[0]) if probabilities is not None else None,
+            'features': features,
+            'imputed_features': imputed,
+        })
+    return scores
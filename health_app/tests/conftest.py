@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# Uygulama içe aktarılmadan önce geçici veritabanı seçilir; gerçek veritabanına dokunulmaz
+_workdir = tempfile.mkdtemp(prefix='health_app_tests_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_workdir, 'test.db')
+os.environ['AUTO_MIGRATE'] = '0'
+os.environ.setdefault('PASSWORD_HASH_ITERATIONS', '1000')
+
+
+@pytest.fixture(scope='session')
+def migrated_app():
+    from app import app
+
+    result = app.test_cli_runner().invoke(args=['migrate-db'])
+    assert result.exception is None, result.output
+    return app
+
+
+@pytest.fixture
+def login(migrated_app):
+    """Create a user with the given email (if missing) and return a logged-in test client"""
+    from app import User, db
+
+    migrated_app.config['WTF_CSRF_ENABLED'] = False
+
+    def make_client(email, password='pw', **fields):
+        with migrated_app.app_context():
+            if User.query.filter_by(email=email).first() is None:
+                user = User(email=email, name=fields.pop('name', 'Test'), **fields)
+                user.set_password(password)
+                db.session.add(user)
+                db.session.commit()
+        client = migrated_app.test_client()
+        response = client.post('/login', data={'email': email, 'password': password})
+        assert response.status_code == 302, response.status_code
+        return client
+
+    return make_client
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+
+import app as health
+from blood_rules import RuleEngine, engine
+from reference_data import ReferenceDataStore
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def report(hemogram=None, biyokimya=None, vitamin_mineral=None):
+    return {'hemogram': hemogram or {}, 'biyokimya': biyokimya or {}, 'vitamin_mineral': vitamin_mineral or {}}
+
+
+def assessment(text):
+    return text.split('\nDEĞERLENDİRME:\n')[1].split('\n\n')[0].splitlines()
+
+
+def test_invalid_value_names_its_own_analyte():
+    text = engine.analyze(report(hemogram={'hgb': '14', 'wbc': 'abc'}, biyokimya={'glucose': '9,5'}))
+    lines = assessment(text)
+    # Her geçersiz değer kendi analit adıyla bildirilir, geçerli değerler yine değerlendirilir
+    assert 'Beyaz Kan Hücresi (WBC) değeri analiz edilemedi.' in lines
+    assert 'Açlık Glukozu değeri analiz edilemedi.' in lines
+    assert not any(line.startswith('Hemoglobin (HGB) değeri analiz edilemedi') for line in lines)
+    assert len(lines) == 3
+    assert 'Tüm değerler referans aralığında görünüyor.' not in text
+
+
+def test_lipid_and_vitamin_summaries():
+    text = engine.analyze(report(biyokimya={'ldl': '160', 'hdl': '30'}, vitamin_mineral={'vitamin_d': '12'}))
+    lines = assessment(text)
+    # Durumlar referans dosyasındaki sırayla tek satırda özetlenir
+    assert lines[0] == ('Lipid profilinizde düşük HDL Kolesterol, yüksek LDL Kolesterol tespit edildi. '
+                        'Kardiyovasküler risk faktörlerini azaltmak için öneriler:')
+    assert 'Vitamin profilinizde düşük D Vitamini tespit edildi. Öneriler:' in lines
+    assert '\nYAŞAM TARZI ÖNERİLERİ:' in text
+
+
+def test_empty_report_is_all_normal():
+    text = engine.analyze(report())
+    assert assessment(text) == ['Tüm değerler referans aralığında görünüyor.']
+
+
+def test_rules_reload_when_file_changes(tmp_path):
+    shutil.copy(os.path.join(BASE_DIR, 'blood_test_references.json'), tmp_path / 'refs.json')
+    store = ReferenceDataStore(datasets={'blood_test_references': 'refs.json'}, base_dir=str(tmp_path), check_interval=0)
+    rules = RuleEngine(store=store)
+    first = rules.ruleset()
+    assert rules.ruleset() is first
+    assert 'Hemoglobin (HGB) düşük' in rules.analyze(report(hemogram={'hgb': '11'}))
+
+    with open(tmp_path / 'refs.json', encoding='utf-8') as f:
+        references = json.load(f)
+    references['hemogram']['hgb']['reference_range']['min'] = 10
+    with open(tmp_path / 'refs.json', 'w', encoding='utf-8') as f:
+        json.dump(references, f, ensure_ascii=False)
+    stat = os.stat(tmp_path / 'refs.json')
+    os.utime(tmp_path / 'refs.json', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert rules.ruleset() is not first
+    assert rules.ruleset().version != first.version
+    assert 'Hemoglobin (HGB) düşük' not in rules.analyze(report(hemogram={'hgb': '11'}))
+
+
+def test_blood_test_route_stores_invalid_value_wording(login, migrated_app, monkeypatch):
+    monkeypatch.setitem(migrated_app.config, 'RISK_SCORING_ASYNC', False)
+    client = login('blood-rules@example.com')
+    response = client.post('/blood-test', data={'test_date': '2026-02-01', 'hgb': 'düşük', 'notes': 'tok karnına'})
+    assert response.status_code == 302
+    with migrated_app.app_context():
+        recommendations = health.TestResult.query.order_by(health.TestResult.id.desc()).first().recommendations
+    assert assessment(recommendations) == ['Hemoglobin (HGB) değeri analiz edilemedi.']
+    assert recommendations.endswith('\n\nKullanıcı Notu: tok karnına')
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import ChronicMeasurement, User, db
+
+
+@pytest.fixture(scope='module')
+def measurements(migrated_app):
+    with migrated_app.app_context():
+        user = User(email='chronic-data@example.com', name='Test', age=50, gender='male', weight=85, height=178)
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.commit()
+        start = date(2025, 1, 1)
+        db.session.execute(db.insert(ChronicMeasurement), [
+            dict(user_id=user.id, date=start + timedelta(days=i), disease_type='diabetes',
+                 measurement_type='blood_glucose', value=str(100 + i % 40), value_primary=100.0 + i % 40)
+            for i in range(300)
+        ])
+        db.session.commit()
+
+
+@pytest.fixture
+def client(migrated_app, measurements):
+    migrated_app.config['WTF_CSRF_ENABLED'] = False
+    client = migrated_app.test_client()
+    client.post('/login', data={'email': 'chronic-data@example.com', 'password': 'pw'})
+    original = migrated_app.config['CHRONIC_DATA_MAX_SOURCE_ROWS']
+    yield client
+    migrated_app.config['CHRONIC_DATA_MAX_SOURCE_ROWS'] = original
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_points_mode_downsamples(client, method):
+    response = client.get(f'/chronic-tracking/data?points=50&method={method}')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total'] == 300
+    assert data['downsampled']
+    assert 0 < len(data['measurements']) <= 50
+    dates = [m['date'] for m in data['measurements']]
+    assert dates == sorted(dates)
+    if method == 'lttb':
+        assert dates[0] == '2025-01-01' and dates[-1] == str(date(2025, 1, 1) + timedelta(days=299))
+
+
+def test_points_mode_rejects_oversized_range(migrated_app, client):
+    migrated_app.config['CHRONIC_DATA_MAX_SOURCE_ROWS'] = 100
+    assert client.get('/chronic-tracking/data?points=50').status_code == 400
+    # Daha dar bir aralık sınırın altında kalır
+    response = client.get('/chronic-tracking/data?points=50&end=2025-03-01')
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 60
+
+
+def test_keyset_pages_cover_range_once(client):
+    seen = []
+    cursor = None
+    while True:
+        response = client.get('/chronic-tracking/data', query_string={'start': '2025-02-01', 'end': '2025-04-30', 'limit': 25,
+                                                                      **({'after': cursor} if cursor else {})})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['measurements']) <= 25
+        seen.extend(m['date'] for m in data['measurements'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+    assert seen == [str(date(2025, 2, 1) + timedelta(days=i)) for i in range(89)]
+
+
+def test_keyset_cursor_breaks_ties_by_id(login, migrated_app):
+    client = login('chronic-data-ties@example.com')
+    with migrated_app.app_context():
+        user = User.query.filter_by(email='chronic-data-ties@example.com').one()
+        db.session.execute(db.insert(ChronicMeasurement), [
+            dict(user_id=user.id, date=date(2025, 6, 1 + i // 3), disease_type='hypertension',
+                 measurement_type='blood_pressure', value=f'{120 + i}/80', value_primary=120.0 + i, value_secondary=80.0)
+            for i in range(9)
+        ])
+        db.session.commit()
+    values = []
+    cursor = ''
+    while cursor is not None:
+        data = client.get(f'/chronic-tracking/data?limit=2&after={cursor}').get_json()
+        values.extend(m['value_primary'] for m in data['measurements'])
+        cursor = data['next_cursor']
+    # Aynı güne düşen ölçümler sayfa sınırında atlanmaz ve tekrarlanmaz
+    assert values == [120.0 + i for i in range(9)]
+
+
+def test_invalid_cursor_rejected(client):
+    response = client.get('/chronic-tracking/data?after=dün')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'message': 'Geçersiz imleç.'}
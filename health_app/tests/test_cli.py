@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import text
+
+import migrations
+from app import MIGRATIONS, app, create_app, db
+
+
+@pytest.fixture
+def runner():
+    return app.test_cli_runner()
+
+
+def test_migrate_db_command_without_create_app(runner):
+    # `flask --app app migrate-db` içe aktarılan uygulamayı create_app çağrılmadan kullanır
+    result = runner.invoke(args=['migrate-db'])
+    assert result.exception is None, result.output
+    with app.app_context():
+        assert migrations.current_version(db.engine) == migrations.latest_version(MIGRATIONS)
+        versions = db.session.execute(text('SELECT version FROM schema_version ORDER BY version')).scalars().all()
+    assert versions == sorted(m.version for m in MIGRATIONS)
+
+
+def test_reanalyze_tests_command(runner):
+    runner.invoke(args=['migrate-db'])
+    result = runner.invoke(args=['reanalyze-tests', '--batch-size', '10'])
+    assert result.exception is None, result.output
+    assert 'yeniden analiz edildi' in result.output
+
+
+def test_index_served_by_imported_app():
+    runner = app.test_cli_runner()
+    runner.invoke(args=['migrate-db'])
+    response = app.test_client().get('/')
+    assert response.status_code == 200
+
+
+def test_create_app_applies_config_on_every_call():
+    original = app.config['HEALTH_LIBRARY_PAGE_SIZE']
+    try:
+        create_app({'HEALTH_LIBRARY_PAGE_SIZE': 7})
+        assert app.config['HEALTH_LIBRARY_PAGE_SIZE'] == 7
+        create_app({'HEALTH_LIBRARY_PAGE_SIZE': 11})
+        assert app.config['HEALTH_LIBRARY_PAGE_SIZE'] == 11
+    finally:
+        app.config['HEALTH_LIBRARY_PAGE_SIZE'] = original
+
+
+def test_create_app_rejects_engine_config():
+    with pytest.raises(ValueError):
+        create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///other.db'})
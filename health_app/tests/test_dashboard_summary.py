@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from datetime import date
+
+from app import Meal, User, db
+from dashboard_summary import summary_cache
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Başka bir gunicorn işçisi: aynı veritabanına kendi oturumuyla öğün yazar
+OTHER_WORKER = '''
+import sys
+from datetime import date
+from app import app, db, Meal, User
+with app.app_context():
+    user = User.query.filter_by(email=sys.argv[1]).one()
+    db.session.add(Meal(user_id=user.id, date=date.today(), meal_type='Lunch', food_name='Mercimek', calories=float(sys.argv[2])))
+    db.session.commit()
+'''
+
+
+def add_meal(app, email, calories):
+    with app.app_context():
+        user = User.query.filter_by(email=email).one()
+        db.session.add(Meal(user_id=user.id, date=date.today(), meal_type='Lunch', food_name='Pilav', calories=calories))
+        db.session.commit()
+
+
+def test_write_in_same_process_invalidates_summary(migrated_app, login):
+    client = login('dashboard-local@example.com')
+    assert client.get('/api/dashboard-summary').get_json()['nutrition']['calories'] == 0
+    add_meal(migrated_app, 'dashboard-local@example.com', 350)
+    assert client.get('/api/dashboard-summary').get_json()['nutrition']['calories'] == 350
+
+
+def test_write_in_other_worker_invalidates_summary(migrated_app, login):
+    client = login('dashboard-remote@example.com')
+    assert client.get('/api/dashboard-summary').get_json()['nutrition']['calories'] == 0
+    hits = summary_cache.hits
+    assert client.get('/api/dashboard-summary').get_json()['nutrition']['calories'] == 0
+    assert summary_cache.hits == hits + 1
+
+    subprocess.run([sys.executable, '-c', OTHER_WORKER, 'dashboard-remote@example.com', '420'],
+                   cwd=APP_DIR, env=dict(os.environ, PYTHONPATH=APP_DIR), check=True, capture_output=True)
+    # Bu süreçteki önbellek girdisi yazmadan habersiz; sürüm farkı onu geçersiz kılar
+    assert client.get('/api/dashboard-summary').get_json()['nutrition']['calories'] == 420
@@ -0,0 +1,77 @@
+import json
+import os
+import re
+
+import pytest
+
+from app import REFERRAL_COMPLAINT_MAP
+from doctor_matcher import DoctorMatcher
+
+DOCTOR_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'doctor_data.json')
+
+# Yönlendirme formundaki her şikayet için önerilen uzmanlık (ilk eşleşen desen)
+EXPECTED_SPECIALTY = {
+    'karın ağrısı': 'Gastroenteroloji Uzmanı',
+    'mide bulantısı': 'Gastroenteroloji Uzmanı',
+    'ishal': 'Gastroenteroloji Uzmanı',
+    'kabızlık': 'Gastroenteroloji Uzmanı',
+    'baş ağrısı': 'Nöroloji Uzmanı',
+    'baş dönmesi': 'Nöroloji Uzmanı',
+    'nefes darlığı': 'Göğüs Hastalıkları Uzmanı',
+    'göğüs ağrısı': 'Göğüs Hastalıkları Uzmanı',
+    'çarpıntı': 'Kardiyoloji Uzmanı',
+    'ateş': 'Çocuk Sağlığı ve Hastalıkları Uzmanı',
+    'cilt döküntüsü': 'Dermatoloji Uzmanı',
+    'kaşıntı': 'Dermatoloji Uzmanı',
+    'eklem ağrısı': 'Fizik Tedavi ve Rehabilitasyon Uzmanı',
+    'halsizlik': None,
+    'kilo kaybı': None,
+    'kilo alma': None,
+    'öksürük': 'Göğüs Hastalıkları Uzmanı',
+    'boğaz ağrısı': 'Fizik Tedavi ve Rehabilitasyon Uzmanı',
+    'kulak ağrısı': 'Fizik Tedavi ve Rehabilitasyon Uzmanı',
+    'diş ağrısı': 'Fizik Tedavi ve Rehabilitasyon Uzmanı',
+    'idrar yolu şikayetleri': 'Üroloji Uzmanı',
+    'kadın hastalıkları': 'Kadın Hastalıkları ve Doğum Uzmanı',
+    'çocuk hastalıkları': 'Çocuk Sağlığı ve Hastalıkları Uzmanı',
+    'diğer': None,
+}
+
+
+@pytest.fixture(scope='module')
+def doctor_data():
+    with open(DOCTOR_DATA, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='module')
+def matcher(doctor_data):
+    return DoctorMatcher(doctor_data)
+
+
+def linear_scan(doctor_data, complaint):
+    # Eski yönlendirme kodu: desenler dosya sırasıyla denenir, ilk eşleşen kazanır
+    for item in doctor_data['keyword_doctor_map']:
+        if re.search(item['pattern'], complaint, re.IGNORECASE):
+            return item['doctor']
+    return None
+
+
+def test_every_referral_complaint_is_pinned():
+    assert set(EXPECTED_SPECIALTY) == set(REFERRAL_COMPLAINT_MAP)
+
+
+@pytest.mark.parametrize('complaint', list(REFERRAL_COMPLAINT_MAP))
+def test_referral_complaint_specialty(matcher, doctor_data, complaint):
+    matches = matcher.match(complaint)
+    specialty = matches[0]['doctor']['specialty'] if matches else None
+    assert specialty == EXPECTED_SPECIALTY[complaint]
+    expected = linear_scan(doctor_data, complaint)
+    assert (matches[0]['doctor'] if matches else None) == expected
+
+
+def test_generic_keyword_does_not_outrank_file_order(matcher):
+    matches = matcher.match('şiddetli baş ağrısı ve bulantı')
+    assert matches[0]['doctor']['specialty'] == 'Gastroenteroloji Uzmanı'
+    specialties = [m['doctor']['specialty'] for m in matches]
+    assert specialties.index('Nöroloji Uzmanı') < specialties.index('Fizik Tedavi ve Rehabilitasyon Uzmanı')
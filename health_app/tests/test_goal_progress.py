@@ -0,0 +1,118 @@
+import random
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import goal_progress
+from app import HealthGoal, HealthGoalEntry, User
+
+MET = {'entry_steps': '9000', 'entry_water': '2.5', 'entry_sleep': '8'}
+MISSED = {'entry_steps': '3000', 'entry_water': '2.5', 'entry_sleep': '8'}
+
+
+def empty_progress():
+    return SimpleNamespace(met_mask=0, mask_date=None, first_entry_date=None,
+                           current_streak=0, longest_streak=0, streak_end=None)
+
+
+def state(progress):
+    return (progress.met_mask, progress.mask_date, progress.first_entry_date,
+            progress.current_streak, progress.longest_streak, progress.streak_end)
+
+
+def test_incremental_marks_match_rebuild():
+    rng = random.Random(11)
+    start = date(2026, 1, 1)
+    for _ in range(50):
+        progress = empty_progress()
+        days = {}
+        # Çoğunlukla ileri giden, arada geçmişi düzelten giriş dizisi
+        for _ in range(40):
+            day = start + timedelta(days=rng.randrange(90))
+            met = rng.random() < 0.7
+            if not goal_progress.mark_day(progress, day, met, days.get(day)):
+                goal_progress.rebuild(progress, sorted({**days, day: met}.items()))
+            days[day] = met
+        expected = goal_progress.rebuild(empty_progress(), sorted(days.items()))
+        assert state(progress) == state(expected)
+
+
+def test_compliance_window_and_mask_shift():
+    progress = empty_progress()
+    today = date(2026, 6, 30)
+    for offset in (40, 5, 2, 1, 0):
+        goal_progress.mark_day(progress, today - timedelta(days=offset), True)
+    # Hafta: 0, 1, 2, 5 gün önce -> 4/7; ay: aynı dört gün / 30
+    assert goal_progress.compliance(progress, today, 7) == pytest.approx(4 / 7)
+    assert goal_progress.compliance(progress, today, 30) == pytest.approx(4 / 30)
+    assert goal_progress.current_streak(progress, today) == 3
+    assert goal_progress.current_streak(progress, today + timedelta(days=1)) == 3
+    assert goal_progress.current_streak(progress, today + timedelta(days=2)) == 0
+    # İlk girişten önceki günler pencereye sayılmaz
+    fresh = empty_progress()
+    goal_progress.mark_day(fresh, today, True)
+    assert goal_progress.compliance(fresh, today, 30) == 1.0
+    # Maskeden taşan eski günler düşer
+    goal_progress.mark_day(progress, today + timedelta(days=goal_progress.MASK_DAYS), True)
+    assert progress.met_mask == 1
+
+
+def post_entry(client, day, values):
+    response = client.post('/health-goals', data={'add_entry': '1', 'date': day.isoformat(), **values})
+    assert response.status_code == 200
+
+
+def goal_state(migrated_app, email):
+    with migrated_app.app_context():
+        user = User.query.filter_by(email=email).one()
+        goal = HealthGoal.query.filter_by(user_id=user.id).one()
+        entries = HealthGoalEntry.query.filter_by(user_id=user.id).order_by(HealthGoalEntry.date).all()
+        today = date.today()
+        return {
+            'streak': goal.streak(today),
+            'longest': goal.longest_streak,
+            'weekly': goal.compliance(goal_progress.WEEK_DAYS, today),
+            'entries': [(entry.date, entry.steps, entry.goals_met) for entry in entries],
+        }
+
+
+def test_get_does_not_create_goal(login, migrated_app):
+    client = login('goals-get@example.com')
+    assert client.get('/health-goals').status_code == 200
+    with migrated_app.app_context():
+        user = User.query.filter_by(email='goals-get@example.com').one()
+        assert HealthGoal.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_same_day_entry_is_upserted(login, migrated_app):
+    client = login('goals-upsert@example.com')
+    today = date.today()
+    post_entry(client, today, MISSED)
+    post_entry(client, today, MET)
+    state = goal_state(migrated_app, 'goals-upsert@example.com')
+    assert state['entries'] == [(today, 9000, True)]
+    assert state['streak'] == 1
+
+
+def test_correcting_an_earlier_day_recomputes_streak(login, migrated_app):
+    email = 'goals-correction@example.com'
+    client = login(email)
+    today = date.today()
+    for days_ago in (2, 1, 0):
+        post_entry(client, today - timedelta(days=days_ago), MET)
+    state = goal_state(migrated_app, email)
+    assert (state['streak'], state['longest'], state['weekly']) == (3, 3, 1.0)
+
+    # Dünkü giriş düzeltilince seri bölünür
+    post_entry(client, today - timedelta(days=1), MISSED)
+    state = goal_state(migrated_app, email)
+    assert (state['streak'], state['longest']) == (1, 1)
+    assert state['weekly'] == pytest.approx(2 / 3)
+    assert [met for _, _, met in state['entries']] == [True, False, True]
+
+    # Tekrar düzeltilince seriler birleşir
+    post_entry(client, today - timedelta(days=1), MET)
+    state = goal_state(migrated_app, email)
+    assert (state['streak'], state['longest'], state['weekly']) == (3, 3, 1.0)
+    assert len(state['entries']) == 3
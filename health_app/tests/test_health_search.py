@@ -0,0 +1,33 @@
+import pytest
+
+import health_search
+from health_search import HealthLibraryIndex, analyze, stem
+
+
+@pytest.mark.parametrize('family', [
+    ('uyku', 'uykusu', 'uykuda'),
+    ('baş', 'başı', 'başım'),
+    ('diyabet', 'diyabeti', 'diyabette', 'diyabetin'),
+    ('tansiyon', 'tansiyonu', 'tansiyonda'),
+    ('ilaç', 'ilaçlar', 'ilaçları', 'ilaçlarından'),
+])
+def test_inflections_share_one_stem(family):
+    assert len({stem(word) for word in family}) == 1, {word: stem(word) for word in family}
+
+
+def test_short_tokens_are_kept():
+    assert stem('su') == 'su'
+    assert len(stem('kalbe')) >= health_search.MIN_STEM_LENGTH
+
+
+def test_analyze_folds_case_and_accents():
+    assert analyze('UYKUSU Başım') == analyze('uyku baş')
+
+
+def test_search_matches_inflected_query():
+    index = HealthLibraryIndex({'contents': [
+        {'title': 'Uyku Düzeni', 'desc': 'Kaliteli uyku için öneriler.', 'category': 'Uyku'},
+        {'title': 'Baş Ağrısı', 'desc': 'Migren ve gerilim tipi ağrılar.', 'category': 'Nöroloji'},
+    ]})
+    assert [item['title'] for item in index.search('uykuda').items] == ['Uyku Düzeni']
+    assert [item['title'] for item in index.search('başım').items] == ['Baş Ağrısı']
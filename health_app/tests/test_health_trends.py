@@ -0,0 +1,75 @@
+import json
+import re
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import MoodStressTest, User, backfill_mood_averages, db
+
+
+def add_tests(app, email, stress_by_days_ago):
+    with app.app_context():
+        user = User.query.filter_by(email=email).one()
+        for days_ago, stress in stress_by_days_ago.items():
+            feedback = {'mood': {'avg': 2.0}, 'stress': {'avg': stress}}
+            db.session.add(MoodStressTest(user_id=user.id, date=datetime.combine(date.today() - timedelta(days=days_ago), time(12)),
+                                          result_json=feedback, mood_avg=2.0, stress_avg=stress))
+        db.session.commit()
+
+
+def trends(client, window=None):
+    page = client.get('/health-trends' + (f'?window={window}' if window is not None else '')).get_data(as_text=True)
+    mood_data = json.loads(re.search(r'const moodData = (.*?);\n', page).group(1))
+    motivation = re.search(r'alert-success fs-5 text-center">\s*<i class="fas fa-chart-line me-2"></i>(.*?)\s*</div>', page).group(1)
+    return mood_data, motivation
+
+
+@pytest.fixture(scope='module')
+def history(migrated_app):
+    with migrated_app.app_context():
+        user = User(email='health-trends@example.com', name='Test')
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.commit()
+    add_tests(migrated_app, 'health-trends@example.com', {100: 3.0, 20: 2.0, 3: 2.5, 1: 1.0})
+
+
+@pytest.fixture
+def client(login, history):
+    return login('health-trends@example.com')
+
+
+@pytest.mark.parametrize('window, count, motivation', [
+    (7, 2, 'Son 1 haftada stres seviyen %60.0 azaldı! Harika gidiyorsun.'),
+    (30, 3, 'Son 1 ayda stres seviyen %50.0 azaldı! Harika gidiyorsun.'),
+    (90, 3, 'Son 3 ayda stres seviyen %50.0 azaldı! Harika gidiyorsun.'),
+    # Desteklenmeyen pencere varsayılana (30 gün) döner
+    (5, 3, 'Son 1 ayda stres seviyen %50.0 azaldı! Harika gidiyorsun.'),
+    (None, 3, 'Son 1 ayda stres seviyen %50.0 azaldı! Harika gidiyorsun.'),
+])
+def test_window_bounds_series_and_change(client, window, count, motivation):
+    mood_data, text = trends(client, window)
+    assert len(mood_data) == count
+    assert [row['date'] for row in mood_data] == sorted(row['date'] for row in mood_data)
+    assert mood_data[-1]['stress'] == 1.0
+    assert text == motivation
+
+
+def test_not_enough_tests_in_window(login, migrated_app):
+    client = login('health-trends-sparse@example.com')
+    add_tests(migrated_app, 'health-trends-sparse@example.com', {40: 1.0, 2: 2.0})
+    assert trends(client, 7)[1] == 'Son 1 haftada yeterli stres testi verisi yok.'
+    assert trends(client, 90)[1] == 'Son 3 ayda stres seviyen %100.0 arttı. Dilersen stres yönetimi için önerilerimize göz atabilirsin.'
+
+
+def test_backfill_copies_averages_from_result_json(login, migrated_app):
+    login('health-trends-backfill@example.com')
+    with migrated_app.app_context():
+        user = User.query.filter_by(email='health-trends-backfill@example.com').one()
+        test = MoodStressTest(user_id=user.id, result_json={'mood': {'avg': 1.5}, 'stress': {'avg': 2.25}})
+        db.session.add(test)
+        db.session.commit()
+        backfill_mood_averages(batch_size=1)
+        db.session.expire_all()
+        test = db.session.get(MoodStressTest, test.id)
+        assert (test.mood_avg, test.stress_avg) == (1.5, 2.25)
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+import app as health
+from app import LabValue, User, backfill_lab_values, db
+
+
+@pytest.fixture
+def client(login, migrated_app, monkeypatch):
+    monkeypatch.setitem(migrated_app.config, 'RISK_SCORING_ASYNC', False)
+    return login('lab-values@example.com')
+
+
+def test_saved_blood_test_feeds_trend_endpoint(client):
+    for test_date, ldl in [('2024-03-01', '150'), ('2025-03-01', '120'), ('2026-03-01', '90')]:
+        client.post('/blood-test', data={'test_date': test_date, 'ldl': ldl, 'hgb': '14'})
+    trend = client.get('/api/lab-trends/ldl').get_json()
+    assert trend['analyte'] == 'ldl'
+    assert trend['values'] == [
+        {'date': '2024-03-01', 'panel': 'biyokimya', 'value': 150.0, 'unit': 'mg/dL', 'flag': 'high'},
+        {'date': '2025-03-01', 'panel': 'biyokimya', 'value': 120.0, 'unit': 'mg/dL', 'flag': 'high'},
+        {'date': '2026-03-01', 'panel': 'biyokimya', 'value': 90.0, 'unit': 'mg/dL', 'flag': 'normal'},
+    ]
+    window = client.get('/api/lab-trends/ldl?start=2025-01-01&end=2026-03-01').get_json()['values']
+    assert [row['date'] for row in window] == ['2025-03-01', '2026-03-01']
+    assert client.get('/api/lab-trends/ldl?panel=hemogram').get_json()['values'] == []
+    assert client.get('/api/lab-trends/ldl?start=2025').status_code == 400
+
+
+def test_trend_only_shows_own_values(client, login):
+    client.post('/blood-test', data={'test_date': '2026-01-05', 'glucose': '99'})
+    other = login('lab-values-other@example.com')
+    assert other.get('/api/lab-trends/glucose').get_json()['values'] == []
+
+
+def test_backfill_from_stored_blobs(migrated_app):
+    with migrated_app.app_context():
+        user = User(email='lab-values-backfill@example.com', name='Test')
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.flush()
+        test = health.TestResult(user_id=user.id, date=datetime(2023, 5, 1), results_data={
+            'hemogram': {'hgb': '11', 'hct': '38', 'wbc': 'yok'},
+            'biyokimya': {'glucose': '', 'urea': '30'},
+        })
+        db.session.add(test)
+        db.session.commit()
+
+        backfill_lab_values(batch_size=1)
+        # Tekrar çalıştırmak satırları çoğaltmaz
+        backfill_lab_values(batch_size=50)
+        rows = {row.analyte: (row.panel, row.value, row.unit, row.flag, row.date)
+                for row in LabValue.query.filter_by(test_result_id=test.id)}
+        assert rows == {
+            'hgb': ('hemogram', 11.0, 'g/dL', 'low', datetime(2023, 5, 1)),
+            # Referansı olmayan analitler de saklanır, birim ve işaret boş kalır
+            'hct': ('hemogram', 38.0, None, None, datetime(2023, 5, 1)),
+            'urea': ('biyokimya', 30.0, None, None, datetime(2023, 5, 1)),
+        }
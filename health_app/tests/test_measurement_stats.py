@@ -0,0 +1,120 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+import database
+from app import ChronicMeasurement, MeasurementStats, User, db, rebuild_measurement_stats, record_measurement_stats
+
+
+def make_user(email):
+    user = User(email=email, name='Test', age=40, gender='female', weight=70, height=170)
+    user.set_password('pw')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def measurement(user, value):
+    return ChronicMeasurement(user_id=user.id, date=date(2026, 10, 1), disease_type='diabetes',
+                              measurement_type='blood_glucose', value=str(value), value_primary=float(value))
+
+
+def test_first_measurement_creates_stats(migrated_app):
+    with migrated_app.app_context():
+        user = make_user('stats-first@example.com')
+        entry = measurement(user, 110)
+        db.session.add(entry)
+        record_measurement_stats(entry)
+        db.session.commit()
+        stats = MeasurementStats.query.filter_by(user_id=user.id).one()
+        assert stats.count == 1
+        assert stats.mean == 110
+
+
+@pytest.mark.parametrize('conflict_insert', [True, False], ids=['on-conflict', 'savepoint'])
+def test_concurrent_first_measurement_does_not_fail(migrated_app, monkeypatch, conflict_insert):
+    if not conflict_insert:
+        # ON CONFLICT desteklemeyen bir veritabanı gibi davranılır: savepoint yolu
+        monkeypatch.setattr(database, 'CONFLICT_INSERTS', {})
+    with migrated_app.app_context():
+        user = make_user(f'stats-race-{conflict_insert}@example.com')
+        raced = []
+        statements = []
+
+        def other_worker_inserts(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+            # Bu istek satırı bulamadıktan hemen sonra başka bir işçi aynı satırı ekleyip kaydeder
+            if raced or not statement.startswith('SELECT') or 'measurement_stats' not in statement:
+                return
+            raced.append(True)
+            with db.engine.begin() as other:
+                other.execute(MeasurementStats.__table__.insert().values(user_id=user.id, measurement_type='blood_glucose'))
+
+        event.listen(db.engine, 'after_cursor_execute', other_worker_inserts)
+        try:
+            entry = measurement(user, 120)
+            record_measurement_stats(entry)
+        finally:
+            event.remove(db.engine, 'after_cursor_execute', other_worker_inserts)
+        db.session.add(entry)
+        db.session.commit()
+        assert raced
+        assert any(statement.startswith('SAVEPOINT') for statement in statements) is not conflict_insert
+        rows = MeasurementStats.query.filter_by(user_id=user.id).all()
+        assert len(rows) == 1
+        assert rows[0].count == 1
+        assert rows[0].mean == 120
+
+
+BASELINE = [100, 104, 97, 102, 99, 103, 98, 101]
+
+
+def post_readings(client, values, start_day=1):
+    for day, value in enumerate(values, start=start_day):
+        response = client.post('/chronic-tracking', data={'disease_type': 'diabetes', 'measurement_type': 'blood_glucose',
+                                                          'value': str(value), 'date': f'2026-09-{day:02d}'})
+        assert response.status_code == 302
+
+
+def flags_for(email):
+    user = User.query.filter_by(email=email).one()
+    return [(m.value, m.is_anomaly) for m in
+            ChronicMeasurement.query.filter_by(user_id=user.id).order_by(ChronicMeasurement.date, ChronicMeasurement.id)]
+
+
+def test_reading_far_from_baseline_is_flagged(login, migrated_app):
+    client = login('anomaly@example.com')
+    post_readings(client, BASELINE + [105, 260])
+    with migrated_app.app_context():
+        flags = flags_for('anomaly@example.com')
+    # Taban çizgisi oturana kadar işaret yok; sapmayan okuma işaretlenmez, sıçrama işaretlenir
+    assert flags == [(str(value), False) for value in BASELINE] + [('105', False), ('260', True)]
+    anomalies = client.get('/api/measurement-anomalies').get_json()
+    assert [(a['value'], a['measurement_type']) for a in anomalies] == [('260', 'blood_glucose')]
+    assert anomalies[0]['anomaly_score'] > 3
+
+
+def test_short_history_is_never_flagged(login, migrated_app):
+    client = login('anomaly-short@example.com')
+    post_readings(client, [100, 400, 20])
+    with migrated_app.app_context():
+        assert not any(flag for _, flag in flags_for('anomaly-short@example.com'))
+
+
+def test_replay_reproduces_incremental_state(login, migrated_app):
+    client = login('anomaly-replay@example.com')
+    post_readings(client, BASELINE + [230, 100, 99])
+    with migrated_app.app_context():
+        user = User.query.filter_by(email='anomaly-replay@example.com').one()
+        columns = ('count', 'mean', 'm2', 'ewma', 'ewm_var', 'min_value', 'max_value', 'last_value', 'in_range_count')
+        incremental = MeasurementStats.query.filter_by(user_id=user.id).one()
+        before = [getattr(incremental, name) for name in columns]
+        flags = flags_for('anomaly-replay@example.com')
+        assert ('230', True) in flags
+
+        rebuild_measurement_stats(batch_size=4)
+        db.session.expire_all()
+        replayed = MeasurementStats.query.filter_by(user_id=user.id).one()
+        assert [getattr(replayed, name) for name in columns] == pytest.approx(before)
+        assert flags_for('anomaly-replay@example.com') == flags
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from app import ChronicMeasurement, User, backfill_measurement_values, db
+from measurements import parse_measurement
+
+
+@pytest.mark.parametrize('measurement_type, value, expected', [
+    ('blood_glucose', '120', (120.0, None, 'mg/dL')),
+    ('blood_glucose', '5,6 mmol/L', (5.6, None, 'mmol/L')),
+    ('blood_pressure', '120/80', (120.0, 80.0, 'mmHg')),
+    ('blood_pressure', ' 135 / 85 mmHg ', (135.0, 85.0, 'mmHg')),
+    ('peak_flow', '410', (410.0, None, 'L/min')),
+    ('weight', '72.5 kg', (72.5, None, 'kg')),
+    ('blood_pressure', 'yüksek', (None, None, 'mmHg')),
+    ('blood_glucose', '', (None, None, 'mg/dL')),
+    ('unknown', None, (None, None, None)),
+])
+def test_parse_measurement(measurement_type, value, expected):
+    assert parse_measurement(measurement_type, value) == expected
+
+
+def test_form_submit_stores_typed_columns(login, migrated_app):
+    client = login('measurements@example.com')
+    response = client.post('/chronic-tracking', data={'disease_type': 'hypertension', 'measurement_type': 'blood_pressure',
+                                                      'value': '128/84', 'date': '2026-05-02'})
+    assert response.status_code == 302
+    data = client.get('/chronic-tracking/data?measurement_type=blood_pressure').get_json()
+    assert data['measurements'] == [{
+        'date': '2026-05-02', 'disease_type': 'hypertension', 'measurement_type': 'blood_pressure',
+        'value': '128/84', 'value_primary': 128.0, 'value_secondary': 84.0, 'unit': 'mmHg',
+    }]
+
+
+def test_backfill_parses_untyped_rows(login, migrated_app):
+    login('measurements-backfill@example.com')
+    with migrated_app.app_context():
+        user = User.query.filter_by(email='measurements-backfill@example.com').one()
+        rows = [ChronicMeasurement(user_id=user.id, date=date(2026, 1, 1), disease_type='diabetes',
+                                   measurement_type=kind, value=value)
+                for kind, value in [('blood_glucose', '99'), ('blood_pressure', '140/90'), ('blood_glucose', '?')]]
+        db.session.add_all(rows)
+        db.session.commit()
+        ids = [row.id for row in rows]
+
+        assert backfill_measurement_values(batch_size=2) >= 3
+        db.session.expire_all()
+        typed = [(m.value_primary, m.value_secondary, m.unit) for m in (db.session.get(ChronicMeasurement, i) for i in ids)]
+        # Ayrıştırılamayan değer boş kalır, birim ölçüm türünden gelir
+        assert typed == [(99.0, None, 'mg/dL'), (140.0, 90.0, 'mmHg'), (None, None, 'mg/dL')]
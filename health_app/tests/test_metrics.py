@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture
+def client(migrated_app):
+    original = migrated_app.config['METRICS_TOKEN']
+    yield migrated_app.test_client()
+    migrated_app.config['METRICS_TOKEN'] = original
+
+
+def test_metrics_closed_without_token(migrated_app, client):
+    migrated_app.config['METRICS_TOKEN'] = None
+    assert client.get('/metrics').status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 404
+
+
+def test_metrics_requires_configured_token(migrated_app, client):
+    migrated_app.config['METRICS_TOKEN'] = 's3cret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert '# TYPE http_request_duration_seconds histogram' in response.get_data(as_text=True)
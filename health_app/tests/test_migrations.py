@@ -0,0 +1,70 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+import migrations
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Sürümlemeden önceki şema (ilk sürümün veritabanı)
+BASELINE_DB = os.path.join(APP_DIR, 'instance', 'health_app.db')
+
+
+@pytest.mark.parametrize('dialect, expected', [
+    (postgresql.dialect(), 'ALTER TABLE chronic_measurement ADD COLUMN is_anomaly BOOLEAN DEFAULT false NOT NULL'),
+    (mysql.dialect(), 'ALTER TABLE chronic_measurement ADD COLUMN is_anomaly BOOL NOT NULL DEFAULT false'),
+    (sqlite.dialect(), 'ALTER TABLE chronic_measurement ADD COLUMN is_anomaly BOOLEAN DEFAULT 0 NOT NULL'),
+])
+def test_boolean_column_default_per_dialect(dialect, expected):
+    column = sa.Column('is_anomaly', sa.Boolean, nullable=False, server_default=sa.false())
+    assert migrations.add_column_ddl(dialect, 'chronic_measurement', column) == expected
+
+
+def test_schema_version_table_is_portable():
+    ddl = str(sa.schema.CreateTable(migrations.schema_version).compile(dialect=postgresql.dialect()))
+    assert 'TIMESTAMP' in ddl and 'DATETIME' not in ddl
+
+
+def test_create_index_is_idempotent(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE item (id INTEGER PRIMARY KEY, user_id INTEGER, day DATE)')
+        migrations.create_index(conn, 'ix_item_user_day', 'item', ['user_id', 'day'], unique=True)
+        migrations.create_index(conn, 'ix_item_user_day', 'item', ['user_id', 'day'], unique=True)
+        indexes = sa.inspect(conn).get_indexes('item')
+    assert [(i['name'], i['column_names'], bool(i['unique'])) for i in indexes] == [('ix_item_user_day', ['user_id', 'day'], True)]
+
+
+def test_upgrade_from_baseline_database(tmp_path):
+    path = tmp_path / 'baseline.db'
+    shutil.copy(BASELINE_DB, path)
+    conn = sqlite3.connect(path)
+    with conn:
+        # Eski sürümün bıraktığı tekrarlar: kullanıcı başına iki hedef, aynı güne iki giriş
+        conn.executemany('INSERT INTO health_goal (id, user_id, steps, water, sleep) VALUES (?, 1, ?, 2.0, 7.0)',
+                         [(10, 8000), (11, 12000)])
+        conn.executemany("INSERT INTO health_goal_entry (id, user_id, date, steps, water, sleep) "
+                         "VALUES (?, 1, '2026-10-01', ?, 2.5, 8.0)", [(20, 3000), (21, 9000)])
+    conn.close()
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}', AUTO_MIGRATE='0')
+    result = subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'migrate-db'], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('SELECT MAX(version) FROM schema_version').fetchone()[0] == 6
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(chronic_measurement)')}
+        assert {'value_primary', 'is_anomaly', 'anomaly_score'} <= columns
+        indexes = {row[1] for row in conn.execute('PRAGMA index_list(health_goal_entry)')}
+        assert 'uq_health_goal_entry_user_date' in indexes
+        # Kullanıcı başına ilk hedef, gün başına son giriş kalır; seri yeniden hesaplanır
+        assert conn.execute('SELECT id, steps FROM health_goal').fetchall() == [(10, 8000)]
+        assert conn.execute('SELECT id, steps, goals_met FROM health_goal_entry').fetchall() == [(21, 9000, 1)]
+        assert conn.execute('SELECT current_streak, longest_streak FROM health_goal').fetchone() == (1, 1)
+    finally:
+        conn.close()
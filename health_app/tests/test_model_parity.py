@@ -0,0 +1,87 @@
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pytest
+
+from compiled_models import load_compiled_model
+from export_models import FEATURE_RANGES, TOLERANCE
+from risk_models import MODEL_FEATURES, MODEL_FILES, MODELS_DIR, compiled_path, file_sha
+
+# Elle seçilmiş gerçekçi satırlar (özellik sırası MODEL_FEATURES ile aynı)
+TYPICAL_ROWS = {
+    'diabetes': [
+        [6, 148, 72, 35, 0, 33.6, 0.627, 50],
+        [1, 85, 66, 29, 0, 26.6, 0.351, 31],
+        [0, 137, 40, 35, 168, 43.1, 2.288, 33],
+    ],
+    'heart': [
+        [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1],
+        [41, 0, 1, 130, 204, 0, 0, 172, 0, 1.4, 2, 0, 2],
+        [67, 1, 0, 160, 286, 0, 0, 108, 1, 1.5, 1, 3, 2],
+    ],
+}
+
+
+def fixed_rows(model_name):
+    n = len(MODEL_FEATURES[model_name])
+    lows, highs = (np.array(bound, dtype=np.float64) for bound in zip(*FEATURE_RANGES[model_name]))
+    rows = [
+        np.zeros(n),
+        lows,
+        highs,
+        (lows + highs) / 2,
+        np.full(n, 1e6),
+        np.full(n, -1e6),
+        np.full(n, 1e12),
+        np.where(np.arange(n) % 2, 1e6, -1e6),
+    ]
+    return np.vstack(rows + [np.array(row, dtype=np.float64) for row in TYPICAL_ROWS[model_name]])
+
+
+def load_pair(model_name):
+    path = os.path.join(MODELS_DIR, MODEL_FILES[model_name])
+    with open(path, 'rb') as f:
+        raw = f.read()
+    with warnings.catch_warnings():
+        # Modeller eski bir scikit-learn sürümüyle kaydedildi
+        warnings.simplefilter('ignore')
+        estimator = pickle.loads(raw)
+    return estimator, load_compiled_model(compiled_path(path)), file_sha(raw)
+
+
+@pytest.fixture(scope='module', params=sorted(MODEL_FILES))
+def models(request):
+    estimator, compiled, sha = load_pair(request.param)
+    return request.param, estimator, compiled, sha
+
+
+def test_npz_exported_from_current_sav(models):
+    _, estimator, compiled, sha = models
+    assert compiled.source_sha == sha
+    assert compiled.n_features_in_ == estimator.n_features_in_
+
+
+def test_predict_parity(models):
+    model_name, estimator, compiled, _ = models
+    X = fixed_rows(model_name)
+    np.testing.assert_array_equal(compiled.predict(X), estimator.predict(X))
+
+
+def test_decision_function_parity(models):
+    model_name, estimator, compiled, _ = models
+    X = fixed_rows(model_name)
+    np.testing.assert_allclose(compiled.decision_function(X), estimator.decision_function(X),
+                               rtol=TOLERANCE, atol=TOLERANCE)
+
+
+def test_predict_proba_parity(models):
+    model_name, estimator, compiled, _ = models
+    if not hasattr(compiled, 'predict_proba'):
+        pytest.skip(f'{model_name}: olasılıksız eğitilmiş model')
+    X = fixed_rows(model_name)
+    with np.errstate(over='raise'):
+        proba = compiled.predict_proba(X)
+    np.testing.assert_allclose(proba, estimator.predict_proba(X), rtol=TOLERANCE, atol=TOLERANCE)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
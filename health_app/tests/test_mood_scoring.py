@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+import pytest
+
+from app import MoodStressTest
+from mood_scoring import get_scorer
+
+
+def linear_level(levels, avg):
+    # Anketin ilk sürümündeki doğrusal tarama: dosya sırasında eşiği <= avg olan ilk seviye
+    for name, data in levels.items():
+        if 'threshold' in data and avg >= data['threshold']:
+            return name
+    return list(levels.keys())[-1]
+
+
+def random_answer_sets(scorer, count, seed=7):
+    rng = random.Random(seed)
+    options = {q['id']: [o['value'] for o in q['options']] for q in scorer.questions}
+    answer_sets = []
+    for _ in range(count):
+        # Bazı sorular boş bırakılır, böylece eksik kategoriler de denenir
+        answer_sets.append({qid: rng.choice(values) for qid, values in options.items() if rng.random() > 0.2})
+    return answer_sets
+
+
+def test_bisect_lookup_matches_linear_scan():
+    scorer = get_scorer()
+    for cat, levels in scorer.feedback_data.items():
+        feedback = scorer.category_feedback[cat]
+        for avg in np.round(np.arange(-0.5, 4.0, 0.05), 2).tolist():
+            assert feedback.level(avg) == linear_level(levels, avg), (cat, avg)
+        averages = np.arange(0, 3.01, 0.25)
+        assert feedback.levels_for(averages) == [feedback.level(avg) for avg in averages.tolist()]
+
+
+def test_batch_matches_single_scoring():
+    scorer = get_scorer()
+    answer_sets = random_answer_sets(scorer, 50) + [{}]
+    assert scorer.score_batch(answer_sets) == [scorer.score(answers) for answers in answer_sets]
+
+
+def test_submitted_test_is_scored_and_saved(login, migrated_app):
+    client = login('mood-scoring@example.com')
+    scorer = get_scorer()
+    answers = random_answer_sets(scorer, 1, seed=3)[0]
+    response = client.post('/mood-stress-test', data={qid: str(val) for qid, val in answers.items()})
+    assert response.status_code == 200
+    expected = scorer.score(answers)
+    with migrated_app.app_context():
+        test = MoodStressTest.query.order_by(MoodStressTest.id.desc()).first()
+        assert test.answers == answers
+        assert test.result_json == expected['feedback']
+        assert test.mood_avg == expected['feedback'].get('mood', {}).get('avg')
+    assert expected['general_analysis'] in response.get_data(as_text=True)
+
+
+@pytest.fixture
+def client(login):
+    return login('mood-batch@example.com')
+
+
+def test_score_batch_api(client):
+    scorer = get_scorer()
+    answer_sets = random_answer_sets(scorer, 5)
+    body = client.post('/api/mood/score-batch', json={'answer_sets': answer_sets}).get_json()
+    assert body['success'] is True
+    assert body['version'] == scorer.version
+    assert body['results'] == [scorer.score(answers) for answers in answer_sets]
+
+
+@pytest.mark.parametrize('payload, status, message', [
+    ({}, 400, 'answer_sets bir cevap sözlükleri listesi olmalıdır.'),
+    ({'answer_sets': [['q1', 2]]}, 400, 'answer_sets bir cevap sözlükleri listesi olmalıdır.'),
+    ({'answer_sets': [{'q1': 'çok'}]}, 400, 'Cevap değerleri tam sayı olmalıdır.'),
+])
+def test_score_batch_api_rejects_bad_input(client, payload, status, message):
+    response = client.post('/api/mood/score-batch', json=payload)
+    assert response.status_code == status
+    assert response.get_json() == {'success': False, 'message': message}
+
+
+def test_score_batch_api_row_limit(client, migrated_app, monkeypatch):
+    monkeypatch.setitem(migrated_app.config, 'MOOD_BATCH_MAX_ROWS', 2)
+    response = client.post('/api/mood/score-batch', json={'answer_sets': [{}, {}, {}]})
+    assert response.status_code == 413
@@ -0,0 +1,65 @@
+import os
+import shutil
+import warnings
+
+import pytest
+
+from risk_models import MODEL_FILES, MODELS_DIR, ModelRegistry, PredictionCache, prediction_cache
+
+DIABETES_FORM = {
+    'prediction_type': 'diabetes', 'pregnancies': '2', 'glucose': '140', 'blood_pressure': '70',
+    'skin_thickness': '30', 'insulin': '0', 'bmi': '31.2', 'diabetes_pedigree': '0.4', 'age': '45',
+}
+
+
+def test_repeat_submission_hits_cache(login):
+    client = login('prediction-cache@example.com')
+    prediction_cache.invalidate()
+    before = client.get('/api/risk/cache-stats').get_json()
+    client.post('/kriz_analizleri', data=DIABETES_FORM)
+    client.post('/kriz_analizleri', data=DIABETES_FORM)
+    # Aynı değer sayı olarak farklı yazılsa da aynı anahtara düşer
+    client.post('/kriz_analizleri', data={**DIABETES_FORM, 'glucose': '140.0'})
+    after = client.get('/api/risk/cache-stats').get_json()
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 2
+    assert after['size'] == 1
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = PredictionCache(maxsize=2, ttl=10)
+    now = [100.0]
+    monkeypatch.setattr('risk_models.time.monotonic', lambda: now[0])
+    cache.put(('heart', 'v1', (1.0,)), (0, 0.1))
+    cache.put(('heart', 'v1', (2.0,)), (1, 0.9))
+    assert cache.get(('heart', 'v1', (1.0,))) == (0, 0.1)
+    cache.put(('heart', 'v1', (3.0,)), (0, 0.2))
+    # En uzun süre kullanılmayan (2.0) çıkarılır
+    assert cache.get(('heart', 'v1', (2.0,))) is None
+    now[0] += 11
+    assert cache.get(('heart', 'v1', (1.0,))) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (1, 2, 1, 1)
+
+
+def test_model_reload_invalidates_only_that_model(tmp_path):
+    for filename in MODEL_FILES.values():
+        shutil.copy(os.path.join(MODELS_DIR, filename), tmp_path / filename)
+    models = ModelRegistry(models_dir=str(tmp_path), backend='sklearn', check_interval=0)
+    cache = PredictionCache()
+    models.on_reload(lambda name, version: cache.invalidate(name))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        old_version = models.version('heart')
+        models.version('diabetes')
+        cache.put(('heart', old_version, (1.0,)), (0, 0.1))
+        cache.put(('diabetes', models.version('diabetes'), (1.0,)), (1, None))
+
+        # Yeni model dosyası: pickle sonundaki fazladan bayt yüklemeyi etkilemez, içerik özeti değişir
+        with open(tmp_path / MODEL_FILES['heart'], 'ab') as f:
+            f.write(b'\n')
+        stat = os.stat(tmp_path / MODEL_FILES['heart'])
+        os.utime(tmp_path / MODEL_FILES['heart'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert models.version('heart') != old_version
+    assert cache.stats()['size'] == 1
+    assert cache.stats()['invalidations'] == 1
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+import blood_rules
+import app as health
+from app import LabValue, User, db, reanalyze_test_results
+
+REPORTS = [
+    {'hemogram': {'hgb': '10'}, 'biyokimya': {'glucose': '130'}, 'vitamin_mineral': {}},
+    {'hemogram': {'wbc': '7'}, 'biyokimya': {'ldl': '180'}, 'vitamin_mineral': {'vitamin_d': '15'}},
+    {'hemogram': {'hgb': 'x'}, 'biyokimya': {}, 'vitamin_mineral': {}},
+]
+
+
+@pytest.fixture
+def stale_tests(migrated_app):
+    with migrated_app.app_context():
+        user = User(email='reanalyze@example.com', name='Test')
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.flush()
+        rows = [health.TestResult(user_id=user.id, date=datetime(2026, 1, i + 1), results_data=results,
+                                  recommendations='eski rapor' + ('\n\nKullanıcı Notu: açken' if i == 0 else ''),
+                                  reference_version='eski')
+                for i, results in enumerate(REPORTS)]
+        pdf = health.TestResult(user_id=user.id, date=datetime(2026, 1, 9), pdf_path='x.pdf', results_data={},
+                                recommendations='pdf raporu')
+        db.session.add_all(rows + [pdf])
+        db.session.commit()
+        yield [row.id for row in rows], pdf.id
+        LabValue.query.filter_by(user_id=user.id).delete()
+        health.TestResult.query.filter_by(user_id=user.id).delete()
+        db.session.delete(user)
+        db.session.commit()
+
+
+def test_stale_rows_reanalyzed_in_batches(migrated_app, stale_tests):
+    ids, pdf_id = stale_tests
+    ruleset = blood_rules.engine.ruleset()
+    with migrated_app.app_context():
+        assert reanalyze_test_results(batch_size=2) >= len(ids)
+        db.session.expire_all()
+        for test_id, results in zip(ids, REPORTS):
+            row = db.session.get(health.TestResult, test_id)
+            assert row.reference_version == ruleset.version
+            # Toplu değerlendirme tek tek analizle aynı metni üretir
+            assert row.recommendations.startswith(ruleset.analyze(results))
+        assert db.session.get(health.TestResult, ids[0]).recommendations.endswith('\n\nKullanıcı Notu: açken')
+        assert db.session.get(health.TestResult, pdf_id).recommendations == 'pdf raporu'
+        flags = dict(db.session.query(LabValue.analyte, LabValue.flag).filter_by(test_result_id=ids[0]))
+        assert flags == {'hgb': 'low', 'glucose': 'high'}
+
+        # Güncel sürümle analiz edilmiş satırlar yeniden işlenmez
+        assert reanalyze_test_results(batch_size=2) == 0
+        assert reanalyze_test_results(batch_size=2, only_stale=False) >= len(ids)
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from reference_data import DATASETS, ReferenceDataStore, store, thaw
+
+
+@pytest.fixture
+def temp_store(tmp_path):
+    (tmp_path / 'items.json').write_text(json.dumps({'items': [{'id': 1, 'name': 'elma'}]}), encoding='utf-8')
+    return ReferenceDataStore(datasets={'items': 'items.json'}, base_dir=str(tmp_path), check_interval=0)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_parsed_once_and_frozen(temp_store):
+    data = temp_store.get('items')
+    assert temp_store.get('items') is data
+    assert temp_store.stats()['items']['loads'] == 1
+    with pytest.raises(TypeError):
+        data['items'] = []
+    assert isinstance(data['items'], tuple)
+    assert thaw(data) == {'items': [{'id': 1, 'name': 'elma'}]}
+
+
+def test_reload_on_mtime_change(temp_store, tmp_path):
+    first = temp_store.snapshot('items')
+    reloaded = []
+    temp_store.on_reload(lambda name, snap: reloaded.append((name, snap.version)))
+    (tmp_path / 'items.json').write_text(json.dumps({'items': []}), encoding='utf-8')
+    bump_mtime(tmp_path / 'items.json')
+    snap = temp_store.snapshot('items')
+    assert snap.version != first.version
+    assert snap.data['items'] == ()
+    assert reloaded == [('items', snap.version)]
+    assert temp_store.stats()['items']['loads'] == 2
+
+
+def test_derived_value_rebuilt_per_snapshot(temp_store, tmp_path):
+    builds = []
+
+    def build(data, version):
+        builds.append(version)
+        return len(data['items'])
+
+    assert temp_store.derived('items', build) == 1
+    assert temp_store.derived('items', build) == 1
+    (tmp_path / 'items.json').write_text(json.dumps({'items': [1, 2]}), encoding='utf-8')
+    bump_mtime(tmp_path / 'items.json')
+    assert temp_store.derived('items', build) == 2
+    assert len(builds) == 2
+
+
+def test_save_replaces_file_and_publishes(temp_store, tmp_path):
+    data = temp_store.get('items')
+    snap = temp_store.save('items', {'items': list(data['items']) + [{'id': 2, 'name': 'armut'}]})
+    assert [item['name'] for item in snap.data['items']] == ['elma', 'armut']
+    assert json.loads((tmp_path / 'items.json').read_text(encoding='utf-8'))['items'][1]['name'] == 'armut'
+    assert sorted(os.listdir(tmp_path)) == ['items.json']
+
+
+def test_paths_do_not_depend_on_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fresh = ReferenceDataStore(check_interval=0)
+    for name in DATASETS:
+        assert os.path.isabs(fresh.paths[name])
+        assert fresh.get(name)
+
+
+def test_routes_serve_frozen_snapshots(login):
+    client = login('reference-data@example.com')
+    response = client.get('/list-foods')
+    assert response.status_code == 200
+    assert response.get_json() == thaw(store.get('food_db'))
+    stats = client.get('/api/reference-data/stats').get_json()
+    assert stats['food_db']['loads'] >= 1
+    assert stats['food_db']['version'] == store.version('food_db')
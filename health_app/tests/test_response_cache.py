@@ -0,0 +1,82 @@
+import pytest
+
+from response_cache import response_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    response_cache.invalidate()
+    yield
+    response_cache.invalidate()
+
+
+def counts(endpoint):
+    return dict(response_cache.stats()['endpoints'].get(endpoint, {}))
+
+
+def test_repeat_get_served_from_cache_with_etag(migrated_app):
+    client = migrated_app.test_client()
+    first = client.get('/')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Cookie' in first.headers['Vary']
+    assert first.headers['Last-Modified']
+    etag = first.headers['ETag']
+    before = counts('index')
+
+    second = client.get('/')
+    assert second.get_data() == first.get_data()
+    assert second.headers['ETag'] == etag
+
+    revalidated = client.get('/', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+    after = counts('index')
+    assert after['hits'] - before.get('hits', 0) == 2
+    assert after['not_modified'] - before.get('not_modified', 0) == 1
+
+
+def test_entries_vary_on_auth_state(migrated_app, login):
+    anonymous = migrated_app.test_client()
+    anonymous.get('/')
+    client = login('response-cache@example.com')
+    before = counts('index')
+    client.get('/')
+    # Oturum açmış kullanıcı anonim sayfanın kaydını almaz
+    assert counts('index')['misses'] == before['misses'] + 1
+    client.get('/')
+    assert counts('index')['hits'] == before.get('hits', 0) + 1
+
+
+def test_saving_blood_test_invalidates_that_users_page(login, migrated_app, monkeypatch):
+    monkeypatch.setitem(migrated_app.config, 'RISK_SCORING_ASYNC', False)
+    client = login('response-cache-blood@example.com')
+    other = login('response-cache-other@example.com')
+    etag = client.get('/blood-analysis').headers['ETag']
+    other_etag = other.get('/blood-analysis').headers['ETag']
+
+    client.post('/blood-test', data={'test_date': '2026-04-01', 'glucose': '90'})
+    # Yönlendirmedeki flash mesajı tüketilir, sonraki sayfa yeniden çizilir
+    client.get('/dashboard')
+    assert client.get('/blood-analysis', headers={'If-None-Match': etag}).status_code == 200
+    assert other.get('/blood-analysis', headers={'If-None-Match': other_etag}).status_code == 304
+
+
+def test_reference_reload_invalidates_dependent_routes(migrated_app):
+    client = migrated_app.test_client()
+    client.get('/health-library')
+    client.get('/')
+    response_cache.invalidate_dataset('health_library_data')
+    before = counts('health_library')
+    client.get('/health-library')
+    assert counts('health_library')['misses'] == before['misses'] + 1
+    before = counts('index')
+    client.get('/')
+    assert counts('index')['hits'] == before['hits'] + 1
+
+
+def test_post_is_never_cached(login):
+    client = login('response-cache-post@example.com')
+    before = counts('blood_analysis')
+    client.post('/blood-analysis', data={'hgb': '14'})
+    assert counts('blood_analysis') == before
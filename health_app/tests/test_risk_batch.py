@@ -0,0 +1,62 @@
+import pytest
+
+from risk_models import MODEL_FEATURES
+
+HEART_ROWS = [
+    [63, 1, 3, 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1],
+    [41, 0, 1, 130, 204, 0, 0, 172, 0, 1.4, 2, 0, 2],
+    [67, 1, 0, 160, 286, 0, 0, 108, 1, 1.5, 1, 3, 2],
+]
+
+
+@pytest.fixture
+def client(login):
+    return login('risk-batch@example.com')
+
+
+def test_batch_matches_single_rows(client):
+    response = client.post('/api/risk/heart/predict-batch', json={'rows': HEART_ROWS})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] is True
+    assert body['count'] == 3
+    assert body['features'] == MODEL_FEATURES['heart']
+    assert len(body['probabilities']) == 3
+
+    # Nesne biçimindeki satırlar aynı sonucu verir, tek tek gönderilse bile
+    for row, prediction in zip(HEART_ROWS, body['predictions']):
+        named = dict(zip(MODEL_FEATURES['heart'], row))
+        single = client.post('/api/risk/heart/predict-batch', json={'rows': [named]}).get_json()
+        assert single['predictions'] == [prediction]
+
+
+def test_diabetes_has_no_probabilities(client):
+    response = client.post('/api/risk/diabetes/predict-batch', json={'rows': [[6, 148, 72, 35, 0, 33.6, 0.627, 50]]})
+    assert response.status_code == 200
+    assert response.get_json()['probabilities'] is None
+
+
+@pytest.mark.parametrize('rows, message', [
+    (None, '"rows" boş olmayan bir liste olmalıdır.'),
+    ([], '"rows" boş olmayan bir liste olmalıdır.'),
+    ([[1, 2, 3]], 'Satır 0: 13 değer bekleniyordu, 3 geldi.'),
+    ([HEART_ROWS[0], [63, 1, 'x', 145, 233, 1, 0, 150, 0, 2.3, 0, 0, 1]], 'Satır 1: sayısal olmayan değer var.'),
+    ([{'age': 63}], 'Satır 0: eksik alanlar: sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal'),
+    ([HEART_ROWS[0][:-1] + ['nan']], 'Satır 0: sonlu olmayan değer var.'),
+])
+def test_invalid_rows_rejected(client, rows, message):
+    response = client.post('/api/risk/heart/predict-batch', json={'rows': rows})
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'message': message}
+
+
+def test_row_limit(client, migrated_app, monkeypatch):
+    monkeypatch.setitem(migrated_app.config, 'RISK_BATCH_MAX_ROWS', 2)
+    response = client.post('/api/risk/heart/predict-batch', json={'rows': HEART_ROWS})
+    assert response.status_code == 413
+    assert response.get_json()['success'] is False
+
+
+def test_unknown_model(client):
+    response = client.post('/api/risk/kidney/predict-batch', json={'rows': HEART_ROWS})
+    assert response.status_code == 404
@@ -0,0 +1,19 @@
+from metrics import histograms
+from risk_models import RISK_STAGE_METRIC
+
+
+def risk_series():
+    return {labels for (name, labels), _ in histograms.items() if name == RISK_STAGE_METRIC}
+
+
+def test_unknown_prediction_type_does_not_create_series(login):
+    client = login('risk-metrics@example.com')
+    client.post('/kriz_analizleri', data={'prediction_type': 'heart'})
+    before = risk_series()
+    for i in range(3):
+        response = client.post('/kriz_analizleri', data={'prediction_type': f'evil{i}'})
+        assert response.status_code == 200
+    # Bilinmeyen türler en fazla tek bir "unknown" serisinde toplanır
+    new = [dict(labels) for labels in risk_series() - before]
+    assert len(new) <= 1
+    assert all(labels['model'] == 'unknown' for labels in new)
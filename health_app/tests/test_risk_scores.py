@@ -0,0 +1,48 @@
+import pytest
+
+import app as health
+from app import RiskScore
+from risk_models import MODEL_FEATURES, registry
+
+
+@pytest.fixture
+def client(login, migrated_app, monkeypatch):
+    # Skorlar arka plan işçisi yerine istek içinde hesaplanır
+    monkeypatch.setitem(migrated_app.config, 'RISK_SCORING_ASYNC', False)
+    return login('risk-scores@example.com', age=54, gender='male', height=175.0, weight=80.0)
+
+
+def save_blood_test(client, test_date, **values):
+    response = client.post('/blood-test', data={'test_date': test_date, **values})
+    assert response.status_code == 302
+    return health.TestResult.query.order_by(health.TestResult.id.desc()).first().id
+
+
+def scores_for(test_result_id):
+    return {score.model_name: score for score in RiskScore.query.filter_by(test_result_id=test_result_id)}
+
+
+def test_blood_test_is_scored_with_profile(client, migrated_app):
+    with migrated_app.app_context():
+        test_id = save_blood_test(client, '2026-03-01', glucose='180', cholesterol='260')
+        scores = scores_for(test_id)
+        assert set(scores) == {'diabetes', 'heart'}
+        diabetes = scores['diabetes']
+        assert diabetes.model_version == registry.version('diabetes')
+        assert diabetes.features['glucose'] == 180 and diabetes.features['age'] == 54
+        assert diabetes.features['bmi'] == 26.1
+        assert diabetes.probability is None
+        assert set(diabetes.imputed_features) == set(MODEL_FEATURES['diabetes']) - {'glucose', 'age', 'bmi'}
+        heart = scores['heart']
+        assert heart.features['sex'] == 1 and heart.features['fbs'] == 1
+        assert 0 <= heart.probability <= 1
+
+    page = client.get('/kriz_analizleri').get_data(as_text=True)
+    assert 'Tahlillerinize Göre Risk Skorları' in page
+    assert '01.03.2026' in page
+
+
+def test_model_skipped_without_key_lab_value(client, migrated_app):
+    with migrated_app.app_context():
+        test_id = save_blood_test(client, '2026-03-02', glucose='95')
+        assert set(scores_for(test_id)) == {'diabetes'}
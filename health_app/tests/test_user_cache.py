@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import event
+
+import user_cache as user_cache_module
+from app import User, db
+from user_cache import user_cache
+
+
+@pytest.fixture
+def user_queries(migrated_app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SELECT') and 'FROM user' in statement:
+            statements.append(statement)
+
+    with migrated_app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def user_id(migrated_app, email):
+    with migrated_app.app_context():
+        return User.query.filter_by(email=email).one().id
+
+
+def test_repeat_requests_skip_user_query(login, user_queries):
+    client = login('user-cache@example.com')
+    client.get('/api/user-cache/stats')
+    del user_queries[:]
+    before = user_cache.stats()
+    for _ in range(5):
+        assert client.get('/api/user-cache/stats').status_code == 200
+    assert user_queries == []
+    assert user_cache.stats()['hits'] - before['hits'] == 5
+
+
+@pytest.mark.parametrize('path, data, check', [
+    ('/profile', {'name': 'Yeni Ad', 'age': '33', 'gender': 'female', 'weight': '60', 'height': '165'},
+     lambda user: user.name == 'Yeni Ad' and user.age == 33),
+    ('/update-activity-level', {'activity_level': 'very_active', 'goal': 'maintain'},
+     lambda user: user.activity_level == 'very_active' and user.goal == 'maintain'),
+])
+def test_profile_writes_invalidate_cached_user(login, migrated_app, path, data, check):
+    email = f'user-cache-{path.strip("/")}@example.com'
+    client = login(email)
+    uid = user_id(migrated_app, email)
+    client.get('/api/user-cache/stats')
+    before = user_cache.stats()['invalidations']
+    client.post(path, data=data)
+    assert user_cache.stats()['invalidations'] == before + 1
+    with migrated_app.test_request_context():
+        assert check(user_cache.load(db.session, User, uid))
+
+
+def test_password_change_invalidates_cached_user(login, migrated_app):
+    client = login('user-cache-password@example.com', password='eski-sifre')
+    client.get('/api/user-cache/stats')
+    client.post('/change-password', data={'current_password': 'eski-sifre', 'new_password': 'yeni-sifre',
+                                          'confirm_password': 'yeni-sifre'})
+    client.get('/logout')
+    # Önbellekteki eski özet yerine yeni şifre geçerlidir
+    assert client.post('/login', data={'email': 'user-cache-password@example.com', 'password': 'eski-sifre'}).status_code == 200
+    assert client.post('/login', data={'email': 'user-cache-password@example.com', 'password': 'yeni-sifre'}).status_code == 302
+
+
+def test_write_outside_session_is_bounded_by_ttl(login, migrated_app, monkeypatch):
+    email = 'user-cache-ttl@example.com'
+    client = login(email)
+    uid = user_id(migrated_app, email)
+    client.get('/api/user-cache/stats')
+    with migrated_app.app_context():
+        # Başka bir süreç gibi: ORM oturumu kancaları tetiklenmez
+        with db.engine.begin() as conn:
+            conn.execute(User.__table__.update().where(User.__table__.c.id == uid).values(name='Başka İşçi'))
+    with migrated_app.test_request_context():
+        assert user_cache.load(db.session, User, uid).name == 'Test'
+        db.session.remove()
+    now = user_cache_module.time.monotonic()
+    monkeypatch.setattr(user_cache_module.time, 'monotonic', lambda: now + user_cache.ttl + 1)
+    with migrated_app.test_request_context():
+        assert user_cache.load(db.session, User, uid).name == 'Başka İşçi'
@@ -0,0 +1,66 @@
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the series' shape
+
+    The first and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        raise ValueError('LTTB needs at least 3 points')
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        # Üçgen alanının iki katı; sabit çarpan seçimi değiştirmez
+        area = np.abs((x[previous] - next_x) * (bucket_y - y[previous]) - (x[previous] - bucket_x) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax_indices(y, threshold):
+    """Keep the minimum and maximum of each of threshold // 2 equal-count buckets, in order"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    n_buckets = max(1, threshold // 2)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+    starts = edges[:-1]
+    # Her kovanın min/max konumu tek reduceat çağrısıyla bulunur
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    is_min = y == mins[bucket]
+    is_max = y == maxs[bucket]
+    first_min = np.unique(bucket[is_min], return_index=True)[1]
+    first_max = np.unique(bucket[is_max], return_index=True)[1]
+    indices = np.concatenate([np.flatnonzero(is_min)[first_min], np.flatnonzero(is_max)[first_max]])
+    return np.unique(indices)
+
+
+def downsample(x, y, threshold, method='lttb'):
+    """Indices of the points to keep, in time order"""
+    if method == 'minmax':
+        return minmax_indices(y, threshold)
+    return lttb_indices(x, y, threshold)
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+# Oturum açmış kullanıcı profilinin süreç içinde tutulma süresi (saniye) ve en fazla kullanıcı sayısı
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 60))
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 4096))
+
+
+class UserCache:
+    """Bounded per-process cache of user rows for the Flask-Login user loader
+
+    Entries are detached snapshots of the column values only. `load` attaches a
+    fresh copy to the current session with merge(load=False), which issues no
+    SQL, so relationships still lazy-load and attribute writes still flush.
+    The TTL bounds staleness when another process changes the row.
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL, maxsize=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # user_id -> (bitiş zamanı, ayrık kopya)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def load(self, session, model, user_id):
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is not None and item[0] > time.monotonic():
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                snapshot = item[1]
+            else:
+                self.misses += 1
+                snapshot = None
+        if snapshot is not None:
+            return session.merge(snapshot, load=False)
+        user = session.get(model, user_id)
+        if user is not None and self.maxsize > 0:
+            self._store(user_id, self._snapshot(model, user))
+        return user
+
+    @staticmethod
+    def _snapshot(model, user):
+        # Yalnızca sütun değerleri kopyalanır; ilişkiler oturuma bağlandıktan sonra yüklenir
+        copy = model(**{attr.key: getattr(user, attr.key) for attr in inspect(model).column_attrs})
+        make_transient_to_detached(copy)
+        return copy
+
+    def _store(self, user_id, snapshot):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._data.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def watch(self, session, model):
+        """Drop a user's snapshot whenever a change to their row is committed"""
+
+        @event.listens_for(session, 'after_flush')
+        def collect(sess, flush_context):
+            changed = sess.info.setdefault('cached_users', set())
+            for obj in list(sess.dirty) + list(sess.deleted):
+                if isinstance(obj, model) and obj.id is not None:
+                    changed.add(obj.id)
+
+        @event.listens_for(session, 'after_commit')
+        def invalidate(sess):
+            for user_id in sess.info.pop('cached_users', ()):
+                self.invalidate(user_id)
+
+        @event.listens_for(session, 'after_rollback')
+        def discard(sess):
+            sess.info.pop('cached_users', None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+user_cache = UserCache()